@@ -1,9 +1,23 @@
-from collections import deque
+import argparse
 
+import search
 
-def is_valid(state):
+
+PEOPLE = 3                  #missionaries, and as many cannibals, that start on the left bank
+BOAT_CAPACITY = 2
+
+
+def boat_moves(k):
+    #every (missionaries, cannibals) group the boat can carry: 1 to k people, and missionaries are not outnumbered in the
+    #boat either; for k = 2 this is [(1, 0), (2, 0), (0, 1), (0, 2), (1, 1)]
+    moves = [(m, 0) for m in range(1, k + 1)] + [(0, c) for c in range(1, k + 1)]
+    moves += [(m, c) for m in range(1, k + 1) for c in range(1, m + 1) if m + c <= k]
+    return moves
+
+
+def is_valid(state, n=PEOPLE):
     M, C, B = state                    #M, C are number of missionaries/Cnbls on the left
-    M_right, C_right = 3 - M, 3 - C    #M_right, C_right --> number of mnaries/cnbls on the right
+    M_right, C_right = n - M, n - C    #M_right, C_right --> number of mnaries/cnbls on the right
 
     if (M > 0 and M < C) or (M_right > 0 and M_right < C_right):
         return False
@@ -11,10 +25,11 @@ def is_valid(state):
     return True
 
 
-def get_next_state(state):
-    M, C, B = state                                        #destructuring the values from the state and assigning variables for better understanding and                                                             readability
+def get_next_state(state, n=PEOPLE, moves=None):
+    M, C, B = state                                        #destructuring the values from the state and assigning variables for better understanding and readability
 
-    moves = [(1, 0), (2, 0), (0, 1), (0, 2), (1, 1)]       #all the possible moves/actions from any state
+    if moves is None:
+        moves = boat_moves(BOAT_CAPACITY)                  #all the possible moves/actions from any state
 
     next_states = []                                       #saving all the generated valid states in a list
 
@@ -23,43 +38,64 @@ def get_next_state(state):
             new_state = (M - m, C - c, 'R')
         else:
             new_state = (M + m, C + c, 'L')
-        
-        if 0 <= new_state[0] <= 3 and 0 <= new_state[1] <= 3 and is_valid(new_state):     #multiple checks are being performed to ensure that the newly                                                                                             generated states are valid
-            next_states.append(new_state)                                                 #first, we checked to make sure that the number of                                                                                                        missionaries/cannibals are always 0, 1, 2, or 3
-                                                                                          #next, we check for the constraint given in the problem which                                                                                             says that missionaries cannot be outnumbered
+
+        if 0 <= new_state[0] <= n and 0 <= new_state[1] <= n and is_valid(new_state, n):     #the number of missionaries/cannibals on a bank is always between 0 and n,
+            next_states.append(new_state)                                                 #and missionaries cannot be outnumbered
     return next_states
-        
 
-def bfs():
+
+def pack(state, n=PEOPLE):
+    #(m, c, b) -> one int, so the search keeps ints instead of tuples; keys run from 0 to 2 * (n + 1) ** 2 - 1
+    M, C, B = state
+    return (M * (n + 1) + C) * 2 + (B == 'R')
+
+
+def unpack(key, n=PEOPLE):
+    key, right = divmod(key, 2)
+    M, C = divmod(key, n + 1)
+    return (M, C, 'R' if right else 'L')
+
+
+def bfs(n=PEOPLE, k=BOAT_CAPACITY, strategy='bfs', stats=None):
     #state is represented as (m, c, b) where m is the number of missionaries on the left, c is the number of cannibals on the left, and b is the position of the boat- Left or Right
-    start = (3, 3, 'L')
+    #the search itself (parent pointers instead of path copies, packed states, duplicate detection) is in search.py
+    start = (n, n, 'L')
     goal = (0, 0, 'R')
-    queue = deque([(start, [])])        #[] is the path, empty at the beginning
-    visited = set()                     #to keep track of the states that we're visiting
+    moves = boat_moves(k)
+
+    def successors(state):
+        return get_next_state(state, n, moves)
 
-    while queue:
-        state, path = queue.popleft()   #state is the current state, and path the current path
+    def key(state):
+        return pack(state, n)
 
-        if state in visited:            #if state has already been visited, we will not explore it again
-            continue
+    def state(packed):
+        return unpack(packed, n)
 
-        visited.add(state)              #if state has NOT been visited, add it to the set of visited states
-        new_path = path + [state]       #the path (sequence of nodes/states visited -- represents a solution) keeps track of the nodes visited so far
+    def is_goal(state):
+        return state == goal
 
-        if state == goal:
-            return new_path
+    if strategy == 'bidirectional':
+        return search.bidirectional_bfs(start, goal, successors, key=key, state=state, stats=stats)
+    if strategy == 'ucs':
+        return search.uniform_cost(start, is_goal, lambda s: [(child, 1) for child in successors(s)], key, state, stats)
+    return search.STRATEGIES[strategy](start, is_goal, successors, key, state, stats=stats)
 
-        for next_state in get_next_state(state):
-            queue.append((next_state, new_path))
 
-    
-    return None    #No solution found
+def main():
+    parser = argparse.ArgumentParser(description='Missionaries and cannibals with n of each and a boat for k people.')
+    parser.add_argument('n', type=int, nargs='?', default=PEOPLE)
+    parser.add_argument('k', type=int, nargs='?', default=BOAT_CAPACITY)
+    parser.add_argument('--strategy', choices=sorted(search.STRATEGIES), default='bfs')
+    args = parser.parse_args()
 
+    solution = bfs(args.n, args.k, args.strategy)
+    if solution:
+        for step in solution:
+            print(f"Missionaries(Left): {step[0]}, Cannibals(Left): {step[1]}, Boat: {step[2]}")
+    else:
+        print("No Solution Found!")
 
 
-solution = bfs()
-if solution:
-    for step in solution:
-        print(f"Missionaries(Left): {step[0]}, Cannibals(Left): {step[1]}, Boat: {step[2]}")
-else:
-    print("No Solution Found!")
\ No newline at end of file
+if __name__ == '__main__':
+    main()
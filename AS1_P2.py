@@ -1,4 +1,94 @@
 import math   #for using min, max, math.inf, .....
+from collections import OrderedDict     #remembers insertion/access order, which gives us a cheap least-recently-used eviction policy
+import threading
+
+import bitboard     #two 9-bit ints per position instead of a list of strings; see bitboard.py
+import perfect_play     #precomputed best moves for every reachable position; see perfect_play.py
+
+
+EXACT, LOWER_BOUND, UPPER_BOUND = 0, 1, 2     #a stored utility is either exact, or only a bound because alpha-beta cut the search short
+
+
+#utilities depend on the depth at which a position is found (10 - depth / depth - 10), but the same position shows up at different depths
+#(and on different turns), so the table stores utilities as if the position were the root of the search (depth = 0) and shifts them back on lookup
+def to_table_value(value, depth):
+    if value > 0:
+        return value + depth
+    if value < 0:
+        return value - depth
+    return value
+
+
+def from_table_value(value, depth):
+    if value > 0:
+        return value - depth
+    if value < 0:
+        return value + depth
+    return value
+
+
+class TranspositionTable:
+    #bounded cache of already searched positions; once max_entries is reached the least recently used entry is evicted.
+    #Games in several threads can share one table: every method holds the lock, since a lookup's get() + move_to_end()
+    #and a store's check + evict + insert must not interleave with another thread's eviction
+    def __init__(self, max_entries=1 << 16):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()     #key --> (utility, flag)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def lookup(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.entries.move_to_end(key)   #mark as recently used
+            return entry
+
+    def store(self, key, value, flag):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+            elif len(self.entries) >= self.max_entries:
+                self.entries.popitem(last=False)    #evict the least recently used entry
+                self.evictions += 1
+            self.entries[key] = (value, flag)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        with self.lock:
+            probes = self.hits + self.misses
+            return {'entries': len(self.entries), 'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                    'hit_rate': self.hits / probes if probes else 0.0}
+
+
+transposition_table = TranspositionTable()     #shared by every game; utilities don't depend on which game a position came from
+
+perfect_play_table = None       #set by load_perfect_play(); while it is None best_move() searches
+
+probe = None        #an instrumentation.Probe to report nodes, cutoffs and table hits per depth to; None = no reporting
+
+
+def load_perfect_play(path=perfect_play.DEFAULT_PATH):
+    #switch best_move() to table lookups. Returns False (and keeps searching) if the table is missing or stale
+    global perfect_play_table
+    perfect_play_table = None
+    try:
+        perfect_play_table = perfect_play.PerfectPlayTable(path)
+    except FileNotFoundError:
+        return False
+    except ValueError as error:
+        print(error)
+        return False
+    return True
 
 
 def print_board(board):
@@ -9,79 +99,281 @@ def print_board(board):
             
 
 def is_draw(board):
-    return all(cell != ' ' for cell in board)       #all() returns a boolean depending on whether ALL the values in the iterable meet the condition (returns True) or not (returns False).
+    x, o = bitboard.from_list(board)
+    return bitboard.is_full(x, o)       #all cells are taken <--> popcount of the taken cells is 9
 
 
 def check_win(board, player):
-    win_configurations = [(0, 1, 2), (3, 4, 5), (6, 7, 8), (0, 3, 6), (1, 4, 7), (2, 5, 8), (0, 4, 8), (2, 4, 6)]
-    return any(board[i] == board[j] == board[k] == player for i, j, k in win_configurations)        #any() returns a boolean depending on whether AT LEAST one of the values in the iterable meets the condition (returns True) or not (returns False)
+    x, o = bitboard.from_list(board)
+    return bitboard.has_won(x if player == 'X' else o)      #precomputed win masks instead of comparing strings over the 8 lines
 
 
 
 #5 parameters; The "depth" parameter provides a way to evaluate how soon a win/loss occurs. Quicker wins are preferable for the AI, while delayed losses are preferable for us.
 #is_maximizing is a boolean indicating whose turn it is(True for 'X'/Max and False for 'O'/Min)
-def minimax(board, depth, is_maximizing, alpha, beta):
+#"table" is the transposition table to use; by default the module-wide one is shared by all games
+#the list board is only an adapter here: the search itself runs on bitboards (see _minimax)
+def minimax(board, depth, is_maximizing, alpha, beta, table=None):
+    x, o = bitboard.from_list(board)
+    return _minimax(x, o, depth, is_maximizing, alpha, beta, transposition_table if table is None else table)
+
+
+def _minimax(x, o, depth, is_maximizing, alpha, beta, table):
     #FIRST, we check for and assign terminal utilities for the three terminal states: X wins, O wins, or it's a draw. In each case, a different terminal utility value will be assigned.
     #This is crucial for the recursion to work properly.
-     
-    if check_win(board, 'X'):
+
+    if probe is not None:
+        probe.count('nodes', depth=depth)
+
+    if bitboard.WINNING[x]:
         return 10 - depth       #higher terminal utility value for winning in few moves
 
-    if check_win (board, 'O'):
+    if bitboard.WINNING[o]:
         return depth - 10       #higher terminal utility for delaying the win for the opponent (and hoping it leads to our own win)
-         
-    if is_draw(board):
+
+    if (x | o) == bitboard.FULL_BOARD:
         return 0                #terminal utility value of 0 for a draw
-        
-    
+
+    key = (bitboard.canonical_key(x, o), is_maximizing)
+    entry = table.lookup(key)
+    if probe is not None:
+        probe.count('tt_misses' if entry is None else 'tt_hits', depth=depth)
+    if entry is not None:
+        value, flag = entry
+        value = from_table_value(value, depth)
+        if flag == EXACT:
+            return value
+        if flag == LOWER_BOUND:
+            alpha = max(alpha, value)
+        else:
+            beta = min(beta, value)
+        if alpha >= beta:           #the stored bound alone is enough to cut this node off
+            return value
+
+    alpha_orig, beta_orig = alpha, beta     #needed afterwards to tell whether best_val is exact or just a bound
+
     if is_maximizing:
         best_val = -math.inf
-        for i in range(9):
-            if board[i] == ' ':
-                board[i] = 'X'
-                utility_val = minimax(board, depth + 1, False, alpha, beta)
-                board[i] = ' '
-                best_val = max(best_val, utility_val)
-                alpha = max(alpha, best_val)
-                if alpha >= beta:
-                    break
-                
-        return best_val
-    
+        for i in bitboard.legal_moves(x, o):
+            utility_val = _minimax(x | 1 << i, o, depth + 1, False, alpha, beta, table)
+            best_val = max(best_val, utility_val)
+            alpha = max(alpha, best_val)
+            if alpha >= beta:
+                if probe is not None:
+                    probe.count('cutoffs', depth=depth)
+                break
+
     else:
         best_val = math.inf
-        for i in range(9):
-            if board[i] == ' ':
-                board[i] = 'O'
-                utility_val = minimax(board, depth + 1, True, alpha, beta)
-                board[i] = ' '
-                best_val = min(best_val, utility_val)
-                beta = min(beta, best_val)
+        for i in bitboard.legal_moves(x, o):
+            utility_val = _minimax(x, o | 1 << i, depth + 1, True, alpha, beta, table)
+            best_val = min(best_val, utility_val)
+            beta = min(beta, best_val)
+            if alpha >= beta:
+                if probe is not None:
+                    probe.count('cutoffs', depth=depth)
+                break
+
+    if best_val <= alpha_orig:
+        flag = UPPER_BOUND          #fail-low: the real utility is at most best_val
+    elif best_val >= beta_orig:
+        flag = LOWER_BOUND          #fail-high: the real utility is at least best_val
+    else:
+        flag = EXACT
+    table.store(key, to_table_value(best_val, depth), flag)
+
+    return best_val
+
+
+#negamax scores every position from the point of view of the player to move (score = -score of the opponent), so the maximizing and
+#minimizing branches of minimax collapse into one. Scores are the same 10 - depth / depth - 10 / 0 utilities, with the sign flipped on 'O' turns
+SCORE_BOUND = 100       #bigger than any utility; scores are ints, so null windows (alpha, alpha + 1) need finite bounds
+
+
+class NegamaxSearch:
+    #iterative deepening negamax with principal-variation search (PVS) and aspiration windows.
+    #After search(): value is the minimax utility of the position (same as minimax(board, 0, ...)), pv the expected best
+    #continuation (it stops early where a score came straight from the table), nodes the number of positions visited
+    #over all iterations.
+    #Scores are probed and stored in a TranspositionTable like minimax does (depth-relative, with exact/lower/upper
+    #flags), under keys of their own: the score is for the player to move, and a shallow iteration's score is only
+    #valid for its draft (the plies searched below the position). A score whose search never reached the horizon is
+    #the full game-tree value and is stored with the number of empty cells as its draft, so every later iteration
+    #reuses it. table defaults to the module-wide one
+    def __init__(self, aspiration=2, table=None):
+        self.aspiration = aspiration        #half-width of the window around the previous iteration's score
+        self.table = transposition_table if table is None else table
+        self.hash_moves = {}                #(me, opp) --> best move found so far; searched first next time
+        self.nodes = 0
+        self.horizon_hits = 0               #scores limited by a shallow iteration's horizon, see negamax()
+        self.value = None
+        self.pv = []
+
+    def _ordered_moves(self, me, opp):
+        moves = list(bitboard.legal_moves(me, opp))
+        hash_move = self.hash_moves.get((me, opp))
+        if hash_move is not None:
+            moves.remove(hash_move)
+            moves.insert(0, hash_move)
+        return moves
+
+    def negamax(self, me, opp, ply, depth_left, alpha, beta, pv):
+        #"me" is the player to move; pv receives the best line found from here
+        self.nodes += 1
+        if bitboard.WINNING[opp]:
+            return ply - 10             #the opponent's last move won
+        if (me | opp) == bitboard.FULL_BOARD:
+            return 0
+        if depth_left == 0:
+            self.horizon_hits += 1
+            return 0                    #horizon of a shallow iteration: treated like a draw
+
+        empty = 9 - (me | opp).bit_count()
+        canonical = bitboard.canonical_key(me, opp)
+        horizon_hits = self.horizon_hits
+        entry = self.table.lookup(('negamax', canonical, empty))    #a full-depth score is good for any draft
+        draft = min(depth_left, empty)
+        if entry is None and draft < empty:
+            entry = self.table.lookup(('negamax', canonical, draft))
+            if entry is not None:
+                self.horizon_hits += 1      #a shallow entry only exists because its search reached the horizon
+        if entry is not None:
+            value, flag = entry
+            value = from_table_value(value, ply)
+            if flag == EXACT:
+                return value
+            if flag == LOWER_BOUND:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if alpha >= beta:
+                return value
+        alpha_orig, beta_orig = alpha, beta
+
+        best = -SCORE_BOUND
+        first = True
+        for i in self._ordered_moves(me, opp):
+            child_pv = []
+            if first:
+                score = -self.negamax(opp, me | 1 << i, ply + 1, depth_left - 1, -beta, -alpha, child_pv)
+                first = False
+            else:
+                #the first move is expected to be the best one; only prove the others can't beat alpha with a null window
+                score = -self.negamax(opp, me | 1 << i, ply + 1, depth_left - 1, -alpha - 1, -alpha, child_pv)
+                if alpha < score < beta:        #it did beat alpha: re-search with the real window to get its exact score
+                    child_pv = []
+                    score = -self.negamax(opp, me | 1 << i, ply + 1, depth_left - 1, -beta, -alpha, child_pv)
+            if score > best:
+                best = score
+                if score > alpha:
+                    alpha = score
+                    pv[:] = [i] + child_pv
+                    self.hash_moves[me, opp] = i
                 if alpha >= beta:
                     break
-        
-        return best_val
 
+        if best <= alpha_orig:
+            flag = UPPER_BOUND
+        elif best >= beta_orig:
+            flag = LOWER_BOUND
+        else:
+            flag = EXACT
+        if self.horizon_hits == horizon_hits:
+            draft = empty               #every line below ended in a win or a full board: this is the full-depth score
+        self.table.store(('negamax', canonical, draft), to_table_value(best, ply), flag)
+        return best
+
+    def _search_root(self, me, opp, depth, alpha, beta):
+        #like best_move(), ties go to the lowest cell: a lower cell only has to reach the current best (null window at best - 1),
+        #a higher cell has to beat it (null window at best)
+        best, best_move, best_pv = -SCORE_BOUND, -1, []
+        for i in self._ordered_moves(me, opp):
+            child_pv = []
+            if best_move < 0:
+                score = -self.negamax(opp, me | 1 << i, 1, depth - 1, -beta, -alpha, child_pv)
+            else:
+                bound = alpha - 1 if i < best_move else alpha
+                score = -self.negamax(opp, me | 1 << i, 1, depth - 1, -bound - 1, -bound, child_pv)
+                if bound < score < beta:
+                    child_pv = []
+                    score = -self.negamax(opp, me | 1 << i, 1, depth - 1, -beta, -bound, child_pv)
+            if score > best or (score == best and i < best_move):
+                best, best_move, best_pv = score, i, [i] + child_pv
+                alpha = max(alpha, best)
+                if alpha >= beta:
+                    break
+        if best_move >= 0:
+            self.hash_moves[me, opp] = best_move
+        return best_move, best, best_pv
+
+    def search(self, board):
+        x, o = bitboard.from_list(board)
+        x_to_move = x.bit_count() == o.bit_count()
+        me, opp = (x, o) if x_to_move else (o, x)
+        empty = 9 - (x | o).bit_count()
+        self.nodes = 0
 
+        move, score, pv = -1, 0, []
+        if bitboard.WINNING[x] or bitboard.WINNING[o]:
+            empty = 0                   #game already over, nothing to search
+        #deepening two plies at a time, ending on the full depth: every iteration still seeds the next one's move order
+        #and aspiration window, but half of the shallow searches (which the table can't reuse) are skipped
+        for depth in range(2 - empty % 2, empty + 1, 2):
+            #aspiration window: assume the score stays close to the previous iteration's, and only fall back to the full window if it doesn't
+            alpha, beta = score - self.aspiration, score + self.aspiration
+            move, score, pv = self._search_root(me, opp, depth, alpha, beta)
+            if score <= alpha or score >= beta:
+                move, score, pv = self._search_root(me, opp, depth, -SCORE_BOUND, SCORE_BOUND)
 
-def best_move(board):
-    best_value = -math.inf          #since AI is going first, and thus maximizing its utility, we initialize best_value (initial utility) as - infinity and update it later as we get better values from the minimax algorithm
+        if move < 0:
+            score = self.negamax(me, opp, 0, 0, -SCORE_BOUND, SCORE_BOUND, pv)
+        self.value = score if x_to_move else -score
+        self.pv = pv
+        return move
+
+
+
+#the move for the player to move: 'X' when both have played as often (X moves first), otherwise 'O'. Both engines and the
+#perfect-play table pick the same move, the lowest cell among the best ones for that player.
+#engine='minimax' (default): minimax with the transposition table, one search per root move
+#engine='negamax': a single NegamaxSearch (PVS + aspiration windows) over the whole position, using the same table
+def best_move(board, table=None, engine='minimax'):
+    x, o = bitboard.from_list(board)
+    if perfect_play_table is not None:      #the table stores the move for the player to move
+        try:
+            move = perfect_play_table.best_move(x, o)
+            if move != perfect_play.NO_MOVE:
+                return move
+        except KeyError:            #not a position from a normal game, search it instead
+            pass
+
+    if engine == 'negamax':
+        return NegamaxSearch(table=table).search(board)
+
+    if table is None:
+        table = transposition_table
+
+    x_to_move = x.bit_count() == o.bit_count()
+    best_value = -math.inf          #the best utility for the player to move, as seen from their side
     move = -1                       #initialize the move(0 - 8) that AI will take once minimax is fully run
     
-    for i in range(9):              
-        if board[i] == ' ':         #loop will only iterate through the positions that are empty
-            board[i] = 'X'          #Putting 'X' in a position, simulating the rest of the game using minimax with the assumption that the opponent plays optimally, and computing the utility values
-            utility_value = minimax(board, 0, False, -math.inf, math.inf)
-            board[i] = ' '                     #VERY IMPORTANT; once we have run the "simulation" of putting 'X' in a particular position and running the minimax algorithm, we have to clear the board before assigning 'X' to a different
-            if utility_value > best_value:     # value and starting a new simulation.
-                best_value = utility_value
-                move = i
+    for i in bitboard.legal_moves(x, o):    #only the empty positions, in increasing order
+        #putting the mover's piece in a position and simulating the rest of the game using minimax with the assumption that the opponent plays optimally;
+        #the bitboards are ints, so "undoing" the move is free -- the board we pass down is a new value and ours is never touched
+        if x_to_move:
+            utility_value = _minimax(x | 1 << i, o, 0, False, -math.inf, math.inf, table)
+        else:
+            utility_value = -_minimax(x, o | 1 << i, 0, True, -math.inf, math.inf, table)     #'O' minimizes 'X's utility
+        if utility_value > best_value:
+            best_value = utility_value
+            move = i
     
     return move
     
 
 def tic_tac_toe():
     board = [' '] * 9       #initialize the playing board
+    load_perfect_play()     #O(1) moves if the table has been generated ('python perfect_play.py'), otherwise we search as usual
     print("Tic-Tac-Toe: AI('X') vs. Human('O')")
     print_board(board)      #print empty board
     
@@ -125,6 +417,5 @@ def tic_tac_toe():
                 break
 
 
-tic_tac_toe()
-                
-        
\ No newline at end of file
+if __name__ == '__main__':      #importing the module (benchmarks, worker processes) must not start a game
+    tic_tac_toe()
@@ -1,23 +1,54 @@
 import numpy as np
-import matplotlib.pyplot as plt
 import random
 
+import instrumentation
+import restarts
+
+
+probe = None        #an instrumentation.Probe to report steps, restarts and final costs to; None = no reporting
+
+
+def line_counts(state):
+    #how many queens are on every row, diagonal (row - col) and anti-diagonal (row + col); state[col] is the row of the queen in column col
+    n = len(state)
+    cols = np.arange(n)
+    rows = np.bincount(state, minlength=n)
+    diagonals = np.bincount(state - cols + n - 1, minlength=2 * n - 1)
+    anti_diagonals = np.bincount(state + cols, minlength=2 * n - 1)
+    return rows, diagonals, anti_diagonals
+
+
+def conflicts(state):
+    #number of attacking pairs: every line holding c queens contributes c * (c - 1) / 2 pairs
+    return int(sum((counts * (counts - 1)).sum() for counts in line_counts(state)) // 2)
+
+
+def move_costs(state):
+    #costs[col, row] = number of attacking pairs after moving the queen in column col to row (costs[col, state[col]] is the current cost),
+    #for all n * n one-queen moves at once, straight from the line counts instead of building and scoring a neighbor per move
+    n = len(state)
+    rows, diagonals, anti_diagonals = line_counts(state)
+    cols = np.arange(n)[:, None]
+    targets = np.arange(n)[None, :]
+    current = state[:, None]
+
+    #pairs the queen is part of where it stands now (minus 1 per line for the queen itself)
+    removed = rows[state] + diagonals[state - cols[:, 0] + n - 1] + anti_diagonals[state + cols[:, 0]] - 3
+    #pairs it would be part of on the target row; when the target is its own square the queen must not be counted against itself
+    added = rows[targets] + diagonals[targets - cols + n - 1] + anti_diagonals[targets + cols] - 3 * (targets == current)
+    return conflicts(state) - removed[:, None] + added
+
 
 class EightQueens:
     # self is a reference to the current instance of the class, allowing access to its attributes and methods.
     # __init__ is a special method that initializes the instance when it is created.
-    def __init__(self):     #Constructor to initialize the state of the board
-        self.state = np.random.permutation(8)  #Initialize with a random permutation of 8 queens
+    def __init__(self, state=None):     #Constructor to initialize the state of the board
+        if state is None:
+            state = np.random.permutation(8)  #Initialize with a random permutation of 8 queens
+        self.state = state
 
     def heuristic(self):
-        
-        attacks = 0
-        for i in range(8):  # for each queen
-            for j in range(i + 1, 8):   # check for each pair of queens
-                #same diagonal is calculated by checking if the absolute difference in rows is equal to the absolute difference in columns
-                if (abs(self.state[i] - self.state[j]) == j - i) or self.state[i] == self.state[j]:
-                    attacks += 1
-        return attacks
+        return conflicts(self.state)
 
     def get_neighbors(self):
         neighbors = []
@@ -26,45 +57,64 @@ class EightQueens:
                 if self.state[col] != row:  #to avoid moving the queen to its current position
                     new_state = self.state.copy() #create a copy of the current state
                     new_state[col] = row    #change the position of the queen in the column
-                    neighbors.append(EightQueens()) #new instance of EightQueens
-                    neighbors[-1].state = new_state #assign the new state to the new instance
+                    neighbors.append(EightQueens(new_state)) #new instance of EightQueens with the new state
         return neighbors #return all the generated neighbors
 
-    def hill_climb(self):
-        best_state = self #current instance
-        best_cost = self.heuristic() #current cost of the instance
+    #rng: where the random restarts come from (np.random, or a np.random.Generator for reproducible runs)
+    #history: if given, the best cost after every attempt is appended to it
+    #should_stop: if given, the climb gives up as soon as it returns True
+    def hill_climb(self, rng=np.random, history=None, should_stop=None):
+        state = self.state.copy() #current state
+        best_cost = conflicts(state) #current cost of the state
+        if history is not None:
+            history.append(best_cost)
         attempts = 0
         while best_cost > 0 and attempts < 1000:
-            neighbors = self.get_neighbors()
-            best_neighbor = min(neighbors, key=lambda x: x.heuristic())
-            if best_neighbor.heuristic() < best_cost:
-                best_state = best_neighbor
-                best_cost = best_neighbor.heuristic()
+            if should_stop is not None and should_stop():
+                break
+            costs = move_costs(state) #cost of every one-queen move in one pass, no neighbor objects
+            col, row = np.unravel_index(np.argmin(costs), costs.shape) #first best move, in the same order as get_neighbors()
+            if costs[col, row] < best_cost:
+                state[col] = row
+                best_cost = int(costs[col, row])
             else:
-                best_state = EightQueens()
-                best_cost = best_state.heuristic()
+                state = rng.permutation(8) #local minimum: random restart
+                best_cost = conflicts(state)
+                if probe is not None:
+                    probe.count('restarts', problem=instrumentation.EIGHT_QUEENS)
             attempts += 1
-        return best_state, best_cost
+            if history is not None:
+                history.append(best_cost)
+        if probe is not None:
+            probe.count('steps', attempts, problem=instrumentation.EIGHT_QUEENS)
+            probe.event('climb_cost', best_cost, problem=instrumentation.EIGHT_QUEENS)
+        return EightQueens(state), best_cost
+
+
+def eight_queens_restart(rng, history, should_stop):
+    #one independent hill climb, in the form restarts.run_restarts() expects
+    best_state, cost = EightQueens(rng.permutation(8)).hill_climb(rng, history, should_stop)
+    return cost
+
 
-# Running the algorithms for 1000 iterations and plotting
-iterations = 1000
+def main():
+    import matplotlib.pyplot as plt     #only needed for the plot, so importing the module stays cheap
 
-# For each iteration, we will store the best cost found as a list
-EQ_costs = []
+    # Running the algorithms for 1000 iterations and plotting
+    iterations = 1000
 
-for iteration in range(iterations):
-    # Creating a new instance of the classes EightQueens
-    eq_instance = EightQueens()
+    # Each iteration is an independent hill climb with its own random stream; they run in parallel on all cores,
+    # and for each iteration we get the best cost found
+    EQ_costs, EQ_histories = restarts.run_restarts(eight_queens_restart, iterations, seed=0)
 
-    # Running the hill climbing algorithm on the instance and appending the best cost found to the list
-    best_state, cost = eq_instance.hill_climb()
-    EQ_costs.append(cost)
+    # Plotting results
+    plt.plot(range(iterations), EQ_costs, label='8-Queens')
+    plt.xlabel('Iterations')
+    plt.ylabel('Best Cost')
+    plt.legend()
+    plt.title('Hill Climbing with Random Restart')
+    plt.show()
 
 
-# Plotting results
-plt.plot(range(iterations), EQ_costs, label='8-Queens')
-plt.xlabel('Iterations')
-plt.ylabel('Best Cost')
-plt.legend()
-plt.title('Hill Climbing with Random Restart')
-plt.show()
\ No newline at end of file
+if __name__ == '__main__':
+    main()
@@ -9,9 +9,9 @@ Task:
 • Compute the optimal state values and the optimal policy.
 • Clearly display the optimal policy as arrows indicating the best action for each state.'''
 
-import matplotlib.pyplot as plt
 import numpy as np
-import math
+
+import gridworld
 
 
 grid_size = 4
@@ -24,9 +24,6 @@ terminal_utility = 10
 gamma = 0.98
 threshold = 1e-6
 
-action_utilities = np.zeros((grid_size, grid_size, len(action_labels)))
-utils = np.zeros((grid_size, grid_size))
-
 arrow_directions = {'U': (0, 0.3), 'D': (0, -0.3), 'L': (-0.3, 0), 'R': (0.3, 0)}
 
 def is_valid(state):
@@ -43,75 +40,61 @@ def get_next_state(state, action):
     
     return state
 
-def value_iteration():
-    global action_utilities, utils
-
-    iterations = 0
-    utils[terminal] = terminal_utility
-
-    while True:
-        util_change = 0
-        iterations += 1
-
-        for i in range(grid_size):
-            for j in range(grid_size):
-                if (i, j) == terminal or (i, j) in obstacles:
-                    continue
-
-                max_summation = -math.inf
-
-                for action_index, a in enumerate(action_labels):
-                    summation = 0
+def build_model():
+    # the 4x4 grid above, compiled once into arrays (successor of every cell in every direction, slip probabilities);
+    # other maps can be read from a file with gridworld.compile_map(path)
+    return gridworld.GridWorld.from_cells(grid_size, obstacles, {terminal: terminal_utility}, reward, gamma,
+                                          action_labels=action_labels, actions=actions)
 
-                    intended_next_state = get_next_state((i, j), a)
-                    summation += 0.8 * utils[intended_next_state]
-                    
-                    
-                    if a in ['U', 'D']:
-                        left_state = get_next_state((i, j), 'L')
-                        right_state = get_next_state((i, j), 'R')
-                    else:
-                        left_state = get_next_state((i, j), 'U')
-                        right_state = get_next_state((i, j), 'D')
 
-                    summation += 0.1 * utils[left_state]
-                    summation += 0.1 * utils[right_state]
+def value_iteration(model=None):
+    # every sweep is a single vectorized Bellman backup, see gridworld.py. Returns the result (utils, action_utilities,
+    # iterations) instead of writing module globals, so solving several maps in one process is safe
+    if model is None:
+        model = build_model()
+    result = gridworld.value_iteration(model, threshold)
+    print("Converged in:", result.iterations, "iterations!")
+    return result
 
-                    action_util = reward + gamma * summation
-                    action_utilities[i, j, action_index] = action_util
 
-                    max_summation = max(max_summation, summation)
-
-                
-                state_util = reward + gamma * max_summation
-                util_change = max(util_change, abs(utils[i, j] - state_util))
-                utils[i, j] = state_util
-        
-        if util_change < threshold:
-            print("Converged in:", iterations, "iterations!")
-            break
-
-
-def plot(action_utilities):
+def plot(action_utilities, model=None, path=None):
     # Plotting utilities
+    if model is None:
+        model = build_model()
+    if path is not None:
+        # one heatmap and one quiver call saved straight to a file (PNG, SVG, ...), no display needed and fine for
+        # large maps, see gridworld_render.py
+        import gridworld_render
+        live = model.live.reshape(model.shape)
+        utils = np.where(live, action_utilities.max(axis=2), model.fixed_values.reshape(model.shape))
+        utils[model.blocked.reshape(model.shape)] = np.nan
+        policy = np.where(live, action_utilities.argmax(axis=2), -1)
+        gridworld_render.render(utils, policy, path, model.action_labels)
+        return
+    import matplotlib.pyplot as plt     # imported on first use: importing this module only to solve must stay cheap
+    rows, cols = model.shape
+    blocked = model.blocked.reshape(model.shape)
+    is_terminal = model.terminal.reshape(model.shape)
+    terminal_values = model.fixed_values.reshape(model.shape)
+
     fig, ax = plt.subplots(figsize=(8, 8))
-    ax.set_xlim(0, grid_size)
-    ax.set_ylim(0, grid_size)
-    ax.set_xticks(np.arange(0, grid_size, 1))
-    ax.set_yticks(np.arange(0, grid_size, 1))
+    ax.set_xlim(0, cols)
+    ax.set_ylim(0, rows)
+    ax.set_xticks(np.arange(0, cols, 1))
+    ax.set_yticks(np.arange(0, rows, 1))
     ax.grid(True)
 
-    for obs in obstacles:
-        obs_x, obs_y = obs[1], grid_size - obs[0] - 1
+    for obs in np.argwhere(blocked):
+        obs_x, obs_y = obs[1], rows - obs[0] - 1
         ax.add_patch(plt.Rectangle((obs_x, obs_y), 1, 1, color='gray', alpha=0.5))
 
-    for i in range(grid_size):
-        for j in range(grid_size):
-            if (i, j) in obstacles:
+    for i in range(rows):
+        for j in range(cols):
+            if blocked[i, j]:
                 continue
-            cell_x, cell_y = j, grid_size - i - 1
-            if (i, j) == terminal:
-                ax.text(cell_x + 0.5, cell_y + 0.5, f'{terminal_utility:.1f}', fontsize=12, ha='center', va='center',
+            cell_x, cell_y = j, rows - i - 1
+            if is_terminal[i, j]:
+                ax.text(cell_x + 0.5, cell_y + 0.5, f'{terminal_values[i, j]:.1f}', fontsize=12, ha='center', va='center',
                         color='blue', fontweight='bold')
                 continue
             ax.plot([cell_x, cell_x + 1], [cell_y, cell_y + 1], color='black', linewidth=0.5)
@@ -135,7 +118,12 @@ def plot(action_utilities):
 
     plt.show()
 
-# Call the updated gridworld function
-value_iteration()
-plot(action_utilities)
+def main():
+    model = build_model()
+    result = value_iteration(model)
+    plot(result.action_utilities, model)
+
+
+if __name__ == '__main__':
+    main()
 
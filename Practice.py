@@ -1,7 +1,7 @@
 "Implementing a tic-tac-toe game where the AI plays first, followed by input from the user. The AI uses the Minimax algorithm with Alpha-Beta pruning to compute the best"
 "next move, with the assumption that the user is playing optimally."
 
-import math
+import bitboard
 
 
 def print_board(board):
@@ -12,63 +12,20 @@ def print_board(board):
 
 
 def check_winner(board, player):
-    win_configurations = [(0, 1, 2), (3, 4, 5), (6, 7, 8), (0, 3, 6), (1, 4, 7), (2, 5, 8), (0, 4, 8), (2, 4, 6)]
-
-    return any(board[i] == board[j] == board[k] == player for i, j, k in win_configurations)
+    x, o = bitboard.from_list(board)
+    return bitboard.has_won(x if player == 'X' else o)
 
 def is_draw(board):
-    return all(board[i] != ' ' for i in range(9))
+    return bitboard.is_full(*bitboard.from_list(board))
 
 
 def minimax(board, depth, is_maximizing, alpha, beta):
-    if check_winner(board, 'X'):
-        return 10 - depth
-    
-    if check_winner(board, 'O'):
-        return depth - 10
-    
-    if is_draw(board):
-        return 0
-    
-    if is_maximizing:
-        best_utility = -math.inf
-        for i in range(9):
-            if(board[i] == ' '):
-                board[i] = 'X'
-                utility = minimax(board, depth + 1, False, alpha, beta)
-                board[i] = ' '
-                best_utility = max(best_utility, utility)
-                alpha = max(alpha, best_utility)
-                if (alpha >= beta):
-                    break
-        return best_utility
-    else:
-        best_utility = math.inf
-        for i in range(9):
-            if(board[i] == ' '):
-                board[i] = 'O'
-                utility = minimax(board, depth + 1, True, alpha, beta)
-                board[i] = ' '
-                best_utility = min(best_utility, utility)
-                beta = min(beta, best_utility)
-                if (alpha >= beta):
-                    break
-        return best_utility
+    x, o = bitboard.from_list(board)
+    return bitboard.minimax(x, o, depth, is_maximizing, alpha, beta)
 
 
 def best_move(board):
-    best_val = -math.inf
-    move = -1
-    for i in range(9):
-        if(board[i] == ' '):
-            board[i] = 'X'
-            utility_val = minimax(board, 0, False, -math.inf, math.inf)
-            board[i] = ' '
-            if utility_val > best_val: 
-                best_val = utility_val
-                move = i
-
-    return move
+    return bitboard.best_move(*bitboard.from_list(board))
 
 
 def tic_tac_toe():
@@ -109,7 +66,7 @@ def tic_tac_toe():
             if is_draw(board):
                 print("It's a Draw!")
                 break
-        
-            
 
-tic_tac_toe()
\ No newline at end of file
+
+if __name__ == '__main__':
+    tic_tac_toe()
@@ -1,126 +1,181 @@
 import numpy as np
-import matplotlib.pyplot as plt
 import random
 
+import nqueens
+import npuzzle
+import instrumentation
+import restarts
+
+
+probe = None    # an instrumentation.Probe to report steps, restarts and final costs to; None = no reporting
+
 
 class EightQueens:
     # self is a reference to the current instance of the class, allowing access to its attributes and methods.
     # __init__ is a special method that initializes the instance when it is created.
-    def __init__(self):     #Constructor to initialize the state of the board
-        self.state = np.random.permutation(8)  #Initialize with a random permutation of 8 queens
+    def __init__(self, size=8, rng=np.random):     #Constructor to initialize the state of the board; rng is np.random or a np.random.Generator
+        self.size = size
+        self.state = rng.permutation(size)  #Initialize with a random permutation of the queens
+
+    @classmethod
+    def from_state(cls, state):
+        # a board with the given queen rows, without drawing a random permutation first (like EightPuzzle.from_packed)
+        queens = cls.__new__(cls)
+        queens.size = len(state)
+        queens.state = state
+        return queens
 
     def heuristic(self):
-        
-        attacks = 0
-        for i in range(8):  # for each queen
-            for j in range(i + 1, 8):   # check for each pair of queens
-                #same diagonal is calculated by checking if the absolute difference in rows is equal to the absolute difference in columns
-                if (abs(self.state[i] - self.state[j]) == j - i) or self.state[i] == self.state[j]:
-                    attacks += 1
-        return attacks
+        # attacking pairs, counted per row/diagonal in O(n) instead of checking every pair of queens
+        return nqueens.conflicts(self.state)
 
     def get_neighbors(self):
         neighbors = []
-        for col in range(8):
-            for row in range(8):
+        for col in range(self.size):
+            for row in range(self.size):
                 if self.state[col] != row:  #to avoid moving the queen to its current position
                     new_state = self.state.copy()
                     new_state[col] = row
-                    neighbors.append(EightQueens())
-                    neighbors[-1].state = new_state
+                    neighbors.append(EightQueens.from_state(new_state))
         return neighbors
 
-    def hill_climb(self):
+    # rng: source of the random restarts; history: if given, the best cost after every attempt is appended to it;
+    # should_stop: if given, the climb gives up as soon as it returns True
+    def hill_climb(self, rng=np.random, history=None, should_stop=None):
         best_state = self
         best_cost = self.heuristic()
+        if history is not None:
+            history.append(best_cost)
         attempts = 0
         while best_cost > 0 and attempts < 1000:
-            neighbors = self.get_neighbors()
+            if should_stop is not None and should_stop():
+                break
+            neighbors = best_state.get_neighbors()      #neighbors of the current state, not of the one we started from
             best_neighbor = min(neighbors, key=lambda x: x.heuristic())
-            if best_neighbor.heuristic() < best_cost:
+            neighbor_cost = best_neighbor.heuristic()
+            if neighbor_cost < best_cost:
                 best_state = best_neighbor
-                best_cost = best_neighbor.heuristic()
+                best_cost = neighbor_cost
             else:
-                best_state = EightQueens()
+                best_state = EightQueens(self.size, rng)
                 best_cost = best_state.heuristic()
+                if probe is not None:
+                    probe.count('restarts', problem=instrumentation.EIGHT_QUEENS)
             attempts += 1
+            if history is not None:
+                history.append(best_cost)
+        if probe is not None:
+            probe.count('steps', attempts, problem=instrumentation.EIGHT_QUEENS)
+            probe.event('climb_cost', best_cost, problem=instrumentation.EIGHT_QUEENS)
         return best_state, best_cost
 
 # 8-Puzzle problem
+# The state is one int with 4 bits per tile (npuzzle.pack), plus the cached position of the blank; moves come from the
+# precomputed shift/mask table in npuzzle.MoveTable, so a neighbor is a couple of integer operations and no array copies
 class EightPuzzle:
-    def __init__(self, state=None):
-        self.goal = np.array([[1, 2, 3], [4, 5, 6], [7, 8, 0]])
-        if state is None:
-            self.state = self.shuffle()
-        else:
-            self.state = state
+    __slots__ = ('packed', 'blank')
 
-    def shuffle(self):
-        state = np.array(self.goal).flatten()
-        np.random.shuffle(state)
+    MOVES = npuzzle.move_table(3)
+    GOAL = MOVES.goal
+
+    def __init__(self, state=None, rng=np.random):
+        if state is None:
+            state = self.shuffle(rng)
+        state = npuzzle.as_state(state)
+        self.packed = npuzzle.pack(state)
+        self.blank = state.index(0)
+
+    @classmethod
+    def from_packed(cls, packed, blank):
+        puzzle = cls.__new__(cls)
+        puzzle.packed = packed
+        puzzle.blank = blank
+        return puzzle
+
+    @property
+    def state(self):
+        return np.array(npuzzle.unpack(self.packed, 9)).reshape((3, 3))
+
+    @property
+    def goal(self):
+        return np.array(npuzzle.unpack(self.GOAL, 9)).reshape((3, 3))
+
+    def shuffle(self, rng=np.random):
+        state = np.array(npuzzle.goal_state(3))
+        rng.shuffle(state)
+        if not npuzzle.is_solvable(state):
+            # half of all permutations can't reach the goal; swapping two tiles (not the blank) flips the parity
+            a, b = np.flatnonzero(state)[:2]
+            state[a], state[b] = state[b], state[a]
         return state.reshape((3, 3))
 
     def heuristic(self):
-        misplaced = 0
-        for x in range(3):
-            for y in range(3):
-                val = self.state[x, y]
-                if val != 0 and val != self.goal[x, y]:
-                    misplaced += 1
-        return misplaced
+        # misplaced tiles: the nibbles that differ from the goal, minus the blank's own cell (the blank doesn't count)
+        diff = self.packed ^ self.GOAL
+        diff = (diff | diff >> 1 | diff >> 2 | diff >> 3) & 0x111111111
+        return diff.bit_count() - (self.blank != 8)
 
     def get_neighbors(self):
-        neighbors = []
-        x, y = np.argwhere(self.state == 0)[0]
-        for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-            nx, ny = x + dx, y + dy
-            if 0 <= nx < 3 and 0 <= ny < 3:
-                new_state = self.state.copy()
-                new_state[x, y], new_state[nx, ny] = new_state[nx, ny], new_state[x, y]
-                neighbors.append(EightPuzzle(new_state))
-        return neighbors
+        return [EightPuzzle.from_packed(child, blank) for child, blank in self.MOVES.neighbors(self.packed, self.blank)]
 
-    def hill_climb(self):
+    # same optional arguments as EightQueens.hill_climb
+    def hill_climb(self, rng=np.random, history=None, should_stop=None):
         best_state = self
         best_cost = self.heuristic()
+        if history is not None:
+            history.append(best_cost)
         attempts = 0
         while best_cost > 0 and attempts < 1000:
-            neighbors = self.get_neighbors()
+            if should_stop is not None and should_stop():
+                break
+            neighbors = best_state.get_neighbors()      #neighbors of the current state, not of the one we started from
             best_neighbor = min(neighbors, key=lambda x: x.heuristic())
-            if best_neighbor.heuristic() < best_cost:
+            neighbor_cost = best_neighbor.heuristic()
+            if neighbor_cost < best_cost:
                 best_state = best_neighbor
-                best_cost = best_neighbor.heuristic()
+                best_cost = neighbor_cost
             else:
-                best_state = EightPuzzle()
+                best_state = EightPuzzle(rng=rng)
                 best_cost = best_state.heuristic()
+                if probe is not None:
+                    probe.count('restarts', problem=instrumentation.EIGHT_PUZZLE)
             attempts += 1
+            if history is not None:
+                history.append(best_cost)
+        if probe is not None:
+            probe.count('steps', attempts, problem=instrumentation.EIGHT_PUZZLE)
+            probe.event('climb_cost', best_cost, problem=instrumentation.EIGHT_PUZZLE)
         return best_state, best_cost
 
-# Running the algorithms for 1000 iterations and plotting
-iterations = 1000
-
-# For each iteration, we will store the best cost found as a list
-EQ_costs = []
-EP_costs = []
-
-for iteration in range(iterations):
-    # Creating a new instance of the classes EightQueens and EightPuzzle
-    eq_instance = EightQueens()
-
-    # Running the hill climbing algorithm on the instance and appending the best cost found to the list
-    best_state, cost = eq_instance.hill_climb()
-    EQ_costs.append(cost)
-
-    # 8-Puzzle
-    ep_instance = EightPuzzle()
-    best_state, cost = ep_instance.hill_climb()
-    EP_costs.append(cost)
-
-# Plotting results
-plt.plot(range(iterations), EQ_costs, label='8-Queens')
-plt.plot(range(iterations), EP_costs, label='8-Puzzle')
-plt.xlabel('Iterations')
-plt.ylabel('Best Cost')
-plt.legend()
-plt.title('Hill Climbing with Random Restart')
-plt.show()
+# One independent hill climb per restart, in the form restarts.run_restarts() expects
+def eight_queens_restart(rng, history, should_stop):
+    best_state, cost = EightQueens(rng=rng).hill_climb(rng, history, should_stop)
+    return cost
+
+def eight_puzzle_restart(rng, history, should_stop):
+    best_state, cost = EightPuzzle(rng=rng).hill_climb(rng, history, should_stop)
+    return cost
+
+def main():
+    import matplotlib.pyplot as plt     #only needed for the plot, so importing the module stays cheap
+
+    # Running the algorithms for 1000 iterations and plotting
+    iterations = 1000
+
+    # Each iteration is an independent hill climb with its own random stream; they run in parallel on all cores,
+    # and for each iteration we get the best cost found
+    EQ_costs, EQ_histories = restarts.run_restarts(eight_queens_restart, iterations, seed=0)
+    EP_costs, EP_histories = restarts.run_restarts(eight_puzzle_restart, iterations, seed=1)
+
+    # Plotting results
+    plt.plot(range(iterations), EQ_costs, label='8-Queens')
+    plt.plot(range(iterations), EP_costs, label='8-Puzzle')
+    plt.xlabel('Iterations')
+    plt.ylabel('Best Cost')
+    plt.legend()
+    plt.title('Hill Climbing with Random Restart')
+    plt.show()
+
+
+if __name__ == '__main__':
+    main()
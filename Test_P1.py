@@ -1,4 +1,7 @@
-import math
+import argparse
+
+import bitboard
+import parallel_search
 
 def print_board(board):
     for i in range(0, 9, 3):
@@ -6,65 +9,32 @@ def print_board(board):
     print()
 
 def check_winner(board, player):
-    win_conditions = [(0,1,2), (3,4,5), (6,7,8), (0,3,6), (1,4,7), (2,5,8), (0,4,8), (2,4,6)]
-    return any(board[i] == board[j] == board[k] == player for i, j, k in win_conditions)
+    x, o = bitboard.from_list(board)
+    return bitboard.has_won(x if player == 'X' else o)
 
 def is_draw(board):
-    return all(cell != ' ' for cell in board)
+    return bitboard.is_full(*bitboard.from_list(board))
 
 def minimax(board, depth, is_maximizing, alpha, beta):
-    if check_winner(board, 'X'):
-        return 10 - depth
-    if check_winner(board, 'O'):
-        return depth - 10
-    if is_draw(board):
-        return 0
-    
-    if is_maximizing:
-        max_eval = -math.inf
-        for i in range(9):
-            if board[i] == ' ':
-                board[i] = 'X'
-                eval = minimax(board, depth + 1, False, alpha, beta)
-                board[i] = ' '
-                max_eval = max(max_eval, eval)
-                alpha = max(alpha, eval)
-                if beta <= alpha:
-                    break
-        return max_eval
-    else:
-        min_eval = math.inf
-        for i in range(9):
-            if board[i] == ' ':
-                board[i] = 'O'
-                eval = minimax(board, depth + 1, True, alpha, beta)
-                board[i] = ' '
-                min_eval = min(min_eval, eval)
-                beta = min(beta, eval)
-                if beta <= alpha:
-                    break
-        return min_eval
+    x, o = bitboard.from_list(board)
+    return bitboard.minimax(x, o, depth, is_maximizing, alpha, beta)
 
-def best_move(board):
-    best_val = -math.inf
-    move = -1
-    for i in range(9):
-        if board[i] == ' ':
-            board[i] = 'X'
-            move_val = minimax(board, 0, False, -math.inf, math.inf)
-            board[i] = ' '
-            if move_val > best_val:
-                best_val = move_val
-                move = i
-    return move
+#search: an optional parallel_search.RootSplitSearch that splits the root moves across its worker processes; the chosen
+#move is the same as with the serial search. Create it once and pass it to every call, its pool lives as long as it does
+def best_move(board, search=None):
+    x, o = bitboard.from_list(board)
+    if search is not None:
+        return search.best_move(x, o)
+    return bitboard.best_move(x, o)
 
-def tic_tac_toe():
+def tic_tac_toe(workers=1):
+    search = parallel_search.RootSplitSearch(workers) if workers > 1 else None     #one worker pool for the whole game
     board = [' '] * 9
     print("Tic-Tac-Toe: AI (X) vs. Human (O)")
     print_board(board)
     
     while True:
-        ai_move = best_move(board)
+        ai_move = best_move(board, search)
         board[ai_move] = 'X'
         print("AI chooses position:", ai_move + 1)
         print_board(board)
@@ -96,4 +66,15 @@ def tic_tac_toe():
             print("It's a draw!")
             break
 
-tic_tac_toe()
+    if search:
+        search.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Tic-Tac-Toe: AI (X) vs. Human (O).")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="processes to split the AI's root moves across (1 = serial search)")
+    args = parser.parse_args()
+    tic_tac_toe(args.workers)
+
+if __name__ == '__main__':      #the worker processes may import this module, they must not start a game
+    main()
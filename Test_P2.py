@@ -1,4 +1,9 @@
+import argparse
+import json
 import math
+import sys
+
+import bitboard
 
 def print_board(board):
     for i in range(0, 9, 3):
@@ -8,57 +13,99 @@ def print_board(board):
     print()
 
 def check_winner(board, player):
-    win_conditions = [(0,1,2), (3,4,5), (6,7,8), (0,3,6), (1,4,7), (2,5,8), (0,4,8), (2,4,6)]
-    return any(board[i] == board[j] == board[k] == player for i, j, k in win_conditions)
+    x, o = bitboard.from_list(board)
+    return bitboard.has_won(x if player == 'X' else o)
 
 def is_draw(board):
-    return all(cell != ' ' for cell in board)
+    return bitboard.is_full(*bitboard.from_list(board))
 
 def minimax(board, depth, is_maximizing, alpha, beta):
-    if check_winner(board, 'X'):              #Checking for terminal states and assigning utility 
-        return 10 - depth                     #  values to them. The recursion stops as soon as any of  
-    if check_winner(board, 'O'):              #  these conditions are met, and the corresponding utility
-        return depth - 10                     #  value is returned.
-    if is_draw(board):
-        return 0
-    
-    if is_maximizing:
-        max_eval = -math.inf
-        for i in range(9):
-            if board[i] == ' ':
-                board[i] = 'X'
-                eval = minimax(board, depth + 1, False, alpha, beta)
-                board[i] = ' '
-                max_eval = max(max_eval, eval)
-                alpha = max(alpha, eval)
-                if beta <= alpha:
-                    break
-        return max_eval
-    else:
-        min_eval = math.inf
-        for i in range(9):
-            if board[i] == ' ':
-                board[i] = 'O'
-                evals = minimax(board, depth + 1, True, alpha, beta)
-                board[i] = ' '
-                min_eval = min(min_eval, evals)
-                beta = min(beta, evals)
-                if beta <= alpha:
-                    break
-        return min_eval
+    x, o = bitboard.from_list(board)
+    return bitboard.minimax(x, o, depth, is_maximizing, alpha, beta)
 
 def best_move(board):
-    best_val = -math.inf
-    move = -1
-    for i in range(9):
-        if board[i] == ' ':
-            board[i] = 'X'
-            move_val = minimax(board, 0, False, -math.inf, math.inf)   #is_maximizing is set to False because once AI picks its move, the next turn is ours (minimizing).
-            board[i] = ' '     #Undoing the move (backtracking); Done to reset the board after checking the move
-            if move_val > best_val:
-                best_val = move_val
-                move = i
-    return move
+    return bitboard.best_move(*bitboard.from_list(board))
+
+# ---- Batch analysis: score many positions without the interactive game ----
+
+EMPTY_CELLS = ' .-_'    #accepted spellings of an empty cell in position strings
+
+#position: a 9-character string like 'X O  O  X' / 'X.O..O..X', or a list of 9 cells --> list board
+def parse_position(position):
+    cells = [' ' if isinstance(cell, str) and len(cell) == 1 and cell in EMPTY_CELLS else cell for cell in position]
+    if len(cells) != 9 or any(cell not in (' ', 'X', 'O') for cell in cells):
+        raise ValueError(f"not a tic-tac-toe position: {position!r}")
+    check_position(*bitboard.from_list(cells))
+    return cells
+
+#raises ValueError unless the position can come up in a game where 'X' moves first: X has played as often as O or
+#once more, at most one player has a line, and a player with a line made the last move (so isn't the one to move)
+def check_position(x, o):
+    if x & o or (x | o) > bitboard.FULL_BOARD:
+        raise ValueError(f"not a tic-tac-toe position: X {x:#x}, O {o:#x}")
+    board = ''.join(bitboard.to_list(x, o))
+    x_count, o_count = x.bit_count(), o.bit_count()
+    if x_count - o_count not in (0, 1):
+        raise ValueError(f"impossible move counts (X: {x_count}, O: {o_count}): {board!r}")
+    x_to_move = x_count == o_count
+    if bitboard.WINNING[x] and bitboard.WINNING[o]:
+        raise ValueError(f"both players have a line: {board!r}")
+    if bitboard.WINNING[x] and x_to_move or bitboard.WINNING[o] and not x_to_move:
+        raise ValueError(f"the player to move already has a line: {board!r}")
+
+#exact minimax(board, 0, ...) utility of a position, from X's point of view whoever is to move ('X' moves first and
+#is maximizing, so positive means X wins). cache maps canonical position keys to utilities, so symmetric positions
+#share one entry. Raises ValueError for positions no game can reach (see check_position)
+def solve(x, o, cache):
+    check_position(x, o)
+    return _solve(x, o, cache)
+
+#solve() without the check: every position reached from a valid one is valid
+def _solve(x, o, cache):
+    key = bitboard.canonical_key(x, o)
+    value = cache.get(key)
+    if value is None:
+        value = cache[key] = bitboard.minimax(x, o, 0, x.bit_count() == o.bit_count(), -math.inf, math.inf)
+    return value
+
+#utility (as in solve()) and best move (0-8, lowest cell among ties, None once the game is over) for the player to move
+def analyze_position(position, cache):
+    board = parse_position(position)
+    x, o = bitboard.from_list(board)
+    x_to_move = x.bit_count() == o.bit_count()
+    move = None
+    if not (bitboard.WINNING[x] or bitboard.WINNING[o] or (x | o) == bitboard.FULL_BOARD):
+        best = None
+        for i in bitboard.legal_moves(x, o):
+            utility = _solve(x | 1 << i, o, cache) if x_to_move else _solve(x, o | 1 << i, cache)
+            if best is None or (utility > best if x_to_move else utility < best):
+                best, move = utility, i
+    return {'board': ''.join(board), 'to_move': 'X' if x_to_move else 'O', 'value': _solve(x, o, cache), 'best_move': move}
+
+#analyze_position() for every position in an iterable; one cache is shared by the whole batch
+def analyze(positions, cache=None):
+    if cache is None:
+        cache = {}
+    for position in positions:
+        yield analyze_position(position, cache)
+
+#analyzes a JSONL stream. Each line is a position or an object with a "board" key; every output object echoes the
+#input object plus value/best_move, or carries an "error" key if the line can't be analyzed
+def analyze_jsonl(lines, cache=None):
+    if cache is None:
+        cache = {}
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                record = {'board': record}
+            result = dict(record)
+            result.update(analyze_position(record['board'], cache))
+        except (ValueError, KeyError, TypeError) as error:
+            result = {'input': line.rstrip('\n'), 'error': str(error)}
+        yield result
 
 def tic_tac_toe():
     board = [' '] * 9       #board is a 1D array with 9 empty strings initially; indexed 0-8
@@ -98,4 +145,18 @@ def tic_tac_toe():
             print("It's a draw!")
             break
 
-tic_tac_toe()
+def main():
+    parser = argparse.ArgumentParser(description="Tic-Tac-Toe: AI (X) vs. Human (O), or batch analysis of positions.")
+    parser.add_argument('--analyze', action='store_true', help="read positions as JSONL and write value/best_move as JSONL")
+    parser.add_argument('input', nargs='?', type=argparse.FileType('r'), default=sys.stdin)
+    parser.add_argument('output', nargs='?', type=argparse.FileType('w'), default=sys.stdout)
+    args = parser.parse_args()
+
+    if args.analyze:
+        for result in analyze_jsonl(args.input):
+            args.output.write(json.dumps(result) + '\n')
+    else:
+        tic_tac_toe()
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,23 @@
+import argparse
+from collections import deque
+import functools
+import math
 import random
-import matplotlib.pyplot as plt
+import statistics
+import time
+
+import instrumentation
+import nqueens
+import npuzzle
+
+probe = None  # An instrumentation.Probe to report restarts, steps and final costs to; None means no reporting.
+PROBLEM_LABELS = {"8-Queens": instrumentation.EIGHT_QUEENS, "8-Puzzle": instrumentation.EIGHT_PUZZLE}
+
+def problemLabel(problem):
+    """
+    Label the probe reports a problem under, the same one the other modules use.
+    """
+    return PROBLEM_LABELS.get(problem, problem.lower())
 
 # Generic function to generate a random state for both 8-Queens and 8-Puzzle
 def generateRandomState(size, isQueens=True):
@@ -19,11 +37,7 @@ def calculateHeuristic(state, goalState=None, isQueens=True):
     Calculate the heuristic cost for a given state.
     """
     if isQueens:
-        conflicts = sum(
-            state[i] == state[j] or abs(state[i] - state[j]) == abs(i - j)
-            for i in range(len(state)) for j in range(i + 1, len(state))
-        ) #The sum function iterates over all unique pairs of queens (i, j) and counts conflicts.
-        return conflicts
+        return nqueens.conflicts(state) #Counts queens per row/diagonal in O(n) instead of checking all O(n^2) pairs of queens.
     else:
         return sum(1 for i in range(len(state)) if state[i] != goalState[i] and state[i] != 0) #It counts the number of tiles that are not in their correct position compared to the goal state.
 
@@ -34,15 +48,20 @@ def hillClimb(problem, calculateHeuristic, generateRandomState, getNeighbors, go
     restartCount = 10
     bestCosts = []
    
-    for _ in range(restartCount):
+    for restart in range(restartCount):
+        if probe is not None and restart > 0:
+            probe.count("restarts", problem=problemLabel(problem)) # every run after the first starts from a fresh random state.
         state = generateRandomState(size, isQueens)
         bestCost = calculateHeuristic(state, goalState, isQueens)
         bestCostsRestart = [bestCost]
        
         for _ in range(maxIterations):
-            neighbors = getNeighbors(state)  
-            bestNeighbor = min(neighbors, key=lambda s: calculateHeuristic(s, goalState, isQueens)) # The lambda function calculates the heuristic for each neighbor, and min() returns the neighbor with the smallest heuristic value.
-            newCost = calculateHeuristic(bestNeighbor, goalState, isQueens)
+            if probe is not None:
+                probe.count("steps", problem=problemLabel(problem))
+            neighbors = getNeighbors(state)
+            # Scores every neighbor once; min() keeps the first one with the smallest heuristic value, and its value.
+            newCost, bestNeighbor = min(((calculateHeuristic(s, goalState, isQueens), s) for s in neighbors),
+                                        key=lambda candidate: candidate[0])
            
             if newCost < bestCost:
                 state, bestCost = bestNeighbor, newCost
@@ -53,17 +72,20 @@ def hillClimb(problem, calculateHeuristic, generateRandomState, getNeighbors, go
                 break
        
         bestCosts.extend(bestCostsRestart)
+        if probe is not None:
+            probe.event("climb_cost", bestCost, problem=problemLabel(problem))
    
     return state, bestCosts
 
-# 8-Queens Neighbors Function
+# N-Queens Neighbors Function (the board size is taken from the state, 8 for the 8-Queens problem)
 def neighbors8Queens(state):
     """
     Generate all neighboring states by moving one queen per column to a different row.
     """
+    size = len(state)
     neighbors = []
-    for col in range(8):
-        for row in range(8):
+    for col in range(size):
+        for row in range(size):
             if state[col] != row:
                 newState = state[:]
                 newState[col] = row # creating a new neighboring state for the 8-Queens problem.
@@ -89,11 +111,220 @@ def neighbors8Puzzle(state):
             neighbors.append(newState)
     return neighbors
 
+# Random state that is guaranteed to be solvable (for the 8-Puzzle half of all random states can't reach the goal)
+def generateSolvableState(size, isQueens=True):
+    """
+    Same as generateRandomState, but for the 8-Puzzle, swap two tiles if needed so that the goal can be reached.
+    """
+    state = generateRandomState(size, isQueens)
+    if not isQueens and not npuzzle.is_solvable(state):
+        a, b = [i for i, tile in enumerate(state) if tile != 0][:2]
+        state[a], state[b] = state[b], state[a] # swapping two tiles (not the blank) flips the parity.
+    return state
+
+# Random Neighbor Functions: one neighbor drawn uniformly, without building the whole neighbor list
+def randomNeighbor8Queens(state):
+    """
+    Move one random queen to a different random row of its column.
+    """
+    size = len(state)
+    col = random.randrange(size)
+    row = random.randrange(size - 1)
+    if row >= state[col]:
+        row += 1 # skipping the queen's current row keeps every other row equally likely.
+    newState = state[:]
+    newState[col] = row
+    return newState
+
+def randomNeighbor8Puzzle(state):
+    """
+    Slide a random tile next to the blank space into it.
+    """
+    zeroPos = state.index(0)
+    row, col = divmod(zeroPos, 3)
+    movesDirection = [(rowChange, colChange) for rowChange, colChange in [(-1, 0), (1, 0), (0, -1), (0, 1)]
+                      if 0 <= row + rowChange < 3 and 0 <= col + colChange < 3]
+    rowChange, colChange = random.choice(movesDirection)
+    newZeroPos = (row + rowChange) * 3 + col + colChange
+    newState = state[:]
+    newState[zeroPos], newState[newZeroPos] = newState[newZeroPos], newState[zeroPos]
+    return newState
+
+# Cooling Schedules for Simulated Annealing: step -> temperature
+def exponentialCooling(initialTemperature=2.0, alpha=0.999):
+    return lambda step: initialTemperature * alpha ** step
+
+def linearCooling(initialTemperature=2.0, maxSteps=20000):
+    return lambda step: max(initialTemperature * (1 - step / maxSteps), 1e-9)
+
+def logarithmicCooling(initialTemperature=2.0):
+    return lambda step: initialTemperature / math.log(step + 2)
+
+# Simulated Annealing
+def simulatedAnnealing(problem, calculateHeuristic, generateRandomState, getRandomNeighbor, goalState=None, size=None,
+                       isQueens=True, cooling=None, maxSteps=20000):
+    """
+    Evaluate one random neighbor per step: always take it when it is no worse, and take a worse one with probability
+    exp(-increase / temperature). Returns the best state seen and the best cost after every step.
+    """
+    cooling = cooling or exponentialCooling()
+    state = generateRandomState(size, isQueens)
+    cost = calculateHeuristic(state, goalState, isQueens)
+    bestState, bestCost = state, cost
+    bestCosts = [bestCost]
+
+    for step in range(maxSteps):
+        if bestCost == 0:
+            break
+        candidate = getRandomNeighbor(state)
+        candidateCost = calculateHeuristic(candidate, goalState, isQueens)
+        increase = candidateCost - cost
+        if increase <= 0 or random.random() < math.exp(-increase / cooling(step)):
+            state, cost = candidate, candidateCost
+            if cost < bestCost:
+                bestState, bestCost = state, cost
+        bestCosts.append(bestCost)
+
+    if probe is not None:
+        probe.count("steps", len(bestCosts) - 1, problem=problemLabel(problem))
+        probe.event("climb_cost", bestCost, problem=problemLabel(problem))
+    return bestState, bestCosts
+
+# Tabu Search
+def tabuSearch(problem, calculateHeuristic, generateRandomState, getNeighbors, goalState=None, size=None, isQueens=True,
+               tabuTenure=50, maxSteps=2000):
+    """
+    Move to the best neighbor that isn't tabu, even when it is worse, so the search walks out of local minima. The last
+    tabuTenure states visited are tabu; they are kept in a dict from state tuple to the step it was last visited
+    (constant-time lookups) with a queue of (step, state) visits giving the order in which they expire. Revisiting a
+    state leaves its older visit in the queue; it is skipped when it reaches the front, so every step is O(1). When
+    every neighbor is tabu, the search moves to the one whose tabu expires first instead of giving up, which matters
+    on the 8-Puzzle's 2-4 neighbors.
+    """
+    state = generateRandomState(size, isQueens)
+    cost = calculateHeuristic(state, goalState, isQueens)
+    bestState, bestCost = state, cost
+    bestCosts = [bestCost]
+    tabuSince = {tuple(state): 0}
+    tabuQueue = deque([(0, tuple(state))])
+
+    for step in range(1, maxSteps + 1):
+        if bestCost == 0:
+            break
+        neighbors = list(getNeighbors(state))
+        candidates = [(calculateHeuristic(neighbor, goalState, isQueens), neighbor)
+                      for neighbor in neighbors if tuple(neighbor) not in tabuSince]
+        if candidates:
+            cost, state = min(candidates, key=lambda candidate: candidate[0])
+        else:
+            state = min(neighbors, key=lambda neighbor: tabuSince[tuple(neighbor)]) # the oldest tabu state.
+            cost = calculateHeuristic(state, goalState, isQueens)
+        key = tuple(state)
+        tabuSince[key] = step
+        tabuQueue.append((step, key))
+        while len(tabuSince) > tabuTenure:
+            visited, expired = tabuQueue.popleft()
+            if tabuSince[expired] == visited: # otherwise the state was visited again since, and stays tabu.
+                del tabuSince[expired]
+        if cost < bestCost:
+            bestState, bestCost = state, cost
+        bestCosts.append(bestCost)
+
+    if probe is not None:
+        probe.count("steps", len(bestCosts) - 1, problem=problemLabel(problem))
+        probe.event("climb_cost", bestCost, problem=problemLabel(problem))
+    return bestState, bestCosts
+
+# Late-Acceptance Hill Climbing
+def lateAcceptance(problem, calculateHeuristic, generateRandomState, getRandomNeighbor, goalState=None, size=None,
+                   isQueens=True, historyLength=50, maxSteps=20000):
+    """
+    Evaluate one random neighbor per step and accept it when it is no worse than the current cost or than the cost
+    historyLength steps ago, so there is no temperature to tune.
+    """
+    state = generateRandomState(size, isQueens)
+    cost = calculateHeuristic(state, goalState, isQueens)
+    bestState, bestCost = state, cost
+    bestCosts = [bestCost]
+    lateCosts = [cost] * historyLength
+
+    for step in range(maxSteps):
+        if bestCost == 0:
+            break
+        candidate = getRandomNeighbor(state)
+        candidateCost = calculateHeuristic(candidate, goalState, isQueens)
+        slot = step % historyLength
+        if candidateCost <= cost or candidateCost <= lateCosts[slot]:
+            state, cost = candidate, candidateCost
+            if cost < bestCost:
+                bestState, bestCost = state, cost
+        lateCosts[slot] = cost
+        bestCosts.append(bestCost)
+
+    if probe is not None:
+        probe.count("steps", len(bestCosts) - 1, problem=problemLabel(problem))
+        probe.event("climb_cost", bestCost, problem=problemLabel(problem))
+    return bestState, bestCosts
+
+# Time-to-Solution
+def timeToSolution(solve, runs=100, seed=0):
+    """
+    Run solve() (an engine with its arguments bound, returning (state, bestCosts)) runs times, with the random module
+    seeded differently for every run. Returns the wall time of every run that reached cost 0, and the number of runs.
+    hillClimb always runs all its restarts, even after one of them has solved the problem, so its times include those.
+    """
+    times = []
+    for run in range(runs):
+        random.seed(seed + run)
+        start = time.perf_counter()
+        state, bestCosts = solve()
+        elapsed = time.perf_counter() - start
+        if min(bestCosts) == 0:
+            times.append(elapsed)
+    return times, runs
+
+def summarizeTimes(times, runs):
+    """
+    Success rate and the median, 90th percentile and worst time to solution (in milliseconds) of the solved runs.
+    """
+    if not times:
+        return f"solved {0:>3}/{runs}"
+    times = sorted(times)
+    p90 = times[min(len(times) - 1, math.ceil(0.9 * len(times)) - 1)]
+    return (f"solved {len(times):>3}/{runs}, median {statistics.median(times) * 1000:8.2f} ms, "
+            f"p90 {p90 * 1000:8.2f} ms, max {times[-1] * 1000:8.2f} ms")
+
+def compareEngines(runs=100, seed=0):
+    """
+    Time-to-solution of every engine on both problems. The 8-Puzzle runs start from solvable states only, and its
+    misplaced-tiles landscape is much flatter than the 8-Queens one, so the other engines get longer runs there, with
+    slower cooling/acceptance and a tabu list long enough that tabu search doesn't keep circling the same plateau.
+    """
+    goalState8Puzzle = [1, 2, 3, 4, 5, 6, 7, 8, 0]
+    problems = [("8-Queens", neighbors8Queens, randomNeighbor8Queens, None, 8, True, {}, {}, {}),
+                ("8-Puzzle", neighbors8Puzzle, randomNeighbor8Puzzle, goalState8Puzzle, 9, False,
+                 {"cooling": linearCooling(1.0, 100000), "maxSteps": 100000},
+                 {"tabuTenure": 5000, "maxSteps": 100000},
+                 {"historyLength": 1000, "maxSteps": 100000})]
+    for (problem, getNeighbors, getRandomNeighbor, goalState, size, isQueens, annealingOptions, tabuOptions,
+         lateOptions) in problems:
+        engines = {
+            "hillClimb": (hillClimb, getNeighbors, {}),
+            "simulatedAnnealing": (simulatedAnnealing, getRandomNeighbor, annealingOptions),
+            "tabuSearch": (tabuSearch, getNeighbors, tabuOptions),
+            "lateAcceptance": (lateAcceptance, getRandomNeighbor, lateOptions),
+        }
+        for name, (engine, neighborFunction, options) in engines.items():
+            solve = functools.partial(engine, problem, calculateHeuristic, generateSolvableState, neighborFunction,
+                                      goalState, size, isQueens, **options)
+            print(f"{problem} {name:<18}", summarizeTimes(*timeToSolution(solve, runs, seed)))
+
 # Plotting Function
 def plotResults(queenConflictHistory, puzzleMisplacementHistory):
     """
     Plot the results for both the 8-Queens and 8-Puzzle problems.
     """
+    import matplotlib.pyplot as plt  # Imported here so that importing the solvers doesn't pay for matplotlib
     plt.figure(figsize=(12, 6))
    
     plt.subplot(1, 2, 1)
@@ -113,20 +344,32 @@ def plotResults(queenConflictHistory, puzzleMisplacementHistory):
     plt.tight_layout()
     plt.show()
 
-# Solve 8-Queens
-finalStateQueens, bestCostsQueens = hillClimb(
-    "8-Queens", calculateHeuristic, generateRandomState, neighbors8Queens, size=8, isQueens=True
-)
-print("8-Queens Final State:", finalStateQueens)
-print("8-Queens Final Heuristic Cost:", calculateHeuristic(finalStateQueens, isQueens=True))
-   
-# Solve 8-Puzzle
-goalState8Puzzle = [1, 2, 3, 4, 5, 6, 7, 8, 0]
-finalStatePuzzle, bestCostsPuzzle = hillClimb(
-    "8-Puzzle", calculateHeuristic, generateRandomState, neighbors8Puzzle, goalState8Puzzle, size=9, isQueens=False
-)
-print("8-Puzzle Final State:", finalStatePuzzle)
-print("8-Puzzle Final Heuristic Cost:", calculateHeuristic(finalStatePuzzle, goalState8Puzzle, isQueens=False))
-
-# Plot results
-plotResults(bestCostsQueens, bestCostsPuzzle)
\ No newline at end of file
+def main():
+    parser = argparse.ArgumentParser(description="Hill climbing on 8-Queens and 8-Puzzle.")
+    parser.add_argument("--compare", type=int, default=None, metavar="RUNS",
+                        help="instead, compare the time to solution of every engine over RUNS runs")
+    args = parser.parse_args()
+    if args.compare:
+        compareEngines(args.compare)
+        return
+
+    # Solve 8-Queens
+    finalStateQueens, bestCostsQueens = hillClimb(
+        "8-Queens", calculateHeuristic, generateRandomState, neighbors8Queens, size=8, isQueens=True
+    )
+    print("8-Queens Final State:", finalStateQueens)
+    print("8-Queens Final Heuristic Cost:", calculateHeuristic(finalStateQueens, isQueens=True))
+
+    # Solve 8-Puzzle
+    goalState8Puzzle = [1, 2, 3, 4, 5, 6, 7, 8, 0]
+    finalStatePuzzle, bestCostsPuzzle = hillClimb(
+        "8-Puzzle", calculateHeuristic, generateRandomState, neighbors8Puzzle, goalState8Puzzle, size=9, isQueens=False
+    )
+    print("8-Puzzle Final State:", finalStatePuzzle)
+    print("8-Puzzle Final Heuristic Cost:", calculateHeuristic(finalStatePuzzle, goalState8Puzzle, isQueens=False))
+
+    # Plot results
+    plotResults(bestCostsQueens, bestCostsPuzzle)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,284 @@
+'''Benchmarks for every solver in the repo, with a stored baseline to catch regressions.
+
+Each case builds its problem outside the timed region and solves it from scratch. It is measured in three separate
+passes, so the instrumentation of one pass doesn't distort the numbers of another:
+    - timing: repeat solves, keeping every wall time; the median is the one compared
+    - counting: one solve with call counters wrapped around the search's inner function (AS1_P2._minimax, the
+      heuristic methods, ...), giving nodes_expanded (positions searched) and states_evaluated (states scored by a
+      heuristic or a Bellman backup); solvers that count for themselves (AS1_P1.bfs stats, NegamaxSearch.nodes,
+      SolverResult.iterations) report their own numbers
+    - memory: one solve under tracemalloc, giving peak_bytes (the largest amount of memory held during the solve, NumPy
+      buffers included), retained_bytes (still held after it) and retained_blocks (the net number of memory blocks the
+      solve left behind, its result included: tables, caches, results). tracemalloc only sees live blocks, so
+      temporaries freed during the solve don't show up; retained_blocks is reported but not compared against the
+      baseline, since a handful of blocks either way is noise
+
+The random solvers are seeded, so the counts are the same on every run and any change in them is a change in the
+algorithm. Results go to a JSON file; given a baseline (an earlier results file), every metric that grew by more than
+--threshold is reported as a regression and the exit status is 1:
+
+    python benchmark.py --output baseline.json
+    ...
+    python benchmark.py --baseline baseline.json --threshold 0.2
+'''
+
+import argparse
+import contextlib
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+
+METRICS = ('wall_time', 'nodes_expanded', 'states_evaluated', 'peak_bytes')      #compared against the baseline
+MID_GAME = ['X', 'O', ' ',
+            ' ', 'X', ' ',
+            ' ', ' ', 'O']          #X to move
+
+
+@contextlib.contextmanager
+def counting(owner, name):
+    #replaces owner.name (a module function or a method) with a wrapper that counts its calls; yields a one-element
+    #list holding the count, and restores the original on exit
+    original = getattr(owner, name)
+    calls = [0]
+
+    def counted(*args, **kwargs):
+        calls[0] += 1
+        return original(*args, **kwargs)
+
+    setattr(owner, name, counted)
+    try:
+        yield calls
+    finally:
+        setattr(owner, name, original)
+
+
+# ---- Cases: setup() -> solve; solve() may return a dict of the counts the solver reports itself ----
+# The solver modules are imported inside the cases, so listing or filtering cases imports nothing heavy
+
+def minimax_case(board):
+    import AS1_P2
+
+    def setup():
+        table = AS1_P2.TranspositionTable()         #fresh table: every solve searches the whole tree
+        return lambda: AS1_P2.best_move(board, table)
+
+    return setup, [('nodes_expanded', 'AS1_P2', '_minimax')]
+
+
+def negamax_case(board):
+    import AS1_P2
+
+    def setup():
+        search = AS1_P2.NegamaxSearch(table=AS1_P2.TranspositionTable())     #fresh table, like minimax_case
+
+        def solve():
+            search.search(board)
+            return {'nodes_expanded': search.nodes}
+        return solve
+
+    return setup, []
+
+
+def queens_case():
+    #AS1_P3: every step scores all 64 one-queen moves at once with move_costs()
+    import numpy as np
+    import AS1_P3
+
+    def setup():
+        rng = np.random.default_rng(0)
+        queens = AS1_P3.EightQueens(rng.permutation(8))
+        return lambda: queens.hill_climb(rng)
+
+    return setup, [('states_evaluated', 'AS1_P3', 'move_costs', 64)]
+
+
+def climb_case(cls_name):
+    #Test1_P3: one heuristic() call per neighbor scored
+    import numpy as np
+    import Test1_P3
+
+    def setup():
+        rng = np.random.default_rng(0)
+        problem = getattr(Test1_P3, cls_name)(rng=rng)
+        return lambda: problem.hill_climb(rng)
+
+    return setup, [('states_evaluated', f'Test1_P3.{cls_name}', 'heuristic')]
+
+
+def generic_climb_case(puzzle):
+    #Test_P3.hillClimb with 10 restarts; it draws from the random module, so that is seeded
+    import random
+    import Test_P3
+
+    def setup():
+        random.seed(0)
+        if puzzle:
+            return lambda: Test_P3.hillClimb('8-Puzzle', Test_P3.calculateHeuristic, Test_P3.generateRandomState,
+                                             Test_P3.neighbors8Puzzle, [1, 2, 3, 4, 5, 6, 7, 8, 0], 9, False)
+        return lambda: Test_P3.hillClimb('8-Queens', Test_P3.calculateHeuristic, Test_P3.generateRandomState,
+                                         Test_P3.neighbors8Queens, size=8, isQueens=True)
+
+    return setup, [('states_evaluated', 'Test_P3', 'calculateHeuristic')]
+
+
+def bfs_case(n, k):
+    import AS1_P1
+
+    def setup():
+        def solve():
+            stats = {}
+            AS1_P1.bfs(n, k, stats=stats)
+            return {'nodes_expanded': stats['expanded'], 'states_evaluated': stats['generated']}
+        return solve
+
+    return setup, []
+
+
+def value_iteration_case(size):
+    import gridworld
+
+    def setup():
+        if size == 4:
+            import AS2_P1
+            model = AS2_P1.build_model()
+        else:
+            model = gridworld.random_grid(size, size, seed=0)
+
+        def solve():
+            result = gridworld.value_iteration(model)
+            return {'states_evaluated': result.updates}      #one backup per live cell per sweep
+        return solve
+
+    return setup, []
+
+
+CASES = {
+    'minimax/empty': lambda: minimax_case([' '] * 9),
+    'minimax/mid-game': lambda: minimax_case(MID_GAME),
+    'negamax/empty': lambda: negamax_case([' '] * 9),
+    'negamax/mid-game': lambda: negamax_case(MID_GAME),
+    'hill_climb/8-queens': queens_case,
+    'hill_climb/8-queens-objects': lambda: climb_case('EightQueens'),
+    'hill_climb/8-puzzle': lambda: climb_case('EightPuzzle'),
+    'hillClimb/8-queens': lambda: generic_climb_case(False),
+    'hillClimb/8-puzzle': lambda: generic_climb_case(True),
+    'bfs/3-2': lambda: bfs_case(3, 2),
+    'bfs/100-4': lambda: bfs_case(100, 4),
+    'value_iteration/4': lambda: value_iteration_case(4),
+    'value_iteration/16': lambda: value_iteration_case(16),
+    'value_iteration/64': lambda: value_iteration_case(64),
+    'value_iteration/256': lambda: value_iteration_case(256),
+}
+
+
+def _resolve(path):
+    module, _, attr = path.partition('.')
+    owner = sys.modules[module]
+    return getattr(owner, attr) if attr else owner
+
+
+def measure(setup, counters, repeat=5):
+    #counters: (metric, module[.class], function[, weight]) call counters added to the metric in the counting pass
+    wall_times = []
+    for _ in range(repeat):
+        solve = setup()
+        start = time.perf_counter()
+        solve()
+        wall_times.append(time.perf_counter() - start)
+
+    solve = setup()
+    with contextlib.ExitStack() as stack:
+        calls = [(counter[0], stack.enter_context(counting(_resolve(counter[1]), counter[2])), counter[3:] or (1,))
+                 for counter in counters]
+        counts = solve()
+        counts = dict(counts) if isinstance(counts, dict) else {}      #anything else is just the solver's answer
+        for metric, count, (weight,) in calls:
+            counts[metric] = counts.get(metric, 0) + count[0] * weight
+
+    solve = setup()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        answer = solve()            #kept alive until the second snapshot, so what the solve returns is counted
+        retained, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+        retained_blocks = sum(stat.count_diff for stat in after.compare_to(before, 'filename'))
+        del answer
+    finally:
+        tracemalloc.stop()
+
+    return {'wall_time': statistics.median(wall_times), 'wall_times': wall_times, **counts,
+            'peak_bytes': peak, 'retained_bytes': retained, 'retained_blocks': retained_blocks}
+
+
+def run(names, repeat=5, report=print):
+    results = {}
+    for name in names:
+        setup, counters = CASES[name]()
+        results[name] = measure(setup, counters, repeat)
+        report(_format(name, results[name]))
+    return results
+
+
+def compare(results, baseline, threshold=0.2):
+    #(case, metric, baseline value, new value) for every metric that grew by more than threshold (a fraction).
+    #Cases or metrics missing from either side are skipped
+    regressions = []
+    for name, case in results.items():
+        old_case = baseline.get(name, {})
+        for metric in METRICS:
+            old, new = old_case.get(metric), case.get(metric)
+            if old is not None and new is not None and new > old * (1 + threshold):
+                regressions.append((name, metric, old, new))
+    return regressions
+
+
+def _format(name, case):
+    counts = ', '.join(f"{metric} {case[metric]}" for metric in ('nodes_expanded', 'states_evaluated') if metric in case)
+    return (f"{name:<28} {case['wall_time'] * 1000:10.2f} ms  peak {case['peak_bytes'] / 1024:9.1f} KiB"
+            f"  {case['retained_blocks']:7d} blocks retained"
+            + (f"  {counts}" if counts else ''))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the solvers and compare against a baseline.')
+    parser.add_argument('cases', nargs='*', help='case names or prefixes (default: all); see --list')
+    parser.add_argument('--list', action='store_true', help='print the case names and exit')
+    parser.add_argument('--repeat', type=int, default=5, help='timed solves per case')
+    parser.add_argument('--output', default='benchmark_results.json', help='where to write the results')
+    parser.add_argument('--baseline', default=None, help='results file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='relative growth of a metric that counts as a regression (0.2 = 20%%)')
+    args = parser.parse_args()
+
+    if args.list:
+        print('\n'.join(CASES))
+        return
+    names = [name for name in CASES if not args.cases or any(name.startswith(prefix) for prefix in args.cases)]
+    if not names:
+        parser.error(f"no case matches {args.cases}")
+
+    results = run(names, args.repeat)
+    with open(args.output, 'w') as f:
+        json.dump({'python': platform.python_version(), 'machine': platform.platform(), 'time': time.time(),
+                   'repeat': args.repeat, 'cases': results}, f, indent=2)
+    print(f"results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['cases']
+        regressions = compare(results, baseline, args.threshold)
+        for name, metric, old, new in regressions:
+            print(f"REGRESSION {name} {metric}: {old:g} -> {new:g} ({new / old - 1:+.0%})" if old else
+                  f"REGRESSION {name} {metric}: {old:g} -> {new:g}")
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions against {args.baseline} (threshold {args.threshold:.0%})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+'''Bitboard backend for the 3x3 tic-tac-toe engines (AS1_P2.py, Practice.py, Test_P1.py and Test_P2.py).
+
+A position is stored as two 9-bit ints, one holding the cells taken by 'X' and one holding the cells taken by 'O'
+(bit i is set <--> cell i is taken). Wins are found with precomputed masks, draws with a popcount, and the legal
+moves by iterating over the set bits of the empty cells. The scripts keep their 9-element list boards only for printing
+and reading input, and convert them with from_list() before searching.'''
+
+import math
+
+
+FULL_BOARD = 0b111111111        #all 9 cells taken
+
+WIN_CONFIGURATIONS = [(0, 1, 2), (3, 4, 5), (6, 7, 8), (0, 3, 6), (1, 4, 7), (2, 5, 8), (0, 4, 8), (2, 4, 6)]
+WIN_MASKS = [(1 << i) | (1 << j) | (1 << k) for i, j, k in WIN_CONFIGURATIONS]
+
+#WINNING[bits] is True if the cells in bits contain a full row, column or diagonal; precomputed once for all 512 possible masks
+WINNING = [any(bits & mask == mask for mask in WIN_MASKS) for bits in range(1 << 9)]
+
+
+def from_list(board):
+    #list board of ' '/'X'/'O' --> (x, o) bitboards
+    x = o = 0
+    for i in range(9):
+        if board[i] == 'X':
+            x |= 1 << i
+        elif board[i] == 'O':
+            o |= 1 << i
+    return x, o
+
+
+def to_list(x, o):
+    return ['X' if x >> i & 1 else 'O' if o >> i & 1 else ' ' for i in range(9)]
+
+
+def has_won(bits):
+    return WINNING[bits]
+
+
+def is_full(x, o):
+    return (x | o).bit_count() == 9        #popcount of the taken cells
+
+
+def legal_moves(x, o):
+    #yields the empty cells from lowest to highest index, the same order as the range(9) loops in the list-based engines
+    empty = ~(x | o) & FULL_BOARD
+    while empty:
+        lowest = empty & -empty         #isolate the lowest set bit
+        yield lowest.bit_length() - 1
+        empty ^= lowest
+
+
+def _symmetry_tables():
+    #every symmetry of the board is a permutation p of the cells (symmetric board = [board[p[0]], ..., board[p[8]]]),
+    #turned into a 512-entry table mapping a bitboard to its symmetric bitboard
+    rotate = [6, 3, 0, 7, 4, 1, 8, 5, 2]        #rotate 90 degrees clockwise
+    reflect = [2, 1, 0, 5, 4, 3, 8, 7, 6]       #mirror left <-> right
+    perms = []
+    perm = list(range(9))
+    for _ in range(4):
+        perms.append(perm)
+        perms.append([perm[reflect[i]] for i in range(9)])
+        perm = [perm[rotate[i]] for i in range(9)]
+
+    tables = []
+    for perm in perms:
+        tables.append([sum(1 << i for i in range(9) if bits >> perm[i] & 1) for bits in range(1 << 9)])
+    return tables
+
+
+SYMMETRY_TABLES = _symmetry_tables()        #the 8 rotations/reflections of the board
+
+
+def encode(x, o):
+    #compact encoding of a position as one 18-bit int
+    return x | o << 9
+
+
+def canonical_key(x, o):
+    #all 8 symmetric positions have the same utility, so we fold them into one key by taking the smallest of their encodings
+    return min(table[x] | table[o] << 9 for table in SYMMETRY_TABLES)
+
+
+#same contract as the list-based minimax: 'X' is maximizing, utilities are 10 - depth / depth - 10 / 0
+def minimax(x, o, depth, is_maximizing, alpha, beta):
+    if WINNING[x]:
+        return 10 - depth
+    if WINNING[o]:
+        return depth - 10
+    if (x | o) == FULL_BOARD:
+        return 0
+
+    if is_maximizing:
+        best_val = -math.inf
+        for i in legal_moves(x, o):
+            utility_val = minimax(x | 1 << i, o, depth + 1, False, alpha, beta)
+            best_val = max(best_val, utility_val)
+            alpha = max(alpha, best_val)
+            if alpha >= beta:
+                break
+        return best_val
+
+    else:
+        best_val = math.inf
+        for i in legal_moves(x, o):
+            utility_val = minimax(x, o | 1 << i, depth + 1, True, alpha, beta)
+            best_val = min(best_val, utility_val)
+            beta = min(beta, best_val)
+            if alpha >= beta:
+                break
+        return best_val
+
+
+def best_move(x, o):
+    #best move (0 - 8) for 'X'; ties go to the lowest cell, exactly like the list-based best_move
+    best_val = -math.inf
+    move = -1
+    for i in legal_moves(x, o):
+        utility_val = minimax(x | 1 << i, o, 0, False, -math.inf, math.inf)
+        if utility_val > best_val:
+            best_val = utility_val
+            move = i
+    return move
@@ -0,0 +1,560 @@
+'''Vectorized GridWorld MDP solvers (the engine behind AS2_P1.py).
+
+AS2_P1.value_iteration() walks every cell, action and slip outcome in Python on every sweep and looks obstacles up in
+a list. Here the model is compiled once into arrays instead:
+    - cells are numbered row-major, s = i * cols + j (obstacle cells included, they just never change)
+    - successors[d, s] is the cell reached from s by trying to move in direction d (s itself when that would leave the
+      grid or hit an obstacle), so is_valid()/get_next_state() are never called again
+    - slip[a, d] is the probability that action a ends up moving in direction d (0.8 intended, 0.1 each perpendicular)
+
+Together they are the (S*A) x S transition matrix P, with P[s*A + a, successors[d, s]] += slip[a, d]: every row holds
+at most 3 nonzeros. A Bellman backup Q = R + gamma * P @ U is evaluated in that factored form,
+    Q = reward + gamma * (slip @ U[successors])         (an A x 4 by 4 x S matrix product)
+which is the same sparse product without storing the 3 * S * A column indices and weights; transition_matrix() builds
+the explicit scipy.sparse matrix when one is needed. Everything is O(S) NumPy work per sweep, so 1000x1000 grids and
+larger are fine.
+
+Terminal cells keep their fixed utility and obstacle cells stay at 0, exactly like in AS2_P1.py.
+
+Maps are read from files with load_map() (text or .npy, see below) and compile_map() caches the compiled model under
+CACHE_DIR, keyed by the map file (path, size, modification time) and the model parameters; later runs memory-map the
+cached arrays instead of compiling again. A GridWorld holds no global state, so any number of maps can be solved side
+by side.
+
+Solvers (all take a compiled GridWorld and return a SolverResult with iterations or updates, wall time and residual
+history):
+    - value_iteration: one backup per iteration, like AS2_P1
+    - policy_iteration: evaluates every policy exactly with a sparse direct solve of (I - gamma * P_pi) U = R, then
+      improves it greedily; few iterations, each one expensive. The solve needs scipy, the only solver that does
+      (gridworld.py skips it when scipy is not installed)
+    - modified_policy_iteration: k cheap evaluation sweeps with the policy fixed between two improvements
+    - prioritized_sweeping: asynchronous backups of one cell at a time, always (about) the one with the largest bound
+      on its Bellman error; an update only raises the bounds of the cells whose backup reads the cell just updated, so
+      converged regions are never touched again. It does fewer backups than value_iteration (0.66M against 1.25M on a
+      random 80x80 map with one +10 terminal and zero step reward, 2.2M against 5.4M on a random 100x100 map with
+      reward -1), but every backup is scalar Python work, so it is about 100x slower in wall time and only pays off
+      when few cells need updating (e.g. re-solving after a small local change to a converged map). That is why it is
+      not in SOLVERS: gridworld.py only runs it with --prioritized
+Value iteration slows down as gamma approaches 1 (the error only shrinks by a factor gamma per sweep), policy iteration
+hardly does. Every solver also accepts epsilon: the Bellman residual r = max |backup(U) - U| bounds the distance to the
+optimal utilities by r * gamma / (1 - gamma), so stopping once that bound is below epsilon guarantees U is within
+epsilon of U*, whatever gamma is.'''
+
+import argparse
+import hashlib
+import importlib.util
+import heapq
+import json
+import operator
+import os
+import shutil
+import time
+
+import numpy as np
+
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.gridworld_cache')
+
+BLOCK_SIZE = 1 << 18        #cells per block in the vectorized backups, bounds their temporary arrays
+
+REQUEUE_FACTOR = 2.0        #prioritized_sweeping pushes a queued cell again once its error bound has grown this much
+
+probe = None                #an instrumentation.Probe that value_iteration() reports every sweep's residual to
+
+ACTION_LABELS = ['U', 'D', 'L', 'R']
+ACTIONS = {'U': (-1, 0), 'D': (1, 0), 'L': (0, -1), 'R': (0, 1)}
+
+
+def slip_matrix(action_labels=ACTION_LABELS, actions=ACTIONS, intended=0.8):
+    #slip[a, d]: the intended direction with probability intended, the two perpendicular ones share the rest
+    slip = np.zeros((len(action_labels), len(action_labels)))
+    for a, label in enumerate(action_labels):
+        di, dj = actions[label]
+        perpendicular = [d for d, other in enumerate(action_labels) if di * actions[other][0] + dj * actions[other][1] == 0]
+        slip[a, a] = intended
+        slip[a, perpendicular] = (1 - intended) / len(perpendicular)
+    return slip
+
+
+class GridWorld:
+    #blocked/terminal: boolean (rows, cols) masks; terminal_values: utility of each terminal cell; reward: the reward
+    #of every move, either one number or a (rows, cols) array of per-cell rewards
+    def __init__(self, blocked, terminal, terminal_values, reward=-1.0, gamma=0.98, intended=0.8,
+                 action_labels=ACTION_LABELS, actions=ACTIONS):
+        blocked = np.asarray(blocked, dtype=bool)
+        self.shape = blocked.shape
+        self.rows, self.cols = self.shape
+        self.size = self.rows * self.cols
+        self.gamma = gamma
+        self.action_labels = list(action_labels)
+        self.blocked = blocked.ravel()
+        self.terminal = np.asarray(terminal, dtype=bool).ravel() & ~self.blocked
+        self.fixed_values = np.where(self.terminal, np.asarray(terminal_values, dtype=float).ravel(), 0.0)
+        self.live = ~(self.blocked | self.terminal)     #cells whose utility is actually computed
+        self.reward = np.broadcast_to(np.asarray(reward, dtype=float), self.shape).ravel()
+        self.slip = slip_matrix(self.action_labels, actions, intended)
+        self.successors = self._successors([actions[label] for label in self.action_labels])
+
+    @classmethod
+    def from_cells(cls, grid_size, obstacles, terminals, reward=-1.0, gamma=0.98, **kwargs):
+        #the AS2_P1.py way of describing a grid: a list of obstacle cells and a {cell: utility} dict of terminals;
+        #grid_size is an int for square grids or a (rows, cols) pair
+        shape = (grid_size, grid_size) if np.ndim(grid_size) == 0 else tuple(grid_size)
+        blocked = np.zeros(shape, dtype=bool)
+        terminal = np.zeros(shape, dtype=bool)
+        terminal_values = np.zeros(shape)
+        if len(obstacles):
+            blocked[tuple(np.array(obstacles).T)] = True
+        for cell, value in terminals.items():
+            terminal[cell] = True
+            terminal_values[cell] = value
+        return cls(blocked, terminal, terminal_values, reward, gamma, **kwargs)
+
+    def _successors(self, moves):
+        #one shifted copy of the cell index grid per direction, written straight into the output: no per-cell work
+        #and no temporaries bigger than one int32 grid, so maps with hundreds of millions of cells compile fine
+        rows, cols = self.shape
+        index = np.arange(self.size, dtype=np.int32).reshape(self.shape)
+        blocked = self.blocked.reshape(self.shape)
+        successors = np.empty((len(moves), self.size), dtype=np.int32)
+        for d, (di, dj) in enumerate(moves):
+            target = successors[d].reshape(self.shape)
+            target[...] = index                                         #moving off the grid: stay put
+            source = (slice(max(0, -di), rows - max(0, di)), slice(max(0, -dj), cols - max(0, dj)))
+            neighbor = (slice(max(0, di), rows + min(0, di)), slice(max(0, dj), cols + min(0, dj)))
+            target[source] = np.where(blocked[neighbor], index[source], index[neighbor])   #into an obstacle: stay put
+        return successors
+
+    ARRAYS = ('blocked', 'terminal', 'fixed_values', 'live', 'reward', 'slip', 'successors')
+
+    def save(self, directory):
+        #one .npy per array plus the scalars in meta.json; written to a temporary directory that is renamed at the end,
+        #so a half-written cache is never picked up
+        tmp = directory + '.tmp'
+        os.makedirs(tmp, exist_ok=True)
+        for name in self.ARRAYS:
+            np.save(os.path.join(tmp, name + '.npy'), getattr(self, name))
+        with open(os.path.join(tmp, 'meta.json'), 'w') as f:
+            json.dump({'shape': list(self.shape), 'gamma': self.gamma, 'action_labels': self.action_labels}, f)
+        shutil.rmtree(directory, ignore_errors=True)
+        os.replace(tmp, directory)
+
+    @classmethod
+    def load(cls, directory, mmap_mode='r'):
+        #arrays are memory-mapped read-only by default: nothing is read until a solver touches it, and the solvers
+        #never write to the model
+        model = cls.__new__(cls)
+        with open(os.path.join(directory, 'meta.json')) as f:
+            meta = json.load(f)
+        model.shape = tuple(meta['shape'])
+        model.rows, model.cols = model.shape
+        model.size = model.rows * model.cols
+        model.gamma = meta['gamma']
+        model.action_labels = meta['action_labels']
+        for name in cls.ARRAYS:
+            setattr(model, name, np.load(os.path.join(directory, name + '.npy'), mmap_mode=mmap_mode))
+        return model
+
+    def transition_matrix(self):
+        #the explicit (S*A) x S CSR matrix, row s*A + a; rows of terminal and obstacle cells are empty
+        from scipy import sparse
+        n_actions = len(self.action_labels)
+        weights = np.where(self.live[:, None, None], self.slip[None, :, :], 0.0)         #(S, A, 4)
+        columns = np.broadcast_to(self.successors.T[:, None, :], weights.shape)
+        matrix = sparse.csr_matrix((weights.ravel(), columns.ravel(), np.arange(0, weights.size + 1, weights.shape[2])),
+                                   shape=(self.size * n_actions, self.size))
+        matrix.sum_duplicates()
+        matrix.eliminate_zeros()
+        return matrix
+
+    def predecessors(self):
+        #CSR-style index of the cells whose backup reads cell s: indices[indptr[s]:indptr[s + 1]], without duplicates
+        #(a cell bumping into a wall is its own predecessor). Only live cells are listed, nothing else is ever updated.
+        #weights[i] is the largest probability with which one action of source indices[i] ends up in s, so changing
+        #U[s] by delta changes that source's backup by at most gamma * weights[i] * delta
+        n_moves = len(self.successors)
+        same = self.successors[:, None, :] == self.successors[None, :, :]         #(4, 4, S): directions d, e land together
+        weights = np.einsum('ae,des->ads', self.slip, same).max(axis=0)           #(4, S), weight of landing via d
+        sources = np.broadcast_to(np.arange(self.size, dtype=np.int64), self.successors.shape)
+        pairs, first = np.unique(self.successors.astype(np.int64) * self.size + sources, return_index=True)
+        targets, sources = np.divmod(pairs, self.size)                          #sorted by target, then source
+        weights = weights.ravel()[first]
+        keep = self.live[sources]
+        targets, sources, weights = targets[keep], sources[keep], weights[keep]
+        indptr = np.zeros(self.size + 1, dtype=np.int64)
+        np.cumsum(np.bincount(targets, minlength=self.size), out=indptr[1:])
+        return indptr, sources.astype(np.int32), weights
+
+    def initial_utilities(self):
+        return self.fixed_values.copy()
+
+    def q_values(self, utils, block=slice(None)):
+        #(A, cells) action utilities of the given block of cells; terminal and obstacle columns are meaningless
+        return self.reward[block] + self.gamma * (self.slip @ utils[self.successors[:, block]])
+
+    def _blocks(self):
+        for start in range(0, self.size, BLOCK_SIZE):
+            yield slice(start, start + BLOCK_SIZE)
+
+    def backup(self, utils, greedy=False):
+        #one synchronous Bellman backup: returns the new utilities (and with greedy=True the best action of every
+        #cell too). Goes through the cells in blocks, so the A x S action utilities never exist all at once
+        values = np.empty(self.size)
+        actions = np.empty(self.size, dtype=np.int8) if greedy else None
+        for block in self._blocks():
+            q = self.q_values(utils, block)
+            values[block] = np.where(self.live[block], q.max(axis=0), self.fixed_values[block])
+            if greedy:
+                actions[block] = q.argmax(axis=0)
+        return (values, actions) if greedy else values
+
+    def policy_values(self, utils, policy):
+        #one evaluation sweep with the action in every cell fixed to policy[s]
+        values = np.empty(self.size)
+        for block in self._blocks():
+            weights = self.slip[policy[block]].T
+            v = self.reward[block] + self.gamma * (weights * utils[self.successors[:, block]]).sum(axis=0)
+            values[block] = np.where(self.live[block], v, self.fixed_values[block])
+        return values
+
+    def policy_matrix(self, policy):
+        #S x S transition matrix of a fixed policy; rows of terminal and obstacle cells are empty
+        from scipy import sparse
+        weights = np.where(self.live[:, None], self.slip[policy], 0.0)         #(S, 4)
+        matrix = sparse.csr_matrix((weights.ravel(), self.successors.T.ravel(), np.arange(0, weights.size + 1, weights.shape[1])),
+                                   shape=(self.size, self.size))
+        matrix.sum_duplicates()
+        matrix.eliminate_zeros()
+        return matrix
+
+    def evaluate_policy(self, policy):
+        #exact utilities of a fixed policy: solve U = R + gamma * P_pi U on live cells, U = fixed value elsewhere
+        from scipy import sparse
+        from scipy.sparse import linalg
+        system = (sparse.identity(self.size, format='csr') - self.gamma * self.policy_matrix(policy)).tocsc()
+        return linalg.spsolve(system, np.where(self.live, self.reward, self.fixed_values))
+
+    def action_utilities(self, q):
+        #(rows, cols, A) array like AS2_P1.action_utilities, zero on terminal and obstacle cells
+        return np.where(self.live, q, 0.0).T.reshape(self.rows, self.cols, len(self.action_labels))
+
+
+# ---- Map files ----
+#
+#Text maps have one character per cell, every line the same length. '.' is a free cell, '#' an obstacle and 'T' a
+#terminal worth +10. Lines at the top starting with ';' change the defaults or define more cell kinds:
+#    ; reward -1                 reward of a move from a free cell
+#    ; cell ~ reward -5          ~ is a free cell with its own reward (e.g. rough terrain)
+#    ; cell P terminal -10       P is a terminal worth -10 (a pit)
+#
+#.npy maps are a 2D array of MAP_DTYPE records, for maps too big (or too irregular) for a text file; they are opened
+#memory-mapped. save_map() writes one.
+
+MAP_DTYPE = np.dtype([('blocked', '?'), ('terminal', '?'), ('value', '<f8'), ('reward', '<f8')])
+
+
+def _parse_directives(lines, reward):
+    legend = {'.': ('reward', reward), '#': ('obstacle', None), 'T': ('terminal', 10.0)}
+    for line in lines:
+        words = line[1:].split()
+        if words[:1] == ['reward'] and len(words) == 2:
+            legend['.'] = ('reward', float(words[1]))
+        elif words[:1] == ['cell'] and len(words) in (3, 4) and len(words[1]) == 1 and words[2] in ('reward', 'terminal', 'obstacle'):
+            legend[words[1]] = (words[2], float(words[3]) if len(words) == 4 else None)
+        else:
+            raise ValueError(f"bad map directive: {line!r}")
+    return legend
+
+
+def read_text_map(path, reward=-1.0):
+    #returns (blocked, terminal, terminal_values, reward); the grid is decoded with NumPy straight from the file bytes
+    with open(path, 'rb') as f:
+        data = f.read()
+    directives = []
+    start = 0
+    while data.startswith(b';', start):
+        end = data.find(b'\n', start)
+        end = len(data) if end < 0 else end
+        directives.append(data[start:end].decode().strip())
+        start = end + 1
+    legend = _parse_directives(directives, reward)
+
+    grid = data[start:].replace(b'\r', b'').rstrip(b'\n') + b'\n'
+    cols = grid.find(b'\n')
+    if cols <= 0 or len(grid) % (cols + 1):
+        raise ValueError(f"{path}: every row of the map must have the same length")
+    cells = np.frombuffer(grid, dtype=np.uint8).reshape(-1, cols + 1)
+    if (cells[:, cols] != ord('\n')).any():
+        raise ValueError(f"{path}: every row of the map must have the same length")
+    cells = cells[:, :cols]
+
+    shape = cells.shape
+    blocked = np.zeros(shape, dtype=bool)
+    terminal = np.zeros(shape, dtype=bool)
+    terminal_values = np.zeros(shape)
+    rewards = np.zeros(shape)
+    known = np.zeros(shape, dtype=bool)
+    for char, (kind, value) in legend.items():
+        mask = cells == ord(char)
+        known |= mask
+        if kind == 'obstacle':
+            blocked |= mask
+        elif kind == 'terminal':
+            terminal |= mask
+            terminal_values[mask] = value
+        else:
+            rewards[mask] = value
+    if not known.all():
+        i, j = np.argwhere(~known)[0]
+        raise ValueError(f"{path}: unknown cell {chr(cells[i, j])!r} at row {i}, column {j}")
+    return blocked, terminal, terminal_values, rewards
+
+
+def save_map(path, blocked, terminal, terminal_values, reward):
+    cells = np.lib.format.open_memmap(path, mode='w+', dtype=MAP_DTYPE, shape=np.shape(blocked))
+    cells['blocked'] = blocked
+    cells['terminal'] = terminal
+    cells['value'] = terminal_values
+    cells['reward'] = reward
+    cells.flush()
+
+
+def load_map(path, reward=-1.0):
+    #(blocked, terminal, terminal_values, reward) from a text or .npy map; reward is the default for text maps
+    if path.endswith('.npy'):
+        cells = np.load(path, mmap_mode='r')
+        if cells.dtype != MAP_DTYPE or cells.ndim != 2:
+            raise ValueError(f"{path}: expected a 2D array of {MAP_DTYPE}")
+        return cells['blocked'], cells['terminal'], cells['value'], cells['reward']
+    return read_text_map(path, reward)
+
+
+def _cache_key(path, **params):
+    #like .pyc files: the map's path, size and modification time instead of hashing gigabytes of map data
+    info = os.stat(path)
+    key = dict(params, path=os.path.realpath(path), size=info.st_size, mtime=info.st_mtime_ns)
+    return hashlib.sha1(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+
+def compile_map(path, gamma=0.98, intended=0.8, reward=-1.0, cache_dir=CACHE_DIR):
+    #compiled GridWorld for a map file, built once and then memory-mapped from cache_dir (None disables the cache)
+    if cache_dir is None:
+        return GridWorld(*load_map(path, reward), gamma=gamma, intended=intended)
+    directory = os.path.join(cache_dir, _cache_key(path, gamma=gamma, intended=intended, reward=reward))
+    if not os.path.exists(os.path.join(directory, 'meta.json')):
+        GridWorld(*load_map(path, reward), gamma=gamma, intended=intended).save(directory)
+    return GridWorld.load(directory)
+
+
+class SolverResult:
+    #iterations: full sweeps (None for prioritized_sweeping); updates: single-cell backups, iterations * live cells
+    #unless the solver counts them itself
+    def __init__(self, model, utils, iterations, elapsed, residuals, updates=None):
+        self.model = model
+        self.utils = utils.reshape(model.shape)
+        self._action_utilities = None
+        self.iterations = iterations
+        self.updates = updates if updates is not None else iterations * int(model.live.sum())
+        self.elapsed = elapsed              #wall time in seconds
+        self.residuals = residuals          #Bellman residual max |backup(U) - U| after every iteration
+        self.error_bound = residuals[-1] * model.gamma / (1 - model.gamma) if model.gamma < 1 else np.inf
+
+    @property
+    def action_utilities(self):
+        #(rows, cols, A) like AS2_P1, computed from the final utilities on first use (A times the size of utils)
+        if self._action_utilities is None:
+            self._action_utilities = self.model.action_utilities(self.model.q_values(self.utils.ravel()))
+        return self._action_utilities
+
+    @property
+    def policy(self):
+        #index of the best action in every cell (argmax picks the first one on ties, like AS2_P1.plot)
+        return self.action_utilities.argmax(axis=2)
+
+    def __repr__(self):
+        count = f"iterations={self.iterations}" if self.iterations is not None else f"updates={self.updates}"
+        return (f"SolverResult({count}, elapsed={self.elapsed:.3f}s, "
+                f"residual={self.residuals[-1]:.3g}, error_bound={self.error_bound:.3g})")
+
+
+def _converged(model, residual, threshold, epsilon):
+    #epsilon, when given, replaces the plain threshold by the bound |U - U*| <= residual * gamma / (1 - gamma) < epsilon
+    if epsilon is not None:
+        return residual * model.gamma < epsilon * (1 - model.gamma)
+    return residual < threshold
+
+
+def value_iteration(model, threshold=1e-6, max_iterations=None, epsilon=None):
+    #synchronous (Jacobi) value iteration: every sweep is one backup of all cells from the previous sweep's utilities.
+    #Stops once no utility changes by threshold or more, like AS2_P1.value_iteration
+    start = time.perf_counter()
+    utils = model.initial_utilities()
+    residuals = []
+    while True:
+        new_utils = model.backup(utils)
+        residuals.append(float(np.abs(new_utils - utils).max()))
+        utils = new_utils
+        if probe is not None:
+            probe.count('sweeps')
+            probe.event('residual', residuals[-1])
+        if _converged(model, residuals[-1], threshold, epsilon) or (max_iterations is not None and len(residuals) >= max_iterations):
+            return SolverResult(model, utils, len(residuals), time.perf_counter() - start, residuals)
+
+
+def _improve(q, policy, live):
+    #greedy policy, but a cell keeps its current action unless another one is strictly better (no cycling on ties)
+    best = q.argmax(axis=0)
+    current = np.take_along_axis(q, policy[None, :], axis=0)[0]
+    keep = ~live | (current >= q.max(axis=0) - 1e-12 * np.abs(current).clip(min=1))
+    return np.where(keep, policy, best)
+
+
+def policy_iteration(model, threshold=1e-6, max_iterations=None, epsilon=None):
+    #stops when the policy is stable, or once the residual is below threshold (with epsilon: once the residual bound is
+    #met), like the other solvers. Returns the backup of the last evaluated utilities, which is what the
+    #residual * gamma / (1 - gamma) bound of SolverResult.error_bound holds for
+    start = time.perf_counter()
+    policy = model.q_values(model.initial_utilities()).argmax(axis=0)
+    residuals = []
+    while True:
+        utils = model.evaluate_policy(policy)
+        q = model.q_values(utils)
+        new_utils = np.where(model.live, q.max(axis=0), model.fixed_values)
+        residuals.append(float(np.abs(new_utils - utils).max()))
+        new_policy = _improve(q, policy, model.live)
+        stable = np.array_equal(new_policy, policy)
+        policy = new_policy
+        if stable or _converged(model, residuals[-1], threshold, epsilon) \
+                or (max_iterations is not None and len(residuals) >= max_iterations):
+            return SolverResult(model, new_utils, len(residuals), time.perf_counter() - start, residuals)
+
+
+def modified_policy_iteration(model, threshold=1e-6, max_iterations=None, epsilon=None, k=10):
+    #every iteration: one backup (greedy improvement) followed by k - 1 evaluation sweeps of that policy.
+    #k = 1 is value iteration, k -> infinity is policy iteration
+    start = time.perf_counter()
+    utils = model.initial_utilities()
+    residuals = []
+    while True:
+        new_utils, policy = model.backup(utils, greedy=True)
+        residuals.append(float(np.abs(new_utils - utils).max()))
+        if _converged(model, residuals[-1], threshold, epsilon) or (max_iterations is not None and len(residuals) >= max_iterations):
+            return SolverResult(model, new_utils, len(residuals), time.perf_counter() - start, residuals)
+        utils = new_utils
+        for _ in range(k - 1):
+            utils = model.policy_values(utils, policy)
+
+
+def prioritized_sweeping(model, threshold=1e-6, max_updates=None, epsilon=None):
+    #keeps every cell whose Bellman error may be threshold or more in a max-priority queue. The priority of a cell is
+    #an upper bound on its error: its exact error at the start, and every time a successor's utility changes by delta,
+    #the bound grows by gamma * delta times the largest probability of moving into that successor (the weights of
+    #GridWorld.predecessors). So an update costs one backup, of the cell popped, and no predecessor is backed up until
+    #it is popped itself. Stops when no bound is threshold or more, which bounds every error below threshold like a
+    #sweep's residual does. A queued cell is only pushed again once its bound has grown by REQUEUE_FACTOR (its older
+    #entry then goes stale), so the queue order is approximate but there is about one push per update.
+    #On sparse-reward maps only the cells next to the rewards start out queued, and the values spread outwards from
+    #them. result.updates counts the backups (the loop stops once it reaches max_updates) and result.iterations is
+    #None. The cells are backed up out of order, so the utilities returned are one final full backup of them, which is
+    #what the residual * gamma / (1 - gamma) error bound holds for. Scalar Python per backup: see the module docstring
+    start = time.perf_counter()
+    if epsilon is not None:
+        threshold = epsilon * (1 - model.gamma) / model.gamma
+    new_utils = model.backup(model.initial_utilities())
+    errors = np.abs(new_utils - model.initial_utilities())
+
+    #the hot loop is scalar, and Python lists are much faster than NumPy arrays one element at a time
+    utils = model.initial_utilities().tolist()
+    successors = model.successors.T.tolist()
+    reward = model.reward.tolist()
+    slip = [tuple(row) for row in (model.gamma * model.slip).tolist()]      #gamma folded into the weights
+    indptr, indices, weights = model.predecessors()
+    indptr, indices, weights = indptr.tolist(), indices.tolist(), (model.gamma * weights).tolist()
+    mul = operator.mul
+
+    def backup(s):
+        values = [utils[t] for t in successors[s]]
+        return reward[s] + max([sum(map(mul, row, values)) for row in slip])
+
+    cells = np.flatnonzero(model.live & (errors >= threshold))
+    priority = [0.0] * model.size
+    for cell, error in zip(cells.tolist(), errors[cells].tolist()):
+        priority[cell] = error
+    queue = [(-priority[cell], cell) for cell in cells.tolist()]
+    heapq.heapify(queue)
+    pushed = priority[:]                #bound each cell's live queue entry was pushed with, 0 if it has none
+
+    updates = 0
+    residuals = []
+    while queue and (max_updates is None or updates < max_updates):
+        error, s = heapq.heappop(queue)
+        if -error != pushed[s]:
+            continue                    #stale entry, the cell was pushed again since
+        if updates % model.size == 0:
+            residuals.append(priority[s])   #about the largest error bound left, once per sweep's worth of updates
+        pushed[s] = priority[s] = 0.0
+        value = backup(s)
+        delta = abs(value - utils[s])
+        utils[s] = value
+        updates += 1
+        for i in range(indptr[s], indptr[s + 1]):
+            p = indices[i]
+            bound = priority[p] = priority[p] + weights[i] * delta
+            if bound >= threshold and bound > REQUEUE_FACTOR * pushed[p]:
+                pushed[p] = bound
+                heapq.heappush(queue, (-bound, p))
+
+    utils = np.array(utils)
+    new_utils = model.backup(utils)
+    residuals.append(float(np.abs(new_utils - utils).max()))
+    return SolverResult(model, new_utils, None, time.perf_counter() - start, residuals, updates)
+
+
+SOLVERS = {'value': value_iteration, 'policy': policy_iteration, 'modified': modified_policy_iteration}
+NEEDS_SCIPY = {'policy'}        #solvers that build scipy.sparse matrices (evaluate_policy)
+
+
+def random_grid(rows, cols, obstacle_density=0.2, gamma=0.98, seed=None):
+    #random obstacles, terminal (+10) in the bottom-right corner
+    rng = np.random.default_rng(seed)
+    blocked = rng.random((rows, cols)) < obstacle_density
+    terminal = np.zeros((rows, cols), dtype=bool)
+    terminal[-1, -1] = True
+    blocked[-1, -1] = False
+    return GridWorld(blocked, terminal, 10 * terminal, gamma=gamma)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the GridWorld solvers on a map file or a random map.')
+    parser.add_argument('size', type=int, nargs='?', default=100, help='side of the random map')
+    parser.add_argument('--map', default=None, help='text or .npy map file instead of a random map')
+    parser.add_argument('--gamma', type=float, default=0.98)
+    parser.add_argument('--obstacles', type=float, default=0.2, help='fraction of obstacle cells')
+    parser.add_argument('--epsilon', type=float, default=None, help='stop once the utilities are provably this close to optimal')
+    parser.add_argument('--k', type=int, default=10, help='evaluation sweeps per improvement for modified policy iteration')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--prioritized', action='store_true', help='also run prioritized sweeping (slow on whole maps)')
+    parser.add_argument('--render', default=None, help='save the value iteration utilities and policy to this image file')
+    args = parser.parse_args()
+
+    if args.map:
+        model = compile_map(args.map, args.gamma)
+    else:
+        model = random_grid(args.size, args.size, args.obstacles, args.gamma, args.seed)
+    solvers = dict(SOLVERS, prioritized=prioritized_sweeping) if args.prioritized else SOLVERS
+    for name, solver in solvers.items():
+        if name in NEEDS_SCIPY and importlib.util.find_spec('scipy') is None:
+            print(f"{name:>11}: skipped, needs scipy (pip install scipy)")
+            continue
+        kwargs = {'k': args.k} if name == 'modified' else {}
+        result = solver(model, epsilon=args.epsilon, **kwargs)
+        print(f"{name:>11}: {result}")
+        if name == 'value' and args.render:
+            import gridworld_render
+            start = time.perf_counter()
+            gridworld_render.render_result(result, args.render, title=f"{args.map or 'random map'}, gamma = {args.gamma}")
+            print(f"rendered {args.render} in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+'''Gymnasium-style simulator for the GridWorld MDP (see gridworld.py), one environment or many at once.
+
+The dynamics are the compiled model's: from cell s, action a moves in direction d with probability slip[a, d] (0.8
+intended, 0.1 each perpendicular) to successors[d, s], so walls and obstacles keep the agent in place exactly like
+AS2_P1.get_next_state(). Observations are flat cell indices s = i * cols + j and actions index model.action_labels.
+
+step() returns (observation, reward, terminated, truncated, info) like Gymnasium. The reward is the reward of the move
+(-1 in AS2_P1). Terminal cells have a fixed utility rather than a reward, so an episode ends when one is entered and
+info['terminal_value'] carries that utility; the discounted return
+    r_0 + gamma * r_1 + ... + gamma^(T-1) * r_(T-1) + gamma^T * terminal_value
+is then an unbiased sample of the utility computed by value iteration. monte_carlo_values() uses that to check a policy
+against the exact solution.
+
+VectorGridWorldEnv steps N environments with a handful of NumPy operations per step, drawing from one seeded
+np.random.Generator, and resets finished environments automatically (the observation they ended in is in
+info['final_observation']).'''
+
+import argparse
+import time
+
+import numpy as np
+
+import gridworld
+
+
+def _start_cell(model, start):
+    #a fixed start cell given as a flat index or (i, j) --> flat index; None (random live cells) is passed through
+    if start is None:
+        return None
+    return int(np.ravel_multi_index(start, model.shape)) if np.ndim(start) else int(start)
+
+
+class GridWorldEnv:
+    #start: a fixed start cell (flat index or (i, j)); None starts every episode in a uniformly random live cell
+    def __init__(self, model, seed=None, max_steps=1000, start=None):
+        self.model = model
+        self.n_states = model.size
+        self.n_actions = len(model.action_labels)
+        self.max_steps = max_steps
+        self.start = _start_cell(model, start)
+        self.cdf = np.cumsum(model.slip, axis=1)
+        self.live_cells = np.flatnonzero(model.live)
+        self.rng = np.random.default_rng(seed)
+        self.state = None
+        self.steps = 0
+
+    def reset(self, seed=None):
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        self.state = self.start if self.start is not None else int(self.rng.choice(self.live_cells))
+        self.steps = 0
+        return self.state, {}
+
+    def step(self, action):
+        s = self.state
+        d = min(int(np.searchsorted(self.cdf[action], self.rng.random(), side='right')), self.cdf.shape[1] - 1)
+        self.state = int(self.model.successors[d, s])
+        self.steps += 1
+        terminated = bool(self.model.terminal[self.state])
+        truncated = not terminated and self.max_steps is not None and self.steps >= self.max_steps
+        info = {'terminal_value': float(self.model.fixed_values[self.state]) if terminated else 0.0}
+        return self.state, float(self.model.reward[s]), terminated, truncated, info
+
+
+class VectorGridWorldEnv:
+    #start: as in GridWorldEnv, shared by all environments
+    def __init__(self, model, num_envs, seed=None, max_steps=1000, start=None, autoreset=True):
+        self.model = model
+        self.num_envs = num_envs
+        self.n_states = model.size
+        self.n_actions = len(model.action_labels)
+        self.max_steps = max_steps
+        self.start = _start_cell(model, start)
+        self.autoreset = autoreset
+        self.cdf = np.cumsum(model.slip, axis=1)
+        self.live_cells = np.flatnonzero(model.live)
+        self.rng = np.random.default_rng(seed)
+        self.states = None
+        self.steps = np.zeros(num_envs, dtype=np.int64)
+
+    def _starts(self, n):
+        if self.start is not None:
+            return np.full(n, self.start, dtype=np.int64)
+        return self.live_cells[self.rng.integers(len(self.live_cells), size=n)]
+
+    def reset(self, seed=None, starts=None):
+        #starts: optional array of one start cell per environment for this reset
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        self.states = np.array(starts, dtype=np.int64) if starts is not None else self._starts(self.num_envs)
+        self.steps[:] = 0
+        return self.states.copy(), {}
+
+    def step(self, actions):
+        model = self.model
+        s = self.states
+        u = self.rng.random(self.num_envs)
+        #direction = number of cumulative slip probabilities at or below u (clipped against rounding in the last one)
+        d = np.minimum((u[:, None] >= self.cdf[actions]).sum(axis=1), self.cdf.shape[1] - 1)
+        next_states = model.successors[d, s].astype(np.int64)
+        rewards = model.reward[s]
+        self.steps += 1
+        terminated = model.terminal[next_states]
+        truncated = ~terminated & (self.steps >= self.max_steps) if self.max_steps is not None else np.zeros_like(terminated)
+        info = {'terminal_value': np.where(terminated, model.fixed_values[next_states], 0.0)}
+
+        done = terminated | truncated
+        if self.autoreset and done.any():
+            info['final_observation'] = next_states.copy()
+            next_states[done] = self._starts(int(done.sum()))
+            self.steps[done] = 0
+        self.states = next_states
+        return next_states.copy(), rewards, terminated, truncated, info
+
+
+def monte_carlo_values(model, policy, starts, episodes=1, seed=None, max_steps=10000):
+    #mean discounted return of policy (an action index per cell, flat or (rows, cols)) from every cell in starts,
+    #over episodes rollouts each; all rollouts run side by side in one VectorGridWorldEnv.
+    #Returns (values, number of environment steps simulated)
+    policy = np.asarray(policy).ravel()
+    starts = np.repeat(np.asarray(starts, dtype=np.int64).ravel(), episodes)
+    env = VectorGridWorldEnv(model, len(starts), seed, max_steps=None, autoreset=False)
+    states, _ = env.reset(starts=starts)
+    returns = np.zeros(len(starts))
+    discount = np.ones(len(starts))
+    active = model.live[states].copy()
+    returns[~active] = model.fixed_values[states[~active]]
+    steps = 0
+    for _ in range(max_steps):
+        if not active.any():
+            break
+        steps += int(active.sum())
+        states, rewards, terminated, _, info = env.step(policy[states])
+        returns += np.where(active, discount * rewards, 0.0)
+        discount *= model.gamma
+        returns += np.where(active & terminated, discount * info['terminal_value'], 0.0)
+        active &= ~terminated
+    return returns.reshape(-1, episodes).mean(axis=1), steps
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check a value iteration policy by Monte Carlo rollouts.')
+    parser.add_argument('size', type=int, nargs='?', default=50)
+    parser.add_argument('--map', default=None, help='text or .npy map file instead of a random map')
+    parser.add_argument('--gamma', type=float, default=0.98)
+    parser.add_argument('--cells', type=int, default=5, help='number of random start cells to check')
+    parser.add_argument('--episodes', type=int, default=20000, help='rollouts per start cell')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if args.map:
+        model = gridworld.compile_map(args.map, args.gamma)
+    else:
+        model = gridworld.random_grid(args.size, args.size, gamma=args.gamma, seed=args.seed)
+    result = gridworld.value_iteration(model)
+    rng = np.random.default_rng(args.seed)
+    cells = rng.choice(np.flatnonzero(model.live), size=min(args.cells, int(model.live.sum())), replace=False)
+
+    start = time.perf_counter()
+    values, steps = monte_carlo_values(model, result.policy, cells, args.episodes, args.seed)
+    elapsed = time.perf_counter() - start
+    print(f"{steps} steps in {elapsed:.2f}s ({steps / elapsed / 1e6:.1f}M steps/s)")
+    for cell, value in zip(cells, values):
+        print(f"cell {tuple(map(int, np.unravel_index(cell, model.shape)))}: value iteration {result.utils.ravel()[cell]:9.4f}, "
+              f"Monte Carlo {value:9.4f}")
+
+
+if __name__ == '__main__':
+    main()
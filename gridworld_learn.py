@@ -0,0 +1,197 @@
+'''Model-free tabular learners for the GridWorld (see gridworld.py): Q-learning and SARSA.
+
+value_iteration() needs the transition model; these only see transitions sampled from gridworld_env's
+VectorGridWorldEnv, so they also work where the model is unknown. Both learners:
+    - keep Q as one preallocated (rows, cols, len(action_labels)) array, the layout of AS2_P1's action_utilities, so
+      AS2_P1.plot(learner.Q, model) draws a learned policy exactly like the exact one (terminal and obstacle cells are
+      never updated and stay 0, like there)
+    - collect experience in batches: every step moves num_envs environments at once. The TD errors of a (state, action)
+      pair that several environments visited in the same step are averaged and applied as one update, so they don't
+      all start from the same stale Q and add up (which diverges with any real learning rate)
+    - take the exploration rate epsilon and the learning rate from schedules of the number of environment steps so far;
+      without a learning rate schedule every (state, action) pair uses 1 / visits ** visit_power, which is what the
+      convergence guarantees ask for. A pair seen c times in one batch takes a step of c / visits ** visit_power
+      (capped at 1), which for visit_power = 1 is exactly the running average over all its samples
+
+Entering a terminal cell ends an episode and bootstraps from its fixed utility (info['terminal_value']), so the learned
+Q converges to the same action utilities as value iteration. main() measures how fast each learner gets there.'''
+
+import abc
+import argparse
+import time
+
+import numpy as np
+
+import gridworld
+import gridworld_env
+
+
+# ---- Schedules: step -> value ----
+
+def constant(value):
+    return lambda step: value
+
+
+def linear(start, end, duration):
+    return lambda step: start + (end - start) * min(step / duration, 1.0)
+
+
+def exponential(start, end, half_life):
+    return lambda step: end + (start - end) * 0.5 ** (step / half_life)
+
+
+class TabularLearner(abc.ABC):
+    #subclasses say what a transition bootstraps from with _bootstrap()
+    def __init__(self, model, num_envs=64, epsilon=None, learning_rate=None, visit_power=0.6, seed=None, max_steps=1000):
+        self.model = model
+        self.env = gridworld_env.VectorGridWorldEnv(model, num_envs, seed, max_steps)
+        self.rng = np.random.default_rng(None if seed is None else np.random.SeedSequence(seed, spawn_key=(1,)))
+        self.n_actions = len(model.action_labels)
+        self.Q = np.zeros((model.rows, model.cols, self.n_actions))
+        self.q = self.Q.reshape(model.size, self.n_actions)         #flat view of the same memory
+        self.visits = np.zeros((model.size, self.n_actions), dtype=np.int64)
+        self.epsilon = epsilon or exponential(1.0, 0.01, 20000)
+        self.learning_rate = learning_rate
+        self.visit_power = visit_power
+        self.steps = 0              #environment steps so far (num_envs per batch)
+        self.episodes = 0
+        self.states = None
+        self.reset_envs = None      #environments reset by the previous step (they start a new episode)
+
+    def act(self, states):
+        #epsilon-greedy, breaking ties between equally good actions at random (a fresh table is all ties)
+        q = self.q[states]
+        best = q == q.max(axis=1, keepdims=True)
+        greedy = (best * self.rng.random(q.shape)).argmax(axis=1)
+        explore = self.rng.random(len(states)) < self.epsilon(self.steps)
+        return np.where(explore, self.rng.integers(self.n_actions, size=len(states)), greedy)
+
+    def _choose(self, states):
+        #actions taken in states on this step
+        return self.act(states)
+
+    @abc.abstractmethod
+    def _bootstrap(self, next_states):
+        #estimate of the next state's value for every environment (before terminals are masked out)
+        pass
+
+    def train(self, steps, callback=None, callback_every=None):
+        #runs at least steps environment steps; callback(self) is called every callback_every steps (every batch
+        #by default)
+        if self.states is None:
+            self.states, _ = self.env.reset()
+        num_envs = self.env.num_envs
+        callback_every = callback_every or num_envs
+        next_callback = self.steps + callback_every
+        end = self.steps + steps
+        while self.steps < end:
+            states = self.states
+            actions = self._choose(states)
+            observations, rewards, terminated, truncated, info = self.env.step(actions)
+            done = terminated | truncated
+            next_states = info['final_observation'] if done.any() else observations
+
+            future = np.where(terminated, info['terminal_value'], self._bootstrap(next_states))
+            errors = rewards + self.model.gamma * future - self.q[states, actions]
+            #one update per distinct pair, with the mean TD error of its samples in this batch
+            pairs, inverse, counts = np.unique(states * self.n_actions + actions, return_inverse=True, return_counts=True)
+            mean_errors = np.bincount(inverse, weights=errors) / counts
+            visits = self.visits.reshape(-1)
+            visits[pairs] += counts
+            if self.learning_rate is None:
+                alpha = np.minimum(counts * visits[pairs] ** -self.visit_power, 1.0)
+            else:
+                alpha = self.learning_rate(self.steps)
+            self.q.reshape(-1)[pairs] += alpha * mean_errors
+
+            self.states = observations
+            self.reset_envs = done
+            self.steps += num_envs
+            self.episodes += int(done.sum())
+            if callback is not None and self.steps >= next_callback:
+                callback(self)
+                next_callback += callback_every
+        return self
+
+    @property
+    def utils(self):
+        #max_a Q on live cells, the fixed utility on terminals, 0 on obstacles: comparable to SolverResult.utils
+        return np.where(self.model.live, self.q.max(axis=1), self.model.fixed_values).reshape(self.model.shape)
+
+
+class QLearning(TabularLearner):
+    #off-policy: bootstraps from the best action in the next state, whatever the agent does there
+    def _bootstrap(self, next_states):
+        return self.q[next_states].max(axis=1)
+
+
+class Sarsa(TabularLearner):
+    #on-policy: bootstraps from the action A' the epsilon-greedy policy picks in the next state, and then actually takes
+    #A' on the next step (S, A, R, S', A'), so it learns the values of the exploring policy; as epsilon decays they
+    #approach the optimal ones. Environments that were just reset pick a fresh action in their new start cell
+    next_actions = None
+
+    def _choose(self, states):
+        if self.next_actions is None:
+            return self.act(states)
+        actions = self.next_actions.copy()
+        if self.reset_envs.any():
+            actions[self.reset_envs] = self.act(states[self.reset_envs])
+        return actions
+
+    def _bootstrap(self, next_states):
+        self.next_actions = self.act(next_states)
+        return self.q[next_states, self.next_actions]
+
+
+LEARNERS = {'q-learning': QLearning, 'sarsa': Sarsa}
+
+
+def compare(learner, exact):
+    #(largest utility error, mean utility error, fraction of live cells whose greedy action is optimal) against an
+    #exact SolverResult
+    model = learner.model
+    live = model.live
+    errors = np.abs(learner.utils.ravel() - exact.utils.ravel())[live]
+    exact_q = exact.action_utilities.reshape(model.size, -1)[live]
+    chosen = np.take_along_axis(exact_q, learner.q[live].argmax(axis=1)[:, None], axis=1)[:, 0]
+    optimal = chosen >= exact_q.max(axis=1) - 1e-9
+    return errors.max(), errors.mean(), optimal.mean()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare Q-learning and SARSA against the exact GridWorld solution.')
+    parser.add_argument('--map', default=None, help='text or .npy map file (default: the 4x4 grid of AS2_P1.py)')
+    parser.add_argument('--gamma', type=float, default=0.98)
+    parser.add_argument('--steps', type=int, default=2000000, help='environment steps per learner')
+    parser.add_argument('--envs', type=int, default=64, help='environments stepped together')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='utility error that counts as converged')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if args.map:
+        model = gridworld.compile_map(args.map, args.gamma)
+    else:
+        model = gridworld.GridWorld.from_cells(4, [(1, 1), (2, 2)], {(3, 3): 10}, -1, args.gamma)
+    exact = gridworld.value_iteration(model, epsilon=1e-6)
+
+    for name, cls in LEARNERS.items():
+        learner = cls(model, args.envs, seed=args.seed)
+        reached = []
+        start = time.perf_counter()
+
+        def report(learner):
+            worst, mean, optimal = compare(learner, exact)
+            if worst < args.tolerance and not reached:
+                reached.append(learner.steps)
+            print(f"{name:>10} {learner.steps:>9} steps {time.perf_counter() - start:6.2f}s: max error {worst:8.4f}, "
+                  f"mean error {mean:8.4f}, optimal actions {optimal:6.1%}")
+
+        learner.train(args.steps, report, max(args.steps // 10, args.envs))
+        print(f"{name:>10}: max error below {args.tolerance} after "
+              f"{f'{reached[0]} steps' if reached else 'more than the budget'}, "
+              f"{learner.steps / (time.perf_counter() - start) / 1e6:.2f}M steps/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+'''Headless rendering of GridWorld utilities and policies (see gridworld.py), for maps far bigger than AS2_P1.plot() can
+draw.
+
+AS2_P1.plot() draws every cell with its own text, line and arrow artists and blocks on plt.show(). Here
+    - the utilities are one imshow() heatmap (obstacles left blank) and the policy is one quiver() call
+    - figures are plain matplotlib Figures saved with savefig(), so pyplot, a display and an interactive backend are
+      never needed; the format (PNG, SVG, PDF, ...) follows the file extension
+    - grids wider than max_pixels cells (by default the figure's width in pixels) are averaged down block by block
+      before drawing, and at most max_arrows arrows are drawn per side (one per block of cells); render_tiles()
+      instead writes the grid at full resolution as a set of tiles
+'''
+
+import math
+import os
+
+import numpy as np
+
+import gridworld
+
+
+def result_arrays(result):
+    #(utils, policy) of a SolverResult as drawn here: utilities with NaN on obstacles, policy with -1 where there is
+    #no action to show (obstacles and terminals)
+    model = result.model
+    utils = np.where(model.blocked, np.nan, result.utils.ravel()).reshape(model.shape)
+    _, greedy = model.backup(result.utils.ravel(), greedy=True)
+    policy = np.where(model.live, greedy, -1).reshape(model.shape)
+    return utils, policy
+
+
+def downsample(values, factor):
+    #mean of every factor x factor block, ignoring NaN (a block of obstacles only stays NaN)
+    if factor <= 1:
+        return values
+    rows, cols = values.shape
+    padded = np.full((-(-rows // factor) * factor, -(-cols // factor) * factor), np.nan)
+    padded[:rows, :cols] = values
+    blocks = padded.reshape(padded.shape[0] // factor, factor, padded.shape[1] // factor, factor)
+    counts = (~np.isnan(blocks)).sum(axis=(1, 3))
+    sums = np.nansum(blocks, axis=(1, 3))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+
+def _arrows(policy, action_labels, max_arrows, offset=(0, 0)):
+    #one arrow per stride x stride block, taken from the cell in the middle of the block
+    stride = max(1, math.ceil(max(policy.shape) / max_arrows))
+    rows = np.arange(stride // 2, policy.shape[0], stride)
+    cols = np.arange(stride // 2, policy.shape[1], stride)
+    i, j = np.meshgrid(rows, cols, indexing='ij')
+    actions = policy[i, j]
+    shown = actions >= 0
+    directions = np.array([gridworld.ACTIONS[label] for label in action_labels], dtype=float)
+    di, dj = directions[actions[shown]].T
+    #quiver's default angles are in screen space: +v points up, whatever the direction of the y axis
+    return j[shown] + offset[1], i[shown] + offset[0], dj * stride, -di * stride
+
+
+def render(utils, policy=None, path=None, action_labels=gridworld.ACTION_LABELS, title=None, max_pixels=None,
+           max_arrows=48, offset=(0, 0), figsize=8, dpi=100, cmap='viridis'):
+    #draws utils (rows, cols; NaN = obstacle) and optionally policy (rows, cols of action indices, -1 = none).
+    #Returns the Figure, and saves it to path when given. offset is the (row, col) of utils[0, 0] in the whole map
+    rows, cols = utils.shape
+    if max_pixels is None:
+        max_pixels = figsize * dpi          #no point in more cells than the figure has pixels
+    factor = max(1, math.ceil(max(rows, cols) / max_pixels))
+    image = downsample(utils, factor)
+
+    from matplotlib.figure import Figure     #matplotlib is only imported once something is drawn
+    scale = figsize / max(rows, cols)
+    fig = Figure(figsize=(max(cols * scale, 2) + 1.5, max(rows * scale, 2)), dpi=dpi)
+    ax = fig.add_subplot()
+    extent = (offset[1] - 0.5, offset[1] + cols - 0.5, offset[0] + rows - 0.5, offset[0] - 0.5)
+    heatmap = ax.imshow(image, cmap=cmap, interpolation='nearest', extent=extent)
+    fig.colorbar(heatmap, ax=ax, label='utility')
+    if policy is not None:
+        x, y, u, v = _arrows(policy, action_labels, max_arrows, offset)
+        ax.quiver(x, y, u, v, angles='uv', scale_units='xy', scale=1.25, width=0.003, color='white', pivot='middle')
+    if title:
+        ax.set_title(title)
+    if path is not None:
+        fig.savefig(path)
+    return fig
+
+
+def render_result(result, path=None, **kwargs):
+    utils, policy = result_arrays(result)
+    return render(utils, policy, path, result.model.action_labels, **kwargs)
+
+
+def render_tiles(result, directory, tile=512, extension='png', **kwargs):
+    #the whole map at full resolution, tile x tile cells per file (tile_<row>_<col>.<extension>); returns the paths
+    utils, policy = result_arrays(result)
+    max_arrows = kwargs.pop('max_arrows', tile // 8)
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for top in range(0, utils.shape[0], tile):
+        for left in range(0, utils.shape[1], tile):
+            block = (slice(top, top + tile), slice(left, left + tile))
+            path = os.path.join(directory, f"tile_{top // tile}_{left // tile}.{extension}")
+            render(utils[block], policy[block], path, result.model.action_labels, max_pixels=tile,
+                   max_arrows=max_arrows, offset=(top, left), **kwargs)
+            paths.append(path)
+    return paths
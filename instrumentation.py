@@ -0,0 +1,165 @@
+'''Opt-in runtime instrumentation for the solvers: search counters, restart counts, per-sweep residuals.
+
+The instrumented modules (AS1_P2, AS1_P3, Test1_P3, Test_P3, gridworld) each have a module-level
+    probe = None
+and their hot loops only do `if probe is not None:` before reporting anything, so with no probe attached they run
+as before (one global lookup per node or step). Attach a Probe for a block of code with instrumented():
+
+    probe = instrumentation.Probe()
+    with instrumentation.instrumented(probe, AS1_P2):
+        AS1_P2.best_move(board)
+    print(instrumentation.to_prometheus(probe))
+
+What gets reported:
+    - AS1_P2 minimax: nodes, cutoffs (alpha-beta breaks) and tt_hits / tt_misses, per depth
+    - hill climbers and the other local searches: steps, restarts and the final cost of every climb (climb_cost),
+      labeled by problem with EIGHT_QUEENS / EIGHT_PUZZLE whichever module ran it. restarts counts the fresh random
+      states a search jumps to after its first one (after a local minimum, or Test_P3.hillClimb's next run)
+    - gridworld.value_iteration (and so AS2_P1): sweeps, and the Bellman residual of every sweep (residual)
+
+A Probe keeps counters (count(), summed per metric and label set) and events (event(), every value in order). Observers
+added with observe(callback) get every event as callback(metric, value, labels) as it happens, e.g. to watch a long
+value iteration converge. Counters and events can be exported as Prometheus text (to_prometheus) or CSV (write_csv).
+
+Restarts run by restarts.run_restarts() happen in worker processes, whose module globals are their own: instrument a
+restart function by attaching the probe inside it, or run the climb in-process.'''
+
+import argparse
+import contextlib
+import csv
+import sys
+from collections import defaultdict
+
+
+EIGHT_QUEENS = '8-queens'           #problem label values
+EIGHT_PUZZLE = '8-puzzle'
+
+class Probe:
+    def __init__(self):
+        self.counters = defaultdict(int)        #(metric, labels) -> total; labels is a sorted tuple of (name, value)
+        self.events = defaultdict(list)         #(metric, labels) -> every value in order
+        self.observers = []
+
+    def count(self, metric, value=1, **labels):
+        self.counters[metric, tuple(sorted(labels.items()))] += value
+
+    def event(self, metric, value, **labels):
+        self.events[metric, tuple(sorted(labels.items()))].append(value)
+        for observer in self.observers:
+            observer(metric, value, labels)
+
+    def observe(self, callback):
+        self.observers.append(callback)
+        return callback
+
+    def total(self, metric, **labels):
+        #sum of a counter over every label set that contains the given labels
+        wanted = set(labels.items())
+        return sum(value for (name, key), value in self.counters.items() if name == metric and wanted <= set(key))
+
+    def rate(self, metric, of, **labels):
+        #total(metric) / total(of), e.g. rate('cutoffs', 'nodes', depth=2); None without any of
+        total = self.total(of, **labels)
+        return self.total(metric, **labels) / total if total else None
+
+    def reset(self):
+        self.counters.clear()
+        self.events.clear()
+
+
+@contextlib.contextmanager
+def instrumented(probe, *modules):
+    #sets module.probe for the duration of the block and puts the previous value back afterwards
+    previous = [module.probe for module in modules]
+    for module in modules:
+        module.probe = probe
+    try:
+        yield probe
+    finally:
+        for module, old in zip(modules, previous):
+            module.probe = old
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{value}"' for name, value in labels) + '}'
+
+
+def to_prometheus(probe, prefix='solver_'):
+    #Prometheus text exposition format: counters as <prefix><metric>_total, events as a gauge of the last value plus
+    #an _events_total counter
+    lines = []
+    by_metric = defaultdict(list)
+    for (metric, labels), value in sorted(probe.counters.items(), key=repr):
+        by_metric[metric].append((labels, value))
+    for metric, samples in by_metric.items():
+        lines.append(f'# TYPE {prefix}{metric}_total counter')
+        lines += [f'{prefix}{metric}_total{_labels(labels)} {value}' for labels, value in samples]
+
+    by_metric = defaultdict(list)
+    for (metric, labels), values in sorted(probe.events.items(), key=repr):
+        by_metric[metric].append((labels, values))
+    for metric, samples in by_metric.items():
+        lines.append(f'# TYPE {prefix}{metric} gauge')
+        lines += [f'{prefix}{metric}{_labels(labels)} {values[-1]}' for labels, values in samples]
+        lines.append(f'# TYPE {prefix}{metric}_events_total counter')
+        lines += [f'{prefix}{metric}_events_total{_labels(labels)} {len(values)}' for labels, values in samples]
+    return '\n'.join(lines) + '\n'
+
+
+def write_csv(probe, f):
+    #one row per counter and one per event value: kind, metric, labels (name=value;...), index, value.
+    #f is a path or an open text file
+    if isinstance(f, str):
+        with open(f, 'w', newline='') as out:
+            return write_csv(probe, out)
+    writer = csv.writer(f)
+    writer.writerow(['kind', 'metric', 'labels', 'index', 'value'])
+    for (metric, labels), value in sorted(probe.counters.items(), key=repr):
+        writer.writerow(['counter', metric, ';'.join(f'{k}={v}' for k, v in labels), '', value])
+    for (metric, labels), values in sorted(probe.events.items(), key=repr):
+        for i, value in enumerate(values):
+            writer.writerow(['event', metric, ';'.join(f'{k}={v}' for k, v in labels), i, value])
+
+
+def main():
+    #runs each instrumented solver once with a probe attached and prints what it saw
+    parser = argparse.ArgumentParser(description='Run the solvers with instrumentation and export the counters.')
+    parser.add_argument('--format', choices=['prometheus', 'csv'], default='prometheus')
+    parser.add_argument('--output', default=None, help='file to write to (default: print)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    import numpy as np
+    import AS1_P2
+    import AS1_P3
+    import Test1_P3
+    import Test_P3
+    import gridworld
+
+    probe = Probe()
+    with instrumented(probe, AS1_P2, AS1_P3, Test1_P3, Test_P3, gridworld):
+        AS1_P2.best_move([' '] * 9, AS1_P2.TranspositionTable())
+        rng = np.random.default_rng(args.seed)
+        AS1_P3.EightQueens(rng.permutation(8)).hill_climb(rng)
+        Test1_P3.EightPuzzle(rng=rng).hill_climb(rng)
+        Test_P3.hillClimb('8-Puzzle', Test_P3.calculateHeuristic, Test_P3.generateRandomState, Test_P3.neighbors8Puzzle,
+                          [1, 2, 3, 4, 5, 6, 7, 8, 0], 9, False)
+        gridworld.value_iteration(gridworld.random_grid(64, 64, seed=args.seed))
+
+    lookups = probe.total('tt_hits') + probe.total('tt_misses')
+    print(f"minimax: {probe.total('nodes')} nodes, cutoff rate {probe.rate('cutoffs', 'nodes'):.1%}, "
+          f"TT hit rate {probe.total('tt_hits') / lookups:.1%}; value iteration: {probe.total('sweeps')} sweeps, "
+          f"final residual {probe.events['residual', ()][-1]:.2g}", file=sys.stderr)
+    if args.format == 'csv':
+        write_csv(probe, args.output or sys.stdout)
+    elif args.output:
+        with open(args.output, 'w') as f:
+            f.write(to_prometheus(probe))
+    else:
+        print(to_prometheus(probe), end='')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+'''Missionaries & Cannibals variants in bulk: n missionaries and n cannibals, a boat for k people, for whole grids of
+(n, k) at once.
+
+AS1_P1.bfs() searches one variant from one start state. Here a variant is compiled into arrays once:
+    - the valid states: on each bank missionaries are either absent or not outnumbered, so m == 0, m == n or m == c
+      on the left bank; there are only about 6n of them, kept sorted by their AS1_P1.pack() key
+    - the moves: AS1_P1.boat_moves(k), turned into a (states, moves) table of successor indices (-1 = illegal)
+    - one breadth-first search from the goal (everyone on the right bank), level by level on whole frontiers with
+      NumPy. Moves can always be undone, so the distance of every state to the goal is the optimal number of crossings
+      from it: this single pass tells, for every start state at once, whether it can be solved and in how many
+      crossings, but only for that one goal
+    - all_pairs(): the same search from every goal (or a chosen set of goals) at once, one row of the frontier per
+      goal, for the optimal crossing count between every start/goal pair. It holds a (goals, states) matrix, so about
+      (6n)^2 numbers: cheap up to n in the hundreds, for bigger n pass the goals you need
+
+sweep() runs the single-goal search for every (n, k) of a grid on a process pool and returns the grid of crossing
+counts for the usual start (everyone on the left bank) and goal (everyone on the right bank), -1 where there is no
+solution.'''
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import AS1_P1
+
+
+UNSOLVABLE = -1
+
+
+class CrossingGraph:
+    def __init__(self, n, k):
+        self.n, self.k = n, k
+        self.moves = np.array(AS1_P1.boat_moves(k), dtype=np.int64).reshape(-1, 2)
+
+        #valid left-bank counts (m, c): m == 0, m == n or m == c, for both boat positions
+        c = np.arange(n + 1, dtype=np.int64)
+        m = np.concatenate([np.zeros(n + 1, dtype=np.int64), np.full(n + 1, n, dtype=np.int64), c])
+        c = np.concatenate([c, c, c])
+        keys = np.unique(np.concatenate([(m * (n + 1) + c) * 2, (m * (n + 1) + c) * 2 + 1]))
+        self.keys = keys                                #sorted AS1_P1.pack() keys of the valid states
+        self.m, rest = np.divmod(keys // 2, n + 1)
+        self.c = rest
+        self.right = keys % 2 == 1                      #boat on the right bank
+
+        #successor of every state for every move: the boat carries (dm, dc) away from the bank it is on
+        sign = np.where(self.right, 1, -1)[:, None]
+        next_m = self.m[:, None] + sign * self.moves[:, 0]
+        next_c = self.c[:, None] + sign * self.moves[:, 1]
+        inside = (next_m >= 0) & (next_m <= n) & (next_c >= 0) & (next_c <= n)
+        next_keys = (next_m * (n + 1) + next_c) * 2 + (~self.right)[:, None]
+        index = np.searchsorted(keys, np.where(inside, next_keys, 0))
+        index = np.minimum(index, len(keys) - 1)
+        legal = inside & (keys[index] == next_keys)     #the next state exists, i.e. nobody gets eaten
+        self.successors = np.where(legal, index, -1)
+
+    def index(self, state):
+        key = AS1_P1.pack(state, self.n)
+        i = int(np.searchsorted(self.keys, key))
+        if i == len(self.keys) or self.keys[i] != key:
+            raise ValueError(f"not a valid state for n = {self.n}: {state}")
+        return i
+
+    def distances(self, target=None):
+        #fewest crossings from every state to target (default: everyone on the right bank), UNSOLVABLE if none.
+        #Moves are reversible, so this is a breadth-first search outwards from the target
+        target = (0, 0, 'R') if target is None else target
+        distance = np.full(len(self.keys), UNSOLVABLE, dtype=np.int64)
+        frontier = np.array([self.index(target)])
+        distance[frontier] = 0
+        level = 0
+        while len(frontier):
+            level += 1
+            reached = self.successors[frontier].ravel()
+            reached = np.unique(reached[reached >= 0])
+            frontier = reached[distance[reached] == UNSOLVABLE]
+            distance[frontier] = level
+        return distance
+
+    def all_pairs(self, goals=None):
+        #fewest crossings between every pair of states: result[g, s] is from state s to goals[g] (default: every
+        #state, in self.keys order, so the matrix is square and symmetric), UNSOLVABLE if s can't reach it.
+        #Every goal gets its own row of the frontier and all rows advance together; a move leads each state to a
+        #different state, so one fancy-indexed OR per move spreads a whole level
+        goals = np.arange(len(self.keys)) if goals is None else np.array([self.index(goal) for goal in goals])
+        distance = np.full((len(goals), len(self.keys)), UNSOLVABLE, dtype=np.int32)
+        frontier = np.zeros(distance.shape, dtype=bool)
+        frontier[np.arange(len(goals)), goals] = True
+        distance[frontier] = 0
+        level = 0
+        while frontier.any():
+            level += 1
+            reached = np.zeros_like(frontier)
+            for successor in self.successors.T:
+                legal = successor >= 0
+                reached[:, successor[legal]] |= frontier[:, legal]
+            frontier = reached & (distance == UNSOLVABLE)
+            distance[frontier] = level
+        return distance
+
+    def crossings(self, start=None, distance=None):
+        start = (self.n, self.n, 'L') if start is None else start
+        distance = self.distances() if distance is None else distance
+        return int(distance[self.index(start)])
+
+
+def solve(n, k):
+    #optimal number of crossings for n missionaries, n cannibals and a boat for k, UNSOLVABLE if impossible
+    return CrossingGraph(n, k).crossings()
+
+
+def _solve_block(k, people):
+    return [solve(n, k) for n in people]
+
+
+def sweep(people, capacities, workers=None, blocks_per_capacity=4):
+    #grid[i, j] = solve(people[i], capacities[j]), run on a process pool. Big n costs more than small n, so every
+    #capacity's range of n is split into a few interleaved blocks to keep the workers evenly loaded
+    people = list(people)
+    capacities = list(capacities)
+    grid = np.empty((len(people), len(capacities)), dtype=np.int64)
+    rows = [np.arange(start, len(people), blocks_per_capacity) for start in range(min(blocks_per_capacity, len(people)))]
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as executor:
+        futures = {(j, block): executor.submit(_solve_block, k, [people[i] for i in rows[block]])
+                   for j, k in enumerate(capacities) for block in range(len(rows))}
+        for (j, block), future in futures.items():
+            grid[rows[block], j] = future.result()
+    return grid
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Solve Missionaries & Cannibals for a grid of (n, k) variants.')
+    parser.add_argument('--people', type=int, nargs=3, default=[1, 1000, 1], metavar=('FIRST', 'LAST', 'STEP'),
+                        help='range of n, inclusive')
+    parser.add_argument('--capacities', type=int, nargs=3, default=[1, 24, 1], metavar=('FIRST', 'LAST', 'STEP'),
+                        help='range of k, inclusive')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--csv', default=None, help='write the grid here (rows n, columns k)')
+    args = parser.parse_args()
+
+    people = range(args.people[0], args.people[1] + 1, args.people[2])
+    capacities = range(args.capacities[0], args.capacities[1] + 1, args.capacities[2])
+    grid = sweep(people, capacities, args.workers)
+
+    if args.csv:
+        header = 'n,' + ','.join(f'k={k}' for k in capacities)
+        np.savetxt(args.csv, np.column_stack([np.array(people), grid]), fmt='%d', delimiter=',', header=header, comments='')
+    for j, k in enumerate(capacities):
+        solvable = grid[:, j] != UNSOLVABLE
+        largest = max((n for n, ok in zip(people, solvable) if ok), default=None)
+        print(f"k = {k:>3}: solvable for {int(solvable.sum())} of {len(people)} values of n, largest solvable n = {largest}")
+
+
+if __name__ == '__main__':
+    main()
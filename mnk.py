@@ -0,0 +1,316 @@
+'''Generalized m,n,k-game engine: m rows, n columns, the first player to get k stones in a row (horizontally, vertically
+or diagonally) wins. Tic-tac-toe is the 3,3,3 game; 4x4, 5,5,4 and gomoku (15,15,5) use the same engine.
+
+Practice.py's minimax/best_move search the whole 3x3 tree. On bigger boards that is impossible, so this engine uses
+    - iterative deepening under a time budget per move (the deepest completed iteration wins)
+    - alpha-beta with move ordering: previous best move first, then killer moves, then the history heuristic
+    - a pluggable static evaluator for the leaves of the depth-limited search
+and reports nodes searched, nodes per second and the effective branching factor of every search.
+
+Boards are the same 1D lists of ' '/'X'/'O' used by the tic-tac-toe scripts (cell = row * n + col); 'X' is maximizing.'''
+
+import math
+import time
+
+
+WIN_SCORE = 10 ** 9         #utility of a win at the root; like 10 - depth, a win found at ply p scores WIN_SCORE - p
+TIME_CHECK_INTERVAL = 16    #nodes searched between two looks at the clock; a gomoku node costs ~0.2 ms, a clock read ~0.1 us
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class SearchStats:
+    def __init__(self):
+        self.nodes = 0
+        self.elapsed = 0.0
+        self.depth = 0                  #deepest completed iteration
+        self.iteration_nodes = []       #nodes searched by each completed iteration
+        self.value = 0                  #utility of the chosen move from the deepest completed iteration
+
+    @property
+    def nodes_per_second(self):
+        return self.nodes / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def effective_branching_factor(self):
+        #how many more nodes one extra ply costs: ratio of the node counts of the last two completed iterations
+        if len(self.iteration_nodes) < 2 or self.iteration_nodes[-2] == 0:
+            return float(self.iteration_nodes[-1]) if self.iteration_nodes else 0.0
+        return self.iteration_nodes[-1] / self.iteration_nodes[-2]
+
+    def __repr__(self):
+        return (f"SearchStats(depth={self.depth}, nodes={self.nodes}, elapsed={self.elapsed:.3f}s, "
+                f"nps={self.nodes_per_second:.0f}, ebf={self.effective_branching_factor:.2f})")
+
+
+def window_evaluator(engine, board):
+    #default static evaluator: every window of k cells that only one player has stones in is still winnable for them,
+    #and is worth more the more stones it already has (10 ** stones). Positive is good for 'X'
+    score = 0
+    for window in engine.windows:
+        x_count = o_count = 0
+        for cell in window:
+            if board[cell] == 'X':
+                x_count += 1
+            elif board[cell] == 'O':
+                o_count += 1
+        if o_count == 0 and x_count > 0:
+            score += 10 ** x_count
+        elif x_count == 0 and o_count > 0:
+            score -= 10 ** o_count
+    return score
+
+
+class MNKEngine:
+    #evaluator(engine, board) scores a non-terminal leaf from 'X's point of view; it must stay well below WIN_SCORE.
+    #neighborhood=None searches every empty cell; on big boards set it to 1 or 2 to only consider cells within that
+    #distance of a stone already on the board
+    def __init__(self, m, n, k, evaluator=window_evaluator, neighborhood=None):
+        self.m, self.n, self.k = m, n, k
+        self.evaluator = evaluator
+        self.neighborhood = neighborhood
+        self.size = m * n
+        self.directions = [(0, 1), (1, 0), (1, 1), (1, -1)]
+        self.windows = self._windows()
+        self.neighbors = self._neighbors() if neighborhood else None
+        self.stats = SearchStats()
+        self.killers = []
+        self.history = {}
+        self.deadline = None
+
+    def _windows(self):
+        windows = []
+        for row in range(self.m):
+            for col in range(self.n):
+                for dr, dc in self.directions:
+                    end_row, end_col = row + dr * (self.k - 1), col + dc * (self.k - 1)
+                    if 0 <= end_row < self.m and 0 <= end_col < self.n:
+                        windows.append(tuple((row + dr * i) * self.n + col + dc * i for i in range(self.k)))
+        return windows
+
+    def _neighbors(self):
+        r = self.neighborhood
+        neighbors = []
+        for cell in range(self.size):
+            row, col = divmod(cell, self.n)
+            neighbors.append([nr * self.n + nc for nr in range(max(0, row - r), min(self.m, row + r + 1))
+                              for nc in range(max(0, col - r), min(self.n, col + r + 1)) if (nr, nc) != (row, col)])
+        return neighbors
+
+    def is_win(self, board, cell, player):
+        #only lines through the stone just placed can have been completed by it
+        row, col = divmod(cell, self.n)
+        for dr, dc in self.directions:
+            count = 1
+            for sign in (1, -1):
+                r, c = row + sign * dr, col + sign * dc
+                while 0 <= r < self.m and 0 <= c < self.n and board[r * self.n + c] == player:
+                    count += 1
+                    r, c = r + sign * dr, c + sign * dc
+            if count >= self.k:
+                return True
+        return False
+
+    def winner(self, board):
+        for window in self.windows:
+            first = board[window[0]]
+            if first != ' ' and all(board[cell] == first for cell in window):
+                return first
+        return None
+
+    def candidate_moves(self, board):
+        if self.neighbors is None:
+            return [cell for cell in range(self.size) if board[cell] == ' ']
+        candidates = set()
+        for cell in range(self.size):
+            if board[cell] != ' ':
+                candidates.update(c for c in self.neighbors[cell] if board[c] == ' ')
+        if not candidates:
+            return [(self.m // 2) * self.n + self.n // 2] if board[(self.m // 2) * self.n + self.n // 2] == ' ' else \
+                [cell for cell in range(self.size) if board[cell] == ' ']
+        return sorted(candidates)
+
+    def _ordered_moves(self, board, ply, player, first_move=None):
+        moves = self.candidate_moves(board)
+        killers = self.killers[ply] if ply < len(self.killers) else ()
+        history = self.history.get(player, {})
+
+        def priority(cell):
+            if cell == first_move:
+                return (0, 0)
+            if cell in killers:
+                return (1, killers.index(cell))
+            return (2, -history.get(cell, 0))
+
+        moves.sort(key=priority)        #stable sort: equal priorities stay in increasing cell order
+        return moves
+
+    def _record_cutoff(self, cell, ply, depth_left, player):
+        while len(self.killers) <= ply:
+            self.killers.append([])
+        killers = self.killers[ply]
+        if cell not in killers:
+            killers.insert(0, cell)     #two killer slots per ply, most recent first
+            del killers[2:]
+        history = self.history.setdefault(player, {})
+        history[cell] = history.get(cell, 0) + depth_left * depth_left      #deep cutoffs count more than shallow ones
+
+    def _tick(self):
+        self.stats.nodes += 1
+        if self.stats.nodes % TIME_CHECK_INTERVAL == 0 and self.deadline is not None and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+
+    def minimax(self, board, depth_left, ply, is_maximizing, alpha, beta, empty):
+        #board is modified in place and restored before returning; "empty" is the number of empty cells left
+        self._tick()
+        if empty == 0:
+            return 0                #draw
+        if depth_left == 0:
+            return self.evaluator(self, board)
+
+        player = 'X' if is_maximizing else 'O'
+        best_val = -math.inf if is_maximizing else math.inf
+        for cell in self._ordered_moves(board, ply, player):
+            board[cell] = player
+            if self.is_win(board, cell, player):
+                utility = WIN_SCORE - (ply + 1) if is_maximizing else (ply + 1) - WIN_SCORE
+            else:
+                utility = self.minimax(board, depth_left - 1, ply + 1, not is_maximizing, alpha, beta, empty - 1)
+            board[cell] = ' '
+
+            if is_maximizing:
+                best_val = max(best_val, utility)
+                alpha = max(alpha, best_val)
+            else:
+                best_val = min(best_val, utility)
+                beta = min(beta, best_val)
+            if alpha >= beta:
+                self._record_cutoff(cell, ply, depth_left, player)
+                break
+        return best_val
+
+    def _search_root(self, board, depth, is_maximizing, first_move, empty):
+        player = 'X' if is_maximizing else 'O'
+        best_val = -math.inf if is_maximizing else math.inf
+        best_cell = None
+        alpha, beta = -math.inf, math.inf
+        for cell in self._ordered_moves(board, 0, player, first_move):
+            board[cell] = player
+            if self.is_win(board, cell, player):
+                utility = WIN_SCORE - 1 if is_maximizing else 1 - WIN_SCORE
+            else:
+                utility = self.minimax(board, depth - 1, 1, not is_maximizing, alpha, beta, empty - 1)
+            board[cell] = ' '
+            if (utility > best_val) if is_maximizing else (utility < best_val):
+                best_val, best_cell = utility, cell
+                if is_maximizing:
+                    alpha = max(alpha, best_val)
+                else:
+                    beta = min(beta, best_val)
+        return best_cell, best_val
+
+    def best_move(self, board, player='X', time_budget=1.0, max_depth=None):
+        #iterative deepening: search depth 1, 2, 3, ... until time_budget seconds are used up (None = no limit)
+        #and return the best move of the deepest completed iteration; the clock is read every TIME_CHECK_INTERVAL nodes,
+        #so an iteration that runs past the deadline is abandoned within a few nodes. Statistics are left in self.stats
+        empty = board.count(' ')
+        if empty == 0:
+            return -1
+        if max_depth is None:
+            max_depth = empty
+        is_maximizing = player == 'X'
+        board = list(board)         #a timeout can interrupt the search half-way through a move, so we never search on the caller's board
+
+        self.stats = SearchStats()
+        self.killers = []
+        self.history = {}
+        self.deadline = None
+        start = time.perf_counter()
+
+        best_cell = None
+        for depth in range(1, max_depth + 1):
+            if depth > 1 and time_budget is not None:
+                self.deadline = start + time_budget     #depth 1 always completes, so we always have a move
+                if time.perf_counter() > self.deadline:
+                    break
+            nodes_before = self.stats.nodes
+            try:
+                cell, value = self._search_root(board, depth, is_maximizing, best_cell, empty)
+            except SearchTimeout:
+                break
+            best_cell = cell
+            self.stats.depth = depth
+            self.stats.value = value
+            self.stats.iteration_nodes.append(self.stats.nodes - nodes_before)
+            if abs(value) >= WIN_SCORE - max_depth:    #forced win/loss found, deeper searches won't change it
+                break
+
+        self.stats.elapsed = time.perf_counter() - start
+        return best_cell
+
+
+def print_board(board, n):
+    for i in range(0, len(board), n):
+        print(" | ".join(board[i:i + n]))
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description='Play an m,n,k-game against the engine (AI is X and moves first).')
+    parser.add_argument('m', type=int)
+    parser.add_argument('n', type=int)
+    parser.add_argument('k', type=int)
+    parser.add_argument('--time', type=float, default=2.0, help='seconds per AI move')
+    parser.add_argument('--neighborhood', type=int, default=None, help='only consider cells this close to a stone')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='split the root moves across this many processes; searches --depth plies instead of --time')
+    parser.add_argument('--depth', type=int, default=4, help='search depth per AI move with --workers')
+    args = parser.parse_args()
+
+    engine = MNKEngine(args.m, args.n, args.k, neighborhood=args.neighborhood)
+    split = None
+    if args.workers > 1:
+        import parallel_search      #imports this module, so it can't be imported at the top
+        split = parallel_search.MNKRootSplitSearch(args.m, args.n, args.k, args.workers, neighborhood=args.neighborhood)
+    board = [' '] * (args.m * args.n)
+    while True:
+        if split is not None:
+            ai_move = split.best_move(board, 'X', min(args.depth, board.count(' ')))
+            print("AI chose position:", ai_move + 1, f"(depth {args.depth}, {split.nodes} nodes)")
+        else:
+            ai_move = engine.best_move(board, 'X', args.time)
+            print("AI chose position:", ai_move + 1, engine.stats)
+        board[ai_move] = 'X'
+        print_board(board, args.n)
+        if engine.is_win(board, ai_move, 'X'):
+            print("AI Wins!")
+            break
+        if ' ' not in board:
+            print("It's a draw!")
+            break
+
+        while True:
+            try:
+                human_move = int(input(f"Enter your move (1 - {len(board)}): ")) - 1
+                if 0 <= human_move < len(board) and board[human_move] == ' ':
+                    board[human_move] = 'O'
+                    break
+                print("Invalid move. Try again.")
+            except ValueError:
+                print("Invalid input. Try again.")
+        if engine.is_win(board, human_move, 'O'):
+            print_board(board, args.n)
+            print("You Win!")
+            break
+        if ' ' not in board:
+            print("It's a draw!")
+            break
+
+    if split is not None:
+        split.close()
+
+
+if __name__ == '__main__':
+    main()
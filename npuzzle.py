@@ -0,0 +1,453 @@
+'''Optimal solvers for the sliding tile puzzles (8-puzzle, 15-puzzle, ...).
+
+The hill climbers in Test1_P3.py and Test_P3.py only follow the misplaced-tile count down and restart when stuck,
+and half of their random starting states can't be solved at all. This module finds shortest solutions:
+    - A* on a binary heap of __slots__ nodes, with states packed into ints (4 bits per tile) everywhere in the search
+    - IDA* (iterative deepening A*), which only keeps the current path in memory
+    - Manhattan distance plus linear conflicts, and additive pattern databases for the 15-puzzle, all of which the
+      searches evaluate straight on the packed ints (see "Heuristics on packed states")
+    - a parity check that rejects unsolvable states before any search starts
+
+A state is a tuple of width * width tiles in row-major order, 0 being the blank; the goal is (1, 2, ..., 0).
+Lists and 3x3 NumPy arrays like EightPuzzle.state are accepted too. Solutions are returned as the list of states
+from the start to the goal.'''
+
+from collections import deque
+import functools
+import heapq
+import itertools
+import math
+import os
+
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.npuzzle_cache')
+
+#additive pattern database partition for the 15-puzzle: every tile is in exactly one pattern
+PATTERNS_15 = [(1, 2, 5, 6), (3, 4, 7, 8), (9, 10, 13, 14), (11, 12, 15)]
+
+
+def as_state(state):
+    if hasattr(state, 'ravel'):         #NumPy board like EightPuzzle.state
+        state = state.ravel()
+    state = tuple(int(tile) for tile in state)
+    width = math.isqrt(len(state))
+    if width * width != len(state) or sorted(state) != list(range(len(state))):
+        raise ValueError(f"not a sliding puzzle state: {state}")
+    return state
+
+
+def goal_state(width):
+    return tuple(range(1, width * width)) + (0,)
+
+
+def pack(state):
+    #4 bits per tile, so the 15-puzzle fits in one 64-bit int
+    packed = 0
+    for i, tile in enumerate(state):
+        packed |= tile << (4 * i)
+    return packed
+
+
+def unpack(packed, size):
+    return tuple((packed >> (4 * i)) & 0xF for i in range(size))
+
+
+def is_solvable(state):
+    #a move never changes the parity of (inversions + blank row, the blank row only counting on even widths),
+    #so a state is solvable exactly when that parity is the same as the goal's
+    state = as_state(state)
+    width = math.isqrt(len(state))
+    tiles = [tile for tile in state if tile != 0]
+    inversions = sum(1 for i, j in itertools.combinations(range(len(tiles)), 2) if tiles[i] > tiles[j])
+    if width % 2 == 1:
+        return inversions % 2 == 0
+    blank_row = state.index(0) // width
+    return (inversions + blank_row) % 2 == (width - 1) % 2
+
+
+def _moves(width):
+    #moves[p] = cells the blank can move to from cell p
+    moves = []
+    for p in range(width * width):
+        row, col = divmod(p, width)
+        moves.append([q for q, ok in ((p - width, row > 0), (p + width, row < width - 1), (p - 1, col > 0), (p + 1, col < width - 1)) if ok])
+    return moves
+
+
+def neighbors(state, moves):
+    blank = state.index(0)
+    for q in moves[blank]:
+        child = list(state)
+        child[blank], child[q] = child[q], 0
+        yield tuple(child)
+
+
+class MoveTable:
+    #moves on packed states without unpacking them. With the blank at p and tile t at q, sliding t into the blank
+    #sets nibble p to t and clears nibble q, i.e. adds t * ((1 << 4p) - (1 << 4q)); both the shift that reads t and
+    #that multiplier are precomputed for every (p, q), so a neighbor is one shift, one mask, one multiply and one add
+    def __init__(self, width):
+        self.width = width
+        self.size = width * width
+        self.goal = pack(goal_state(width))
+        self.moves = [tuple((q, 4 * q, (1 << 4 * p) - (1 << 4 * q)) for q in targets) for p, targets in enumerate(_moves(width))]
+
+    def neighbors(self, packed, blank):
+        #yields (child, blank position in child)
+        for q, shift, unit in self.moves[blank]:
+            yield packed + ((packed >> shift) & 0xF) * unit, q
+
+
+@functools.lru_cache(maxsize=None)
+def move_table(width):
+    return MoveTable(width)
+
+
+class PuzzleNode:
+    #search frontier entry; __slots__ keeps it at a few dozen bytes so millions of them fit in memory
+    __slots__ = ('state', 'blank', 'g', 'f', 'parent')
+
+    def __init__(self, state, blank, g, f, parent):
+        self.state = state          #packed state
+        self.blank = blank          #cached blank position
+        self.g = g
+        self.f = f
+        self.parent = parent
+
+    def __lt__(self, other):
+        #heap order: lowest f first, and among equal f the deepest node (closest to a goal)
+        return self.f < other.f or (self.f == other.f and self.g > other.g)
+
+    def path(self, size):
+        path = []
+        node = self
+        while node is not None:
+            path.append(unpack(node.state, size))
+            node = node.parent
+        return path[::-1]
+
+
+# ---- Heuristics ----
+
+def manhattan(state):
+    width = math.isqrt(len(state))
+    total = 0
+    for p, tile in enumerate(state):
+        if tile:
+            goal = tile - 1
+            total += abs(p // width - goal // width) + abs(p % width - goal % width)
+    return total
+
+
+def linear_conflicts(state):
+    #two tiles in their goal row (or column) but in the wrong order: one of them has to leave the line and come back,
+    #which costs 2 moves more than their Manhattan distances
+    width = math.isqrt(len(state))
+    extra = 0
+    for line in range(width):
+        row_tiles = [state[line * width + col] for col in range(width)]
+        row_goals = [(tile - 1) % width for tile in row_tiles if tile and (tile - 1) // width == line]
+        col_tiles = [state[row * width + line] for row in range(width)]
+        col_goals = [(tile - 1) // width for tile in col_tiles if tile and (tile - 1) % width == line]
+        for goals in (row_goals, col_goals):
+            extra += 2 * _conflict_removals(goals)
+    return extra
+
+
+def _conflict_removals(goals):
+    #fewest tiles to take out of the line so the rest are in increasing goal order = len - longest increasing subsequence
+    if len(goals) < 2:
+        return 0
+    tails = []
+    for g in goals:
+        i = 0
+        while i < len(tails) and tails[i] < g:
+            i += 1
+        if i == len(tails):
+            tails.append(g)
+        else:
+            tails[i] = g
+    return len(goals) - len(tails)
+
+
+def manhattan_linear_conflict(state):
+    return manhattan(state) + linear_conflicts(state)
+
+
+class PatternDatabase:
+    #additive pattern databases: for every pattern (a group of tiles) a table of the fewest moves of *those tiles*
+    #needed to bring them home from any placement; moves of the other tiles are free, so the tables can be added up.
+    #Tables are built once with a 0-1 breadth-first search backwards from the goal and cached under cache_dir
+    def __init__(self, width=4, patterns=PATTERNS_15, cache_dir=CACHE_DIR):
+        self.width = width
+        self.size = width * width
+        self.patterns = [tuple(pattern) for pattern in patterns]
+        self.cache_dir = cache_dir
+        self.tables = [self._load_or_build(pattern) for pattern in self.patterns]
+
+    def _cache_path(self, pattern):
+        return os.path.join(self.cache_dir, f"pdb_{self.width}x{self.width}_{'-'.join(map(str, pattern))}.bin")
+
+    def _load_or_build(self, pattern):
+        path = self._cache_path(pattern)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                table = f.read()
+            if len(table) == self.size ** len(pattern):
+                return table
+        table = self._build(pattern)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(path + '.tmp', 'wb') as f:
+            f.write(table)
+        os.replace(path + '.tmp', path)
+        return table
+
+    def _build(self, pattern):
+        #search state = positions of the pattern tiles + blank position, as the digits of a base-size number (blank
+        #highest); the table is indexed by the pattern tile digits alone (min over where the blank is)
+        k = len(pattern)
+        size = self.size
+        moves = _moves(self.width)
+        start = tuple(tile - 1 for tile in pattern) + (size - 1,)
+
+        def key(positions):
+            packed = 0
+            for p in reversed(positions):
+                packed = packed * size + p
+            return packed
+
+        table = bytearray([255]) * (size ** k)
+        seen = bytearray(size ** (k + 1))
+        queue = deque([(start, 0)])
+        while queue:
+            positions, cost = queue.popleft()
+            packed = key(positions)
+            if seen[packed]:
+                continue
+            seen[packed] = 1
+            index = packed % len(table)
+            if cost < table[index]:
+                table[index] = cost
+            blank = positions[k]
+            for q in moves[blank]:
+                if q in positions[:k]:          #the blank swaps with a pattern tile: costs a move
+                    i = positions.index(q)
+                    child = positions[:i] + (blank,) + positions[i + 1:k] + (q,)
+                    queue.append((child, cost + 1))
+                else:                           #the blank swaps with another tile: free
+                    child = positions[:k] + (q,)
+                    queue.appendleft((child, cost))
+        return bytes(table)
+
+    def packed(self):
+        #the same sum on packed states. A pattern's table index is a sum over cells of position * size ** (place of
+        #the tile in the pattern), so all the indexes are accumulated at once in bit fields of one int, one byte table
+        #lookup per two cells, and split apart at the end
+        field = (self.size ** max(map(len, self.patterns)) - 1).bit_length()
+        weights = {}
+        for k, pattern in enumerate(self.patterns):
+            for place, tile in enumerate(pattern):
+                weights[tile] = self.size ** place << field * k
+        tables = _byte_tables(self.size, lambda tile, cell: cell * weights.get(tile, 0))
+        lookups = [(field * k, table) for k, table in enumerate(self.tables)]
+        mask = (1 << field) - 1
+
+        def heuristic(packed):
+            indexes = 0
+            for shift, table in tables:
+                indexes += table[(packed >> shift) & 0xFF]
+            total = 0
+            for shift, table in lookups:
+                total += table[(indexes >> shift) & mask]
+            return total
+        return heuristic
+
+    def __call__(self, state):
+        where = [0] * self.size
+        for p, tile in enumerate(state):
+            where[tile] = p
+        total = 0
+        for pattern, table in zip(self.patterns, self.tables):
+            index = 0
+            for tile in reversed(pattern):
+                index = index * self.size + where[tile]
+            total += table[index]
+        return total
+
+
+def pdb_heuristic(database):
+    #pattern databases and linear conflicts can't be added together, but both are admissible, so take the larger one
+    def heuristic(state):
+        return max(database(state), manhattan_linear_conflict(state))
+
+    def packed(width):
+        database_packed = database.packed()
+        linear_packed = PackedManhattanLinearConflict(width)
+        return lambda state: max(database_packed(state), linear_packed(state))
+
+    heuristic.packed = packed
+    return heuristic
+
+
+# ---- Heuristics on packed states ----
+# The searches only ever hold packed ints. A heuristic with a packed(width) attribute gives them a function that reads
+# the packed int directly; any other heuristic is called on the unpacked tuple. Manhattan distance and the pattern
+# database indexes are sums of one term per (tile, cell), so they are precomputed per byte of the packed state (two
+# cells): the heuristic is then one lookup per byte, with no tuple of tiles built
+
+def _byte_tables(size, term):
+    #[(shift, table)]: table[byte] = term(tile, cell) summed over the two cells stored in that byte of a packed state
+    tables = []
+    for shift in range(0, 4 * size, 8):
+        first = shift // 4
+        table = []
+        for byte in range(256):
+            low, high = byte & 0xF, byte >> 4
+            total = term(low, first) if low < size else 0
+            if first + 1 < size and high < size:
+                total += term(high, first + 1)
+            table.append(total)
+        tables.append((shift, table))
+    return tables
+
+
+class PackedManhattan:
+    def __init__(self, width):
+        def term(tile, cell):
+            if not tile:
+                return 0
+            goal = tile - 1
+            return abs(cell // width - goal // width) + abs(cell % width - goal % width)
+        self.tables = _byte_tables(width * width, term)
+
+    def __call__(self, packed):
+        total = 0
+        for shift, table in self.tables:
+            total += table[(packed >> shift) & 0xFF]
+        return total
+
+
+class PackedManhattanLinearConflict:
+    #the linear conflicts of a row or column only depend on the tiles in it, i.e. on packed & that line's mask; they
+    #are computed the first time a line content is seen and remembered (at most 16 ** width contents per line)
+    def __init__(self, width):
+        self.manhattan = PackedManhattan(width)
+        self.lines = []
+        for line in range(width):
+            for cells, is_row in (([line * width + col for col in range(width)], True),
+                                  ([row * width + line for row in range(width)], False)):
+                mask = sum(0xF << 4 * cell for cell in cells)
+                self.lines.append((mask, {}, cells, is_row, line, width))
+
+    @staticmethod
+    def _conflicts(key, cells, is_row, line, width):
+        tiles = [(key >> 4 * cell) & 0xF for cell in cells]
+        if is_row:
+            goals = [(tile - 1) % width for tile in tiles if tile and (tile - 1) // width == line]
+        else:
+            goals = [(tile - 1) // width for tile in tiles if tile and (tile - 1) % width == line]
+        return 2 * _conflict_removals(goals)
+
+    def __call__(self, packed):
+        total = self.manhattan(packed)
+        for mask, known, cells, is_row, line, width in self.lines:
+            key = packed & mask
+            extra = known.get(key)
+            if extra is None:
+                extra = known[key] = self._conflicts(key, cells, is_row, line, width)
+            total += extra
+        return total
+
+
+manhattan.packed = PackedManhattan
+manhattan_linear_conflict.packed = PackedManhattanLinearConflict
+
+
+def _on_packed(heuristic, width):
+    packed = getattr(heuristic, 'packed', None)
+    if packed is not None:
+        return packed(width)
+    size = width * width
+    return lambda state: heuristic(unpack(state, size))
+
+
+# ---- Search ----
+
+def _check(state):
+    state = as_state(state)
+    if not is_solvable(state):
+        raise ValueError(f"unsolvable state (wrong permutation parity): {state}")
+    return state
+
+
+#stats: optional dict that receives the number of expanded states
+def astar(start, heuristic=manhattan_linear_conflict, stats=None):
+    start = _check(start)
+    size = len(start)
+    table = move_table(math.isqrt(size))
+    heuristic = _on_packed(heuristic, table.width)
+
+    root = PuzzleNode(pack(start), start.index(0), 0, heuristic(pack(start)), None)
+    best_g = {root.state: 0}
+    closed = set()                      #packed ints, not tuples
+    frontier = [root]
+    expanded = 0
+    while frontier:
+        node = heapq.heappop(frontier)
+        if node.state in closed:
+            continue
+        if node.state == table.goal:
+            if stats is not None:
+                stats['expanded'] = expanded
+            return node.path(size)
+        closed.add(node.state)
+        expanded += 1
+        g = node.g + 1
+        for child, blank in table.neighbors(node.state, node.blank):
+            if child in closed:
+                continue
+            if g < best_g.get(child, math.inf):
+                best_g[child] = g
+                heapq.heappush(frontier, PuzzleNode(child, blank, g, g + heuristic(child), node))
+    return None
+
+
+def idastar(start, heuristic=manhattan_linear_conflict, stats=None):
+    start = _check(start)
+    size = len(start)
+    table = move_table(math.isqrt(size))
+    heuristic = _on_packed(heuristic, table.width)
+    path = [pack(start)]
+    expanded = 0
+
+    def search(state, blank, g, bound, previous_blank):
+        #returns the smallest f over the bound seen below this node, or -1 once the goal is on the path
+        nonlocal expanded
+        f = g + heuristic(state)
+        if f > bound:
+            return f
+        if state == table.goal:
+            return -1
+        expanded += 1
+        smallest = math.inf
+        for child, child_blank in table.neighbors(state, blank):
+            if child_blank == previous_blank:      #never undo the last move
+                continue
+            path.append(child)
+            t = search(child, child_blank, g + 1, bound, blank)
+            if t == -1:
+                return -1
+            path.pop()
+            smallest = min(smallest, t)
+        return smallest
+
+    bound = heuristic(path[0])
+    while True:
+        t = search(path[0], start.index(0), 0, bound, -1)
+        if t == -1:
+            if stats is not None:
+                stats['expanded'] = expanded
+            return [unpack(state, size) for state in path]
+        if t == math.inf:
+            return None
+        bound = t
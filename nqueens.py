@@ -0,0 +1,153 @@
+'''N-Queens for large N (thousands to millions of queens): min-conflicts local search with O(1) move evaluation.
+
+Like the 8-Queens code, a state is a list where state[col] is the row of the queen in column col. Instead of
+recomputing all O(n^2) pairs for every candidate, the solver keeps how many queens sit on every row, diagonal
+(row - col) and anti-diagonal (row + col); a line with c queens holds c * (c - 1) / 2 attacking pairs, so the change
+in cost of a move only depends on the handful of counters it touches.
+
+The search runs in two phases:
+    1. greedy start: columns take rows of a random permutation (so no two queens ever share a row), each one trying a
+       few random free rows for one whose diagonals are still empty
+    2. min-conflicts repair: pick a queen that is still attacked, and swap rows with the first of a few random
+       columns that lowers the number of attacking pairs (swaps keep every row at exactly one queen)
+'''
+
+import argparse
+import random
+import time
+
+
+def conflicts(state):
+    #number of attacking pairs in O(n), from the row/diagonal counters instead of comparing every pair
+    n = len(state)
+    rows = [0] * n
+    diagonals = [0] * (2 * n - 1)
+    anti_diagonals = [0] * (2 * n - 1)
+    for col, row in enumerate(state):
+        rows[row] += 1
+        diagonals[row - col + n - 1] += 1
+        anti_diagonals[row + col] += 1
+    return sum(c * (c - 1) // 2 for counts in (rows, diagonals, anti_diagonals) for c in counts)
+
+
+class MinConflictsSolver:
+    def __init__(self, size, seed=None, greedy_tries=100, swap_tries=32):
+        self.n = size
+        self.rng = random.Random(seed)
+        self.greedy_tries = greedy_tries    #random rows tried per column in the greedy start
+        self.swap_tries = swap_tries        #random partner columns tried per repair step
+        self.steps = 0
+        self.restarts = 0
+
+    def _greedy_start(self):
+        n, rand = self.n, self.rng.random      #int(rand() * k) is a lot cheaper than randrange(k) in this loop
+        self.state = [0] * n
+        self.diagonals = [0] * (2 * n - 1)
+        self.anti_diagonals = [0] * (2 * n - 1)
+        free_rows = list(range(n))
+        diagonals, anti_diagonals, state = self.diagonals, self.anti_diagonals, self.state
+        for col in range(n):
+            remaining = n - col
+            for _ in range(self.greedy_tries):
+                k = int(rand() * remaining)
+                row = free_rows[k]
+                if diagonals[row - col + n - 1] == 0 and anti_diagonals[row + col] == 0:
+                    break
+            free_rows[k] = free_rows[remaining - 1]     #swap-remove the row we took
+            state[col] = row
+            diagonals[row - col + n - 1] += 1
+            anti_diagonals[row + col] += 1
+
+    def is_attacked(self, col):
+        row = self.state[col]
+        return self.diagonals[row - col + self.n - 1] > 1 or self.anti_diagonals[row + col] > 1
+
+    def attacked_columns(self):
+        return [col for col in range(self.n) if self.is_attacked(col)]
+
+    def cost(self):
+        #rows are a permutation, so only the diagonals can hold attacking pairs
+        return sum(c * (c - 1) // 2 for counts in (self.diagonals, self.anti_diagonals) for c in counts if c > 1)
+
+    def _swap(self, i, j):
+        #swap the rows of the queens in columns i and j, updating the counters; returns the change in attacking pairs
+        n, state, d, a = self.n, self.state, self.diagonals, self.anti_diagonals
+        ri, rj = state[i], state[j]
+        delta = 0
+        #taking a queen off a line with c queens removes c - 1 pairs, putting one on a line with c queens adds c pairs
+        d[ri - i + n - 1] -= 1; delta -= d[ri - i + n - 1]
+        a[ri + i] -= 1; delta -= a[ri + i]
+        d[rj - j + n - 1] -= 1; delta -= d[rj - j + n - 1]
+        a[rj + j] -= 1; delta -= a[rj + j]
+        delta += d[rj - i + n - 1]; d[rj - i + n - 1] += 1
+        delta += a[rj + i]; a[rj + i] += 1
+        delta += d[ri - j + n - 1]; d[ri - j + n - 1] += 1
+        delta += a[ri + j]; a[ri + j] += 1
+        state[i], state[j] = rj, ri
+        return delta
+
+    def solve(self, max_steps=None):
+        #returns the solved state; if max_steps repair steps are used up first it returns the best effort state
+        n, rand = self.n, self.rng.random
+        if n in (2, 3):
+            raise ValueError(f"there is no solution for {n} queens")
+        if max_steps is None:
+            max_steps = max(100 * n, 100000)
+        self.steps = 0
+        self._greedy_start()
+        stale = 0
+        while True:
+            attacked = self.attacked_columns()
+            if not attacked:
+                return self.state
+            progress = False
+            while attacked and self.steps < max_steps:
+                k = int(rand() * len(attacked))
+                i = attacked[k]
+                attacked[k] = attacked[-1]
+                attacked.pop()
+                if not self.is_attacked(i):     #an earlier swap already freed it
+                    continue
+                self.steps += 1
+                for _ in range(self.swap_tries):
+                    j = int(rand() * n)
+                    if j == i:
+                        continue
+                    if self._swap(i, j) < 0:
+                        progress = True
+                        if self.is_attacked(i):
+                            attacked.append(i)
+                        if self.is_attacked(j):
+                            attacked.append(j)
+                        break
+                    self._swap(i, j)            #no improvement: swap back
+            if self.steps >= max_steps:
+                return self.state
+            stale = 0 if progress else stale + 1
+            if stale >= 10:                     #stuck in a local minimum: start over from a new greedy placement
+                self.restarts += 1
+                self._greedy_start()
+                stale = 0
+
+
+def solve(size, seed=None, max_steps=None):
+    return MinConflictsSolver(size, seed).solve(max_steps)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Solve N-Queens with min-conflicts local search.')
+    parser.add_argument('size', type=int)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    solver = MinConflictsSolver(args.size, args.seed)
+    state = solver.solve()
+    print(f"{args.size} queens: {solver.cost()} attacking pairs after {solver.steps} repair steps "
+          f"({solver.restarts} restarts) in {time.perf_counter() - start:.2f}s")
+    if args.size <= 20:
+        print(state)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,207 @@
+'''Parallel root-split search: RootSplitSearch for tic-tac-toe best_move (used by Test_P1.py) and MNKRootSplitSearch
+for fixed-depth searches of the mnk engine on bigger boards.
+
+On 3x3 the whole tree is a few thousand nodes, so RootSplitSearch is only plumbing: the inter-process overhead makes it
+slower than the serial bitboard search (about 0.031 s against 0.023 s per move). On m,n,k boards each root move is a
+real subtree search, but the split still searches 1.5-2x the serial nodes (5,5,4 at depth 6), so it only wins with
+more cores than that.
+
+The first legal root move (the "eldest brother") is searched in the calling process with a full window, which gives
+a real alpha bound before anything is split, young-brothers-wait style. The remaining root moves are then searched in
+parallel on a ProcessPoolExecutor. Every worker starts from the best root utility found so far, which is kept in a
+shared multiprocessing.Value. Workers also re-read it between the opponent's replies, so a good result in one
+worker lets all others prune earlier.
+
+The chosen move is always the one the serial best_move() would choose (lowest cell among the best utilities).
+Utilities are integers, so each root move is searched with alpha = best - 1. A result above that alpha is the exact
+utility (we never set beta). A result at or below it proves the move is strictly worse than one already found.
+MNKRootSplitSearch does the same with the mover's score, so it works for either player.'''
+
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import bitboard
+import mnk
+
+
+NO_BOUND = -1000            #shared value before any root move has been searched
+MNK_NO_BOUND = -2 * mnk.WIN_SCORE
+
+_shared_best = None         #set in every worker by _init_worker / _init_mnk_worker
+_no_bound = NO_BOUND
+_engine = None
+_search_id = None
+
+
+def _init_worker(shared_best, no_bound=NO_BOUND):
+    global _shared_best, _no_bound
+    _shared_best, _no_bound = shared_best, no_bound
+
+
+def _init_mnk_worker(shared_best, engine):
+    #the engine (windows, neighbor lists) is pickled once per worker instead of once per root move
+    global _engine
+    _init_worker(shared_best, MNK_NO_BOUND)
+    _engine = engine
+
+
+def _alpha():
+    best = _shared_best.value
+    return -math.inf if best == _no_bound else best - 1
+
+
+def _publish(value):
+    with _shared_best.get_lock():
+        if value > _shared_best.value:
+            _shared_best.value = value
+
+
+def _search_root_move(x, o, move):
+    #utility of 'X' playing at move, from the opponent's (minimizing) point of view at depth 0, exactly like
+    #minimax(board, 0, False, ...) in best_move(); the alpha bound is refreshed from the other workers between replies
+    x |= 1 << move
+    if bitboard.WINNING[x]:
+        value = 10
+    elif (x | o) == bitboard.FULL_BOARD:
+        value = 0
+    else:
+        alpha = _alpha()
+        beta = math.inf
+        value = math.inf
+        for i in bitboard.legal_moves(x, o):
+            alpha = max(alpha, _alpha())
+            if alpha >= beta:
+                break
+            utility_val = bitboard.minimax(x, o | 1 << i, 1, True, alpha, beta)
+            value = min(value, utility_val)
+            beta = min(beta, value)
+            if alpha >= beta:
+                break
+
+    #the shared bound only ever grows, so comparing against its current value is at least as strict as against the alpha we used
+    exact = value > _alpha()
+    if exact:
+        _publish(value)
+    return move, value, exact
+
+
+def _search_mnk_root_move(board, move, depth, player, search_id):
+    #score of player moving at move, from player's point of view, searched depth plies deep exactly like
+    #MNKEngine._search_root does for one root move (ply numbers included, so win scores match); returns the nodes
+    #searched as well. Killers and history only order moves, so a worker keeps them for all the root moves of one
+    #search (as the serial search does) and starts afresh when search_id changes
+    global _search_id
+    engine = _engine
+    if search_id != _search_id:
+        _search_id = search_id
+        engine.killers = []
+        engine.history = {}
+    engine.stats = mnk.SearchStats()
+    engine.deadline = None
+    sign = 1 if player == 'X' else -1
+    opponent = 'O' if player == 'X' else 'X'
+    board = list(board)
+    board[move] = player
+    empty = board.count(' ')
+
+    if engine.is_win(board, move, player):
+        value = mnk.WIN_SCORE - 1
+    elif empty == 0:
+        value = 0
+    elif depth == 1:
+        value = sign * engine.evaluator(engine, board)
+    else:
+        value = math.inf
+        for reply in engine._ordered_moves(board, 1, opponent):
+            bound = _alpha()
+            if bound >= value:
+                break
+            board[reply] = opponent
+            if engine.is_win(board, reply, opponent):
+                utility = 2 - mnk.WIN_SCORE
+            else:
+                alpha, beta = (bound, value) if sign == 1 else (-value, -bound)     #engine windows are from 'X's side
+                utility = sign * engine.minimax(board, depth - 2, 2, player == 'X', alpha, beta, empty - 1)
+            board[reply] = ' '
+            value = min(value, utility)
+
+    exact = value > _alpha()
+    if exact:
+        _publish(value)
+    return move, value, exact, engine.stats.nodes
+
+
+class RootSplitSearch:
+    #owns the worker pool; reuse one instance for a whole game (or many games) instead of starting processes per move.
+    #One search at a time per instance
+    def __init__(self, workers=None):
+        self.shared_best = multiprocessing.Value('i', NO_BOUND)
+        self.executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(self.shared_best,))
+
+    def best_move(self, x, o):
+        moves = list(bitboard.legal_moves(x, o))
+        if not moves:
+            return -1
+
+        global _shared_best, _no_bound
+        _shared_best, _no_bound = self.shared_best, NO_BOUND     #the eldest brother is searched here, in the calling process
+        self.shared_best.value = NO_BOUND
+        results = [_search_root_move(x, o, moves[0])]
+
+        futures = [self.executor.submit(_search_root_move, x, o, move) for move in moves[1:]]
+        results.extend(future.result() for future in futures)
+
+        best_value = max(value for _, value, exact in results if exact)
+        return min(move for move, value, exact in results if exact and value == best_value)
+
+    def close(self):
+        self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class MNKRootSplitSearch:
+    #fixed-depth root split for an m,n,k-game; engine options are those of mnk.MNKEngine. best_move() returns the move
+    #MNKEngine._search_root would pick at that depth with fresh move ordering (lowest cell among the best scores) and
+    #leaves the nodes searched in all processes in self.nodes. One search at a time per instance
+    def __init__(self, m, n, k, workers=None, evaluator=mnk.window_evaluator, neighborhood=None):
+        self.engine = mnk.MNKEngine(m, n, k, evaluator, neighborhood)
+        self.shared_best = multiprocessing.Value('q', MNK_NO_BOUND)
+        self.executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_mnk_worker,
+                                            initargs=(self.shared_best, self.engine))
+        self.nodes = 0
+        self.searches = 0
+
+    def best_move(self, board, player='X', depth=4):
+        if ' ' not in board:
+            return -1
+        moves = self.engine.candidate_moves(board)
+
+        global _shared_best, _no_bound, _engine
+        _shared_best, _no_bound, _engine = self.shared_best, MNK_NO_BOUND, self.engine      #eldest brother runs here
+        self.shared_best.value = MNK_NO_BOUND
+        self.searches += 1
+        search_id = (id(self), self.searches)
+        results = [_search_mnk_root_move(board, moves[0], depth, player, search_id)]
+
+        futures = [self.executor.submit(_search_mnk_root_move, board, move, depth, player, search_id)
+                   for move in moves[1:]]
+        results.extend(future.result() for future in futures)
+
+        self.nodes = sum(nodes for *_, nodes in results)
+        best_value = max(value for _, value, exact, _ in results if exact)
+        return min(move for move, value, exact, _ in results if exact and value == best_value)
+
+    def close(self):
+        self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
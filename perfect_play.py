@@ -0,0 +1,174 @@
+'''Precomputed perfect play for 3x3 tic-tac-toe.
+
+Tic-tac-toe only has 5478 reachable positions, so instead of searching at runtime we solve all of them once with a
+retrograde pass (from full boards back to the empty board) and write the result to a compact binary table:
+2 bytes per position, indexed by the base-3 code of the board (3^9 = 19683 entries, ~39 KB). The table is
+memory-mapped when loaded, so every lookup afterwards is O(1).
+
+Each entry stores, for the player to move ('X' moves first and is maximizing):
+    value -- minimax(board, 0, ...) for that position, i.e. the same 10 - depth / depth - 10 / 0 utilities
+    move  -- the move best_move() would choose (lowest cell among the best ones), or NO_MOVE if the game is over
+
+The header carries a checksum of the payload (corrupted/truncated files) and a fingerprint of the rules the table was
+generated with (stale files), and load() refuses the file if either does not match.
+
+Regenerate the table with:
+    python perfect_play.py [path]
+'''
+
+import argparse
+import mmap
+import os
+import struct
+import zlib
+
+import bitboard
+
+
+FORMAT_VERSION = 1
+MAGIC = b'TTTB'
+HEADER = struct.Struct('<4sHHII')      #magic, format version, number of entries, rules fingerprint, payload crc32
+ENTRY = struct.Struct('<bB')            #value (signed), move
+NUM_ENTRIES = 3 ** 9
+NO_MOVE = 0xFF
+UNREACHABLE = -128                      #value stored for boards that can't come up in a game
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tic_tac_toe.table')
+
+#TERNARY[bits] is the base-3 code of the cells set in bits, so index(x, o) = TERNARY[x] + 2 * TERNARY[o] without a loop
+TERNARY = [sum(3 ** i for i in range(9) if bits >> i & 1) for bits in range(1 << 9)]
+
+
+def index(x, o):
+    return TERNARY[x] + 2 * TERNARY[o]
+
+
+def rules_fingerprint():
+    #everything the stored values depend on; if any of it changes, tables written before are stale
+    rules = repr((FORMAT_VERSION, bitboard.WIN_CONFIGURATIONS, 'X first', 'utilities 10 - depth / depth - 10 / 0'))
+    return zlib.crc32(rules.encode())
+
+
+def _shift(value):
+    #utility of a child seen from its parent: one ply deeper, so wins/losses move one step towards 0
+    if value > 0:
+        return value - 1
+    if value < 0:
+        return value + 1
+    return 0
+
+
+def reachable_positions():
+    #every (x, o) that can come up in a game where 'X' moves first, found with a plain forward search from the empty board
+    seen = {(0, 0)}
+    stack = [(0, 0)]
+    while stack:
+        x, o = stack.pop()
+        if bitboard.WINNING[x] or bitboard.WINNING[o] or (x | o) == bitboard.FULL_BOARD:
+            continue
+        x_to_move = x.bit_count() == o.bit_count()
+        for i in bitboard.legal_moves(x, o):
+            child = (x | 1 << i, o) if x_to_move else (x, o | 1 << i)
+            if child not in seen:
+                seen.add(child)
+                stack.append(child)
+    return seen
+
+
+def solve():
+    #retrograde pass: handle positions with the most pieces first, so the values of all children are known when a position is reached
+    values = {}
+    moves = {}
+    for x, o in sorted(reachable_positions(), key=lambda p: (p[0] | p[1]).bit_count(), reverse=True):
+        if bitboard.WINNING[x]:
+            values[x, o] = 10
+            continue
+        if bitboard.WINNING[o]:
+            values[x, o] = -10
+            continue
+        if (x | o) == bitboard.FULL_BOARD:
+            values[x, o] = 0
+            continue
+
+        x_to_move = x.bit_count() == o.bit_count()
+        best_child = None
+        for i in bitboard.legal_moves(x, o):        #increasing cell order, so ties keep the lowest cell like best_move() does
+            child = values[x | 1 << i, o] if x_to_move else values[x, o | 1 << i]
+            if best_child is None or (child > best_child if x_to_move else child < best_child):
+                best_child = child
+                moves[x, o] = i
+        values[x, o] = _shift(best_child)
+    return values, moves
+
+
+def build():
+    values, moves = solve()
+    payload = bytearray(ENTRY.pack(UNREACHABLE, NO_MOVE) * NUM_ENTRIES)
+    for position, value in values.items():
+        ENTRY.pack_into(payload, index(*position) * ENTRY.size, value, moves.get(position, NO_MOVE))
+    return bytes(payload)
+
+
+def write(path=DEFAULT_PATH):
+    payload = build()
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, NUM_ENTRIES, rules_fingerprint(), zlib.crc32(payload))
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        f.write(payload)
+    os.replace(tmp_path, path)      #readers never see a half-written table
+    return path
+
+
+class PerfectPlayTable:
+    #read-only, memory-mapped view of a table written by write()
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._validate()
+        except ValueError:
+            self._map.close()
+            raise
+
+    def _validate(self):
+        if len(self._map) != HEADER.size + NUM_ENTRIES * ENTRY.size:
+            raise ValueError(f"{self.path}: unexpected size {len(self._map)}, regenerate it with 'python perfect_play.py'")
+        magic, version, entries, fingerprint, checksum = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != FORMAT_VERSION or entries != NUM_ENTRIES:
+            raise ValueError(f"{self.path}: not a version {FORMAT_VERSION} perfect play table")
+        if fingerprint != rules_fingerprint():
+            raise ValueError(f"{self.path}: table is stale (generated for different rules), regenerate it with 'python perfect_play.py'")
+        if checksum != zlib.crc32(self._map[HEADER.size:]):
+            raise ValueError(f"{self.path}: checksum mismatch, regenerate it with 'python perfect_play.py'")
+
+    def lookup(self, x, o):
+        #(value, move) for the player to move; move is NO_MOVE once the game is over. KeyError for unreachable positions
+        value, move = ENTRY.unpack_from(self._map, HEADER.size + index(x, o) * ENTRY.size)
+        if value == UNREACHABLE:
+            raise KeyError((x, o))
+        return value, move
+
+    def best_move(self, x, o):
+        return self.lookup(x, o)[1]
+
+    def close(self):
+        self._map.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Regenerate or check the precomputed tic-tac-toe perfect play table.')
+    parser.add_argument('path', nargs='?', default=DEFAULT_PATH)
+    parser.add_argument('--check', action='store_true', help='only validate an existing table')
+    args = parser.parse_args()
+
+    if args.check:
+        PerfectPlayTable(args.path).close()
+        print(f"{args.path} is up to date")
+    else:
+        print(f"Wrote {write(args.path)}")
+
+
+if __name__ == '__main__':
+    main()
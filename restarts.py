@@ -0,0 +1,89 @@
+'''Parallel multi-restart runner for the hill climbers (EightQueens in AS1_P3.py, EightQueens/EightPuzzle in Test1_P3.py).
+
+The restarts are independent, so instead of running them one after another in the main process they are split into
+shards and run on a ProcessPoolExecutor:
+    - restart i always draws from its own NumPy generator, seeded with SeedSequence(seed, spawn_key=(i,)), so every
+      restart sees the same random numbers whatever worker runs it and the results are exactly reproducible
+    - every restart writes its cost history into one shared-memory array (one row per restart, padded with -1), so
+      histories are not pickled back through the pool
+    - with stop_on_solution=True the first restart to reach cost 0 sets a shared event and every other restart stops at
+      its next step (restarts that never started get cost -1). Which restarts got cut short depends on timing, so only
+      runs without early stop are reproducible
+
+A restart is any picklable module-level function climb(rng, history, should_stop) -> final cost, which appends the
+cost after every step to history and gives up when should_stop() returns True.'''
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+NOT_RUN = -1
+
+_histories = None           #per-worker views of the shared arrays, set by _init_worker
+_costs = None
+_stop = None
+_segments = []
+
+
+def _attach(name, shape, dtype):
+    segment = shared_memory.SharedMemory(name=name)
+    _segments.append(segment)       #keep the mapping alive as long as the worker
+    return np.ndarray(shape, dtype=dtype, buffer=segment.buf)
+
+
+def _init_worker(histories_name, costs_name, restarts, max_history, stop):
+    global _histories, _costs, _stop
+    _histories = _attach(histories_name, (restarts, max_history), np.int16)
+    _costs = _attach(costs_name, (restarts,), np.int32)
+    _stop = stop
+
+
+def _run_shard(climb, seed, indices, stop_on_solution):
+    should_stop = _stop.is_set if stop_on_solution else (lambda: False)
+    for i in indices:
+        if should_stop():
+            break
+        rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(i,)))
+        history = []
+        cost = climb(rng, history, should_stop)
+        history = history[:_histories.shape[1]]
+        _histories[i, :len(history)] = history
+        _costs[i] = cost
+        if cost == 0 and stop_on_solution:
+            _stop.set()
+
+
+def run_restarts(climb, restarts, workers=None, seed=0, stop_on_solution=False, max_history=1001, shards_per_worker=4):
+    #returns (costs, histories): costs[i] is the final cost of restart i (NOT_RUN if it was cancelled before starting),
+    #histories[i] its cost after every step, padded with -1
+    if restarts < 1:
+        raise ValueError(f"restarts must be at least 1, got {restarts}")
+    workers = workers or os.cpu_count() or 1
+    histories_segment = shared_memory.SharedMemory(create=True, size=restarts * max_history * np.dtype(np.int16).itemsize)
+    costs_segment = shared_memory.SharedMemory(create=True, size=restarts * np.dtype(np.int32).itemsize)
+    histories = costs = None
+    try:
+        histories = np.ndarray((restarts, max_history), dtype=np.int16, buffer=histories_segment.buf)
+        costs = np.ndarray((restarts,), dtype=np.int32, buffer=costs_segment.buf)
+        histories.fill(-1)
+        costs.fill(NOT_RUN)
+
+        stop = multiprocessing.Event()
+        shards = np.array_split(np.arange(restarts), min(restarts, workers * shards_per_worker))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(histories_segment.name, costs_segment.name, restarts, max_history, stop)) as executor:
+            futures = [executor.submit(_run_shard, climb, seed, shard.tolist(), stop_on_solution) for shard in shards if len(shard)]
+            for future in futures:
+                future.result()         #re-raise errors from the workers
+
+        return costs.copy(), histories.copy()
+    finally:
+        histories = costs = None        #release the views before closing the segments
+        histories_segment.close()
+        histories_segment.unlink()
+        costs_segment.close()
+        costs_segment.unlink()
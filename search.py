@@ -0,0 +1,185 @@
+'''Generic state-space search (the engine behind AS1_P1.py's bfs()).
+
+A problem is a start state, a goal test and a successors(state) function. AS1_P1's original bfs() carried a copy of
+the whole path in every queue entry (O(depth) memory per frontier node); here
+    - every reached state records only its parent, and the path is rebuilt from the parent pointers at the end
+    - states can be packed into ints with key(state) / state(key) functions, so the search keeps ints instead of
+      tuples; the parent pointers are one dict from key to parent key, which is also the visited set and only holds
+      the states actually reached
+    - states are marked as reached when they are generated (enqueue time), so each state enters the frontier once
+
+Strategies: bfs (fewest moves), dfs (any path, small frontier), uniform_cost (cheapest path; successors yield
+(state, step cost) pairs) and bidirectional_bfs (fewest moves, searching from both ends; needs the goal state and, for
+irreversible moves, a predecessors function).
+
+All of them return the list of states from start to goal, or None, and fill the optional stats dict with the number of
+expanded and generated states and the largest frontier.'''
+
+from collections import deque
+import heapq
+import itertools
+
+
+def _identity(state):
+    return state
+
+
+def _path(parents, key, decode):
+    keys = [key]
+    while parents[key] != key:
+        key = parents[key]
+        keys.append(key)
+    return [decode(k) for k in reversed(keys)]
+
+
+def _depth(parents, key):
+    depth = 0
+    while parents[key] != key:
+        key = parents[key]
+        depth += 1
+    return depth
+
+
+def _finish(stats, expanded, generated, frontier):
+    if stats is not None:
+        stats['expanded'] = expanded
+        stats['generated'] = generated
+        stats['max_frontier'] = frontier
+
+
+def bfs(start, is_goal, successors, key=_identity, state=_identity, stats=None):
+    #goal test when a state is generated: with unit step costs the first goal generated is on a shortest path
+    start_key = key(start)
+    parents = {}
+    parents[start_key] = start_key
+    if is_goal(start):
+        _finish(stats, 0, 1, 1)
+        return [start]
+    queue = deque([start_key])
+    expanded, generated, largest = 0, 1, 1
+    while queue:
+        current = queue.popleft()
+        expanded += 1
+        for child in successors(state(current)):
+            child_key = key(child)
+            if child_key in parents:
+                continue
+            parents[child_key] = current
+            generated += 1
+            if is_goal(child):
+                _finish(stats, expanded, generated, max(largest, len(queue)))
+                return _path(parents, child_key, state)
+            queue.append(child_key)
+        largest = max(largest, len(queue))
+    _finish(stats, expanded, generated, largest)
+    return None
+
+
+def dfs(start, is_goal, successors, key=_identity, state=_identity, stats=None):
+    #finds a path, not necessarily a short one; the frontier is a stack
+    start_key = key(start)
+    parents = {}
+    parents[start_key] = start_key
+    if is_goal(start):
+        _finish(stats, 0, 1, 1)
+        return [start]
+    stack = [start_key]
+    expanded, generated, largest = 0, 1, 1
+    while stack:
+        current = stack.pop()
+        expanded += 1
+        for child in successors(state(current)):
+            child_key = key(child)
+            if child_key in parents:
+                continue
+            parents[child_key] = current
+            generated += 1
+            if is_goal(child):
+                _finish(stats, expanded, generated, max(largest, len(stack)))
+                return _path(parents, child_key, state)
+            stack.append(child_key)
+        largest = max(largest, len(stack))
+    _finish(stats, expanded, generated, largest)
+    return None
+
+
+def uniform_cost(start, is_goal, successors, key=_identity, state=_identity, stats=None):
+    #successors(state) yields (child, step cost). A cheaper path can be found to a state that is already in the
+    #frontier, so duplicates are only dropped when they are no better than the best cost known; the goal test is done
+    #when a state is expanded
+    start_key = key(start)
+    parents = {start_key: start_key}
+    best = {start_key: 0}
+    counter = itertools.count()         #tie-breaker, keys don't have to be comparable
+    frontier = [(0, next(counter), start_key)]
+    closed = set()
+    expanded, generated, largest = 0, 1, 1
+    while frontier:
+        cost, _, current = heapq.heappop(frontier)
+        if current in closed:
+            continue
+        current_state = state(current)
+        if is_goal(current_state):
+            _finish(stats, expanded, generated, largest)
+            return _path(parents, current, state)
+        closed.add(current)
+        expanded += 1
+        for child, step in successors(current_state):
+            child_key = key(child)
+            child_cost = cost + step
+            if child_key in closed or child_cost >= best.get(child_key, float('inf')):
+                continue
+            best[child_key] = child_cost
+            parents[child_key] = current
+            generated += 1
+            heapq.heappush(frontier, (child_cost, next(counter), child_key))
+        largest = max(largest, len(frontier))
+    _finish(stats, expanded, generated, largest)
+    return None
+
+
+def bidirectional_bfs(start, goal, successors, predecessors=None, key=_identity, state=_identity, stats=None):
+    #breadth-first from both ends, always expanding a whole layer of the smaller frontier; every state reached from
+    #both sides is a meeting point, and the best one of the layer in which the searches first meet is optimal.
+    #predecessors defaults to successors (moves that can be undone)
+    predecessors = predecessors or successors
+    start_key, goal_key = key(start), key(goal)
+    if start_key == goal_key:
+        _finish(stats, 0, 1, 1)
+        return [start]
+    forward, backward = {}, {}
+    forward[start_key] = start_key
+    backward[goal_key] = goal_key
+    layers = [[start_key], [goal_key]]
+    depths = [0, 0]                                 #depth of the last layer of each side
+    expanded, generated, largest = 0, 2, 2
+    while layers[0] and layers[1]:
+        side = 0 if len(layers[0]) <= len(layers[1]) else 1
+        parents, other = (forward, backward) if side == 0 else (backward, forward)
+        expand = successors if side == 0 else predecessors
+        meeting, meeting_length = None, None
+        next_layer = []
+        for current in layers[side]:
+            expanded += 1
+            for child in expand(state(current)):
+                child_key = key(child)
+                if child_key in parents:
+                    continue
+                parents[child_key] = current
+                generated += 1
+                if child_key in other:
+                    length = depths[side] + 1 + _depth(other, child_key)
+                    if meeting is None or length < meeting_length:
+                        meeting, meeting_length = child_key, length
+                next_layer.append(child_key)
+        layers[side] = next_layer
+        depths[side] += 1
+        largest = max(largest, len(layers[0]) + len(layers[1]))
+        if meeting is not None:
+            _finish(stats, expanded, generated, largest)
+            return _path(forward, meeting, state) + _path(backward, meeting, state)[::-1][1:]
+    _finish(stats, expanded, generated, largest)
+    return None
+
+
+STRATEGIES = {'bfs': bfs, 'dfs': dfs, 'ucs': uniform_cost, 'bidirectional': bidirectional_bfs}
@@ -0,0 +1,68 @@
+import functools
+
+import AS1_P2
+import bitboard
+import perfect_play
+
+
+@functools.lru_cache(maxsize=None)
+def exact_score(me, opp):
+    #plain negamax over the whole game tree, scored for the player to move like NegamaxSearch with the position as root
+    if bitboard.WINNING[opp]:
+        return -10
+    if (me | opp) == bitboard.FULL_BOARD:
+        return 0
+    return max(-_shift(exact_score(opp, me | 1 << i)) for i in bitboard.legal_moves(me, opp))
+
+
+def _shift(score):
+    #a child's score is one ply further from its own root than from ours
+    if score > 0:
+        return score - 1
+    if score < 0:
+        return score + 1
+    return 0
+
+
+def board_of(x, o):
+    return ['X' if x >> i & 1 else 'O' if o >> i & 1 else ' ' for i in range(9)]
+
+
+def test_full_depth_entries_match_minimax():
+    #every entry NegamaxSearch stores with the full draft (the number of empty cells) must hold for the whole game tree,
+    #not just for the horizon of the iteration that stored it
+    checked = 0
+    for x, o in perfect_play.reachable_positions():
+        table = AS1_P2.TranspositionTable()
+        AS1_P2.NegamaxSearch(table=table).search(board_of(x, o))
+        for (engine, canonical, draft), (value, flag) in table.entries.items():
+            me, opp = canonical & bitboard.FULL_BOARD, canonical >> 9
+            if engine != 'negamax' or draft != 9 - (me | opp).bit_count():
+                continue
+            true_score = exact_score(me, opp)
+            if flag == AS1_P2.EXACT:
+                assert value == true_score, (board_of(me, opp), value, true_score)
+            elif flag == AS1_P2.LOWER_BOUND:
+                assert true_score >= value, (board_of(me, opp), value, true_score)
+            else:
+                assert true_score <= value, (board_of(me, opp), value, true_score)
+            checked += 1
+    assert checked > 0
+
+
+def test_negamax_value_matches_minimax():
+    for x, o in perfect_play.reachable_positions():
+        board = board_of(x, o)
+        search = AS1_P2.NegamaxSearch(table=AS1_P2.TranspositionTable())
+        search.search(board)
+        assert search.value == bitboard.minimax(x, o, 0, x.bit_count() == o.bit_count(), -10 ** 3, 10 ** 3)
+
+
+def test_engines_pick_the_same_move_for_the_player_to_move():
+    for x, o in perfect_play.reachable_positions():
+        if bitboard.WINNING[x] or bitboard.WINNING[o] or (x | o) == bitboard.FULL_BOARD:
+            continue
+        board = board_of(x, o)
+        minimax_move = AS1_P2.best_move(board, AS1_P2.TranspositionTable())
+        negamax_move = AS1_P2.best_move(board, AS1_P2.TranspositionTable(), engine='negamax')
+        assert minimax_move == negamax_move, (board, minimax_move, negamax_move)
@@ -0,0 +1,56 @@
+import functools
+import random
+
+import pytest
+
+import Test_P3
+
+
+GOAL = [1, 2, 3, 4, 5, 6, 7, 8, 0]
+#(problem, full neighbor list, random neighbor, goal, size, isQueens, options per engine); the 8-Puzzle options are
+#the ones compareEngines uses
+PROBLEMS = {
+    "8-Queens": ("8-Queens", Test_P3.neighbors8Queens, Test_P3.randomNeighbor8Queens, None, 8, True, {}),
+    "8-Puzzle": ("8-Puzzle", Test_P3.neighbors8Puzzle, Test_P3.randomNeighbor8Puzzle, GOAL, 9, False,
+                 {"simulatedAnnealing": {"cooling": Test_P3.linearCooling(1.0, 100000), "maxSteps": 100000},
+                  "tabuSearch": {"tabuTenure": 5000, "maxSteps": 100000},
+                  "lateAcceptance": {"historyLength": 1000, "maxSteps": 100000}}),
+}
+ENGINES = {"simulatedAnnealing": (Test_P3.simulatedAnnealing, True), "tabuSearch": (Test_P3.tabuSearch, False),
+           "lateAcceptance": (Test_P3.lateAcceptance, True)}
+
+
+def engineSolver(engineName, problemName):
+    engine, takesRandomNeighbor = ENGINES[engineName]
+    problem, getNeighbors, getRandomNeighbor, goalState, size, isQueens, options = PROBLEMS[problemName]
+    return functools.partial(engine, problem, Test_P3.calculateHeuristic, Test_P3.generateSolvableState,
+                             getRandomNeighbor if takesRandomNeighbor else getNeighbors, goalState, size, isQueens,
+                             **options.get(engineName, {}))
+
+
+@pytest.mark.parametrize("problemName", sorted(PROBLEMS))
+@pytest.mark.parametrize("engineName", sorted(ENGINES))
+def test_engine_solves_from_a_fixed_seed(engineName, problemName):
+    random.seed(0)
+    state, bestCosts = engineSolver(engineName, problemName)()
+    isQueens = PROBLEMS[problemName][5]
+    assert Test_P3.calculateHeuristic(state, PROBLEMS[problemName][3], isQueens) == 0
+    assert bestCosts[-1] == 0 and bestCosts == sorted(bestCosts, reverse=True)
+    if not isQueens:
+        assert state == GOAL
+
+
+def test_engines_are_reproducible():
+    for engineName in ENGINES:
+        runs = []
+        for _ in range(2):
+            random.seed(3)
+            runs.append(engineSolver(engineName, "8-Queens")())
+        assert runs[0] == runs[1], engineName
+
+
+def test_time_to_solution():
+    times, runs = Test_P3.timeToSolution(engineSolver("tabuSearch", "8-Queens"), runs=5, seed=0)
+    assert runs == 5 and len(times) == 5 and all(time > 0 for time in times)
+    assert Test_P3.summarizeTimes(times, runs).startswith("solved   5/5")
+    assert Test_P3.summarizeTimes([], 5) == "solved   0/5"
@@ -0,0 +1,72 @@
+import math
+
+import numpy as np
+import pytest
+
+import AS2_P1
+import gridworld
+
+
+def baseline_value_iteration():
+    #the original in-place (Gauss-Seidel) loop of AS2_P1.value_iteration, kept as the reference
+    utils = np.zeros((AS2_P1.grid_size, AS2_P1.grid_size))
+    action_utilities = np.zeros((AS2_P1.grid_size, AS2_P1.grid_size, len(AS2_P1.action_labels)))
+    utils[AS2_P1.terminal] = AS2_P1.terminal_utility
+    perpendicular = {'U': 'LR', 'D': 'LR', 'L': 'UD', 'R': 'UD'}
+    while True:
+        util_change = 0
+        for i in range(AS2_P1.grid_size):
+            for j in range(AS2_P1.grid_size):
+                if (i, j) == AS2_P1.terminal or (i, j) in AS2_P1.obstacles:
+                    continue
+                max_summation = -math.inf
+                for action_index, a in enumerate(AS2_P1.action_labels):
+                    summation = 0.8 * utils[AS2_P1.get_next_state((i, j), a)]
+                    for side in perpendicular[a]:
+                        summation += 0.1 * utils[AS2_P1.get_next_state((i, j), side)]
+                    action_utilities[i, j, action_index] = AS2_P1.reward + AS2_P1.gamma * summation
+                    max_summation = max(max_summation, summation)
+                state_util = AS2_P1.reward + AS2_P1.gamma * max_summation
+                util_change = max(util_change, abs(utils[i, j] - state_util))
+                utils[i, j] = state_util
+        if util_change < AS2_P1.threshold:
+            return utils, action_utilities
+
+
+def test_value_iteration_matches_the_baseline():
+    #both stop at a residual below threshold, so each is within threshold * gamma / (1 - gamma) (5e-5) of the optimum
+    utils, action_utilities = baseline_value_iteration()
+    model = AS2_P1.build_model()
+    result = gridworld.value_iteration(model, AS2_P1.threshold)
+    live = model.live.reshape(model.shape)
+    np.testing.assert_allclose(result.utils, utils, atol=1e-4)
+    np.testing.assert_allclose(result.action_utilities[live], action_utilities[live], atol=1e-4)
+    np.testing.assert_array_equal(result.policy[live], action_utilities.argmax(axis=2)[live])
+
+
+@pytest.mark.parametrize('solver', ['policy', 'modified'])
+def test_policy_iteration_matches_value_iteration(solver):
+    if solver == 'policy':
+        pytest.importorskip('scipy')        #policy_iteration's exact evaluation is a scipy.sparse solve
+    model = AS2_P1.build_model()
+    exact = gridworld.value_iteration(model, AS2_P1.threshold)
+    result = gridworld.SOLVERS[solver](model, AS2_P1.threshold)
+    live = model.live.reshape(model.shape)
+    np.testing.assert_allclose(result.utils, exact.utils, atol=1e-4)
+    np.testing.assert_array_equal(result.policy[live], exact.policy[live])
+
+
+def test_prioritized_sweeping_reaches_the_fixed_point_with_fewer_backups():
+    #sparse reward: zero step reward and a single +10 terminal, so only the cells next to it start out queued
+    rng = np.random.default_rng(1)
+    blocked = rng.random((40, 40)) < 0.2
+    terminal = np.zeros((40, 40), dtype=bool)
+    terminal[-1, -1] = True
+    blocked[-1, -1] = False
+    model = gridworld.GridWorld(blocked, terminal, 10 * terminal, reward=0.0)
+    exact = gridworld.value_iteration(model)
+    result = gridworld.prioritized_sweeping(model)
+    #both residuals are below threshold, so each is within threshold * gamma / (1 - gamma) of the optimum
+    np.testing.assert_allclose(result.utils, exact.utils, atol=1e-4)
+    assert result.iterations is None
+    assert result.updates < exact.iterations * int(model.live.sum())
@@ -0,0 +1,56 @@
+from collections import deque
+
+import pytest
+
+import npuzzle
+
+
+#8-puzzle instances with their optimal solution lengths; the last two are the hardest 8-puzzle states there are
+INSTANCES = [
+    ((1, 2, 3, 4, 5, 6, 7, 8, 0), 0),
+    ((1, 2, 3, 4, 5, 6, 0, 7, 8), 2),
+    ((1, 2, 3, 4, 0, 6, 7, 5, 8), 2),
+    ((4, 1, 3, 7, 2, 6, 0, 5, 8), 6),
+    ((8, 6, 7, 2, 5, 4, 3, 0, 1), 31),
+    ((6, 4, 7, 8, 5, 0, 3, 2, 1), 31),
+]
+
+
+def distances():
+    #exact distance to the goal of every solvable 8-puzzle state, by breadth-first search backwards from the goal
+    moves = npuzzle._moves(3)
+    goal = npuzzle.goal_state(3)
+    seen = {goal: 0}
+    queue = deque([goal])
+    while queue:
+        state = queue.popleft()
+        for child in npuzzle.neighbors(state, moves):
+            if child not in seen:
+                seen[child] = seen[state] + 1
+                queue.append(child)
+    return seen
+
+
+@pytest.fixture(scope='module')
+def database(tmp_path_factory):
+    return npuzzle.PatternDatabase(3, [(1, 2, 3, 4), (5, 6, 7, 8)], cache_dir=tmp_path_factory.mktemp('pdb'))
+
+
+@pytest.mark.parametrize('start, length', INSTANCES)
+def test_astar_and_idastar_find_optimal_solutions(start, length, database):
+    for heuristic in (npuzzle.manhattan, npuzzle.manhattan_linear_conflict, npuzzle.pdb_heuristic(database)):
+        for solve in (npuzzle.astar, npuzzle.idastar):
+            path = solve(start, heuristic)
+            assert path[0] == start and path[-1] == npuzzle.goal_state(3)
+            assert len(path) - 1 == length, (solve.__name__, heuristic.__name__)
+
+
+def test_heuristics_are_admissible(database):
+    packed = [npuzzle._on_packed(heuristic, 3) for heuristic in
+              (npuzzle.manhattan, npuzzle.manhattan_linear_conflict, npuzzle.pdb_heuristic(database))]
+    exact = distances()
+    assert len(exact) == 181440
+    for state, distance in exact.items():
+        assert database(state) <= distance, state
+        for heuristic in packed:
+            assert heuristic(npuzzle.pack(state)) <= distance, state
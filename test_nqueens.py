@@ -0,0 +1,23 @@
+import pytest
+
+import nqueens
+
+
+@pytest.mark.parametrize('size', [1, 4, 5, 6, 7, 8, 9, 10, 11, 12, 20, 50])
+def test_min_conflicts_solves_small_and_mid_boards(size):
+    for seed in range(5):
+        solver = nqueens.MinConflictsSolver(size, seed=seed)
+        state = solver.solve()
+        assert sorted(state) == list(range(size))
+        assert nqueens.conflicts(state) == 0
+        assert solver.cost() == 0
+
+
+def test_same_seed_gives_the_same_solution():
+    assert list(nqueens.solve(30, seed=3)) == list(nqueens.solve(30, seed=3))
+
+
+@pytest.mark.parametrize('size', [2, 3])
+def test_sizes_without_a_solution_raise(size):
+    with pytest.raises(ValueError):
+        nqueens.solve(size, seed=0)
@@ -0,0 +1,29 @@
+import bitboard
+import mnk
+import parallel_search
+import perfect_play
+
+
+def test_root_split_matches_serial_best_move():
+    #every 100th reachable position with 'X' to move and the game not over: 25 positions from the empty board to 8 pieces
+    positions = sorted((x, o) for x, o in perfect_play.reachable_positions()
+                       if x.bit_count() == o.bit_count()
+                       and not (bitboard.WINNING[x] or bitboard.WINNING[o] or (x | o) == bitboard.FULL_BOARD))[::100]
+    assert len(positions) >= 5
+    with parallel_search.RootSplitSearch(workers=2) as search:
+        for x, o in positions:
+            assert search.best_move(x, o) == bitboard.best_move(x, o), bitboard.to_list(x, o)
+
+
+def test_mnk_root_split_matches_serial_search():
+    #4x4 boards with three in a row to win, both players to move; the reference is the serial engine's root search at
+    #the same depth with fresh move ordering, which is what MNKRootSplitSearch promises
+    boards = [' ' * 16, 'X' + ' ' * 15, 'X    O     X    ', 'XO  OX    X     ', 'X  O X  O       ']
+    with parallel_search.MNKRootSplitSearch(4, 4, 3, workers=2) as split:
+        for board in boards:
+            board = list(board)
+            player = 'X' if board.count('X') == board.count('O') else 'O'
+            for depth in (2, 4):
+                engine = mnk.MNKEngine(4, 4, 3)
+                cell, value = engine._search_root(list(board), depth, player == 'X', None, board.count(' '))
+                assert split.best_move(board, player, depth) == cell, (''.join(board), player, depth)
@@ -0,0 +1,24 @@
+import math
+
+import bitboard
+import perfect_play
+
+
+def test_table_matches_search(tmp_path):
+    #every 10th reachable position: the stored value must be the full-window minimax utility, and for 'X' to move the
+    #stored move must be the one bitboard.best_move picks
+    table = perfect_play.PerfectPlayTable(perfect_play.write(str(tmp_path / 'tic_tac_toe.table')))
+    try:
+        checked = 0
+        for x, o in sorted(perfect_play.reachable_positions())[::10]:
+            x_to_move = x.bit_count() == o.bit_count()
+            value, move = table.lookup(x, o)
+            assert value == bitboard.minimax(x, o, 0, x_to_move, -math.inf, math.inf), bitboard.to_list(x, o)
+            if bitboard.WINNING[x] or bitboard.WINNING[o] or (x | o) == bitboard.FULL_BOARD:
+                assert move == perfect_play.NO_MOVE
+            elif x_to_move:
+                assert move == bitboard.best_move(x, o), bitboard.to_list(x, o)
+                checked += 1
+        assert checked > 0
+    finally:
+        table.close()
@@ -0,0 +1,20 @@
+import numpy as np
+
+import AS1_P3
+import restarts
+
+
+def test_same_seed_gives_the_same_restarts_for_any_worker_count():
+    #run_restarts returns costs and histories but no states, so the best state is found by replaying the best restart
+    #on its own stream
+    results = [restarts.run_restarts(AS1_P3.eight_queens_restart, 40, workers=workers, seed=7) for workers in (1, 2)]
+    (costs, histories), (other_costs, other_histories) = results
+    assert (costs != restarts.NOT_RUN).all()
+    np.testing.assert_array_equal(costs, other_costs)
+    np.testing.assert_array_equal(histories, other_histories)
+
+    best = int(np.argmin(costs))
+    rng = np.random.default_rng(np.random.SeedSequence(7, spawn_key=(best,)))
+    state, cost = AS1_P3.EightQueens(rng.permutation(8)).hill_climb(rng)
+    assert cost == costs[best] == other_costs[best]
+    assert state.heuristic() == cost